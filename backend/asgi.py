@@ -2,6 +2,10 @@
 ASGI config for backend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve with an ASGI server (e.g. ``uvicorn backend.asgi:application``) so the
+notifications stream can hold long-lived connections and the async read
+endpoints under /api/async/ (core/async_views.py) do not tie up a worker
+while they wait on the database.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -43,6 +43,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Sets request.is_asgi for views that stream differently under ASGI
+    'core.middleware.ServerInterfaceMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -51,8 +53,14 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # No-op unless REQUEST_METRICS_ENABLED; kept last so it times the view only.
+    'core.metrics.RequestMetricsMiddleware',
 ]
 
+# Per-view query count / latency histograms, Server-Timing headers and the
+# Prometheus endpoint at /api/metrics/.
+REQUEST_METRICS_ENABLED = False
+
 CORS_ALLOWED_ORIGINS = [
     'http://localhost:3000',
     'http://127.0.0.1:3000',
@@ -61,6 +69,8 @@ CORS_ALLOW_CREDENTIALS = True
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
+        # Bearer tokens from /api/token/ are verified without a query
+        'core.tokens.AccessTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -85,6 +95,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'backend.wsgi.application'
+ASGI_APPLICATION = 'backend.asgi.application'
 
 
 # Database
@@ -102,6 +113,29 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Swap for 'django.core.cache.backends.redis.RedisCache' (LOCATION='redis://...')
+# when running several workers so score invalidation is shared.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'ogadrive-default',
+    }
+}
+
+# Notification push channel (see core/notification_stream.py).
+# The in-process broker only reaches streams held by the same worker; with
+# several ASGI workers use 'core.notification_stream.RedisBroker' and
+# NOTIFICATION_BROKER_OPTIONS = {'url': 'redis://...'}.
+NOTIFICATION_BROKER = 'core.notification_stream.InProcessBroker'
+NOTIFICATION_BROKER_OPTIONS = {}
+NOTIFICATION_STREAM_HEARTBEAT = 15  # seconds
+# Unread badge counts stop here (see views.notifications_unread_count)
+NOTIFICATION_UNREAD_COUNT_CAP = 99
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -145,6 +179,37 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'core.User'
 
+# Logins are by email (case-insensitive, one indexed lookup); the stock
+# backend's username lookup still serves the admin site.
+AUTHENTICATION_BACKENDS = ['core.auth_backends.EmailBackend']
+
+# Same list as Django's default, with the PBKDF2 hasher swapped for one whose
+# work factor is PASSWORD_PBKDF2_ITERATIONS. Changing the count rehashes each
+# password on its next successful login. Every login costs roughly
+# iterations / 1M x 0.5s of CPU here; see `manage.py bench_login`.
+PASSWORD_HASHERS = [
+    'core.hashers.TunablePBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+PASSWORD_PBKDF2_ITERATIONS = 1_000_000  # Django 5.2 default
+
+# Failed logins allowed per key within LOGIN_FAILURE_WINDOW seconds before
+# /api/login/ answers 429. The IP limit is higher because drivers at one
+# depot often share an address.
+LOGIN_FAILURE_LIMITS = {'email': 5, 'ip': 50}
+LOGIN_FAILURE_WINDOW = 300
+# Use a shared cache (e.g. Redis) with several workers so limits are global.
+LOGIN_RATE_LIMIT_CACHE_ALIAS = 'default'
+
+# Signed bearer tokens (core.tokens), in seconds. Access tokens are not
+# checked against the database, so deactivating a user takes up to
+# ACCESS_TOKEN_LIFETIME to apply; refresh tokens are checked on every use.
+ACCESS_TOKEN_LIFETIME = 15 * 60
+REFRESH_TOKEN_LIFETIME = 14 * 24 * 3600
+
 # --- Risk Scoring Configuration ---
 # Toggle to use linear regression-style risk scoring.
 USE_LINEAR_RISK = False
@@ -167,6 +232,25 @@ RISK_LINEAR_CONFIG = {
     }
 }
 
+# Cache alias and TTL (seconds) for /risk/score/ results. Entries are also
+# invalidated when the driver's KYC/payments or the vehicle change.
+RISK_SCORE_CACHE_ALIAS = 'default'
+RISK_SCORE_CACHE_TTL = 300
+
+# Fraction of scoring calls traced when the 'core.risk' logger is at DEBUG.
+RISK_TRACE_SAMPLE_RATE = 1.0
+
+# Portfolio rollups (manage.py update_portfolio_rollups).
+# Payments newer than now - ROLLUP_LAG_SECONDS wait for the next run so rows
+# from transactions still in flight are not skipped by the watermark.
+ROLLUP_LAG_SECONDS = 300
+# A financed vehicle counts as defaulted past this many days overdue.
+PORTFOLIO_DEFAULT_DAYS_PAST_DUE = 30
+
+# Path to a coefficient artifact produced by `manage.py train_risk_model`.
+# When set, it replaces RISK_LOGISTIC_CONFIG below.
+RISK_LOGISTIC_ARTIFACT = None
+
 # Default coefficients for logistic risk model.
 RISK_LOGISTIC_CONFIG = {
     'intercept': -1.0,
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from typing import Iterable, Optional, Tuple
+
+from django.db.models import CharField, Subquery, Value
+from django.db.models.functions import Concat
+from django.utils import timezone
+
+from .models import KYC, ActivityEvent, DriverApplication, Payment, Vehicle
+
+
+def kyc_event(kyc: KYC, created: bool = False) -> ActivityEvent:
+    return ActivityEvent(
+        driver_id=kyc.user_id,
+        type=ActivityEvent.EventType.KYC,
+        object_id=kyc.pk,
+        status=kyc.status,
+        title='KYC Submitted' if created else 'KYC Status Updated',
+        description=f'Status: {kyc.status.title()}',
+        occurred_at=(kyc.submitted_at if created else None) or timezone.now(),
+    )
+
+
+def application_event(
+    application: DriverApplication, registration_number: Optional[str] = None, created: bool = False,
+) -> ActivityEvent:
+    """Timeline entry for an application's submission or status change.
+
+    Without ``registration_number`` the description reads it from the
+    vehicle inside the event's INSERT, so an application saved without its
+    vehicle loaded costs no extra query.
+    """
+    status_text = f' • Status: {application.status.title()}'
+    if registration_number is None:
+        registration = Vehicle.objects.filter(pk=application.vehicle_id).values('registration_number')[:1]
+        description = Concat(Subquery(registration), Value(status_text), output_field=CharField())
+    else:
+        description = f'{registration_number}{status_text}'
+    if created:
+        title = 'Driver Application'
+        occurred_at = application.application_date
+    else:
+        title = f'Application {application.status.title()}'
+        occurred_at = application.decision_date
+    return ActivityEvent(
+        driver_id=application.applicant_id,
+        type=ActivityEvent.EventType.APPLICATION,
+        object_id=application.pk,
+        status=application.status,
+        title=title,
+        description=description,
+        occurred_at=occurred_at or timezone.now(),
+    )
+
+
+def payment_event(payment: Payment, registration_number: str) -> ActivityEvent:
+    title, description = payment_event_text(payment.status, payment.amount, registration_number)
+    return ActivityEvent(
+        driver_id=payment.driver_id,
+        type=ActivityEvent.EventType.PAYMENT,
+        object_id=payment.pk,
+        status=payment.status,
+        title=title,
+        description=description,
+        occurred_at=payment.payment_date or timezone.now(),
+    )
+
+
+def payment_event_text(payment_status: str, amount, registration_number: str) -> Tuple[str, str]:
+    """(title, description) of a payment's timeline entry."""
+    title = 'Payment Made' if payment_status == Payment.PaymentStatus.SUCCESSFUL else 'Payment Failed'
+    return title, f'₦{amount} • {registration_number}'
+
+
+def last_recorded_status(object_id) -> Optional[str]:
+    """Status carried by the newest event for a KYC or application row."""
+    return (
+        ActivityEvent.objects.filter(object_id=object_id)
+        .order_by('-occurred_at', '-id')
+        .values_list('status', flat=True)
+        .first()
+    )
+
+
+def record_status_changes(kycs: Iterable[KYC] = (), applications: Iterable[DriverApplication] = ()) -> int:
+    """Append status events for rows changed with ``queryset.update()``.
+
+    Bulk updates skip post_save, so callers pass the updated rows here.
+    Applications must have ``vehicle`` loaded.
+    """
+    events = [kyc_event(kyc) for kyc in kycs]
+    events += [application_event(app, app.vehicle.registration_number) for app in applications]
+    ActivityEvent.objects.bulk_create(events)
+    return len(events)
@@ -1,8 +1,14 @@
+from functools import partial
+
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.utils import timezone
 from django.utils.html import format_html
 from django.contrib.auth.forms import UserCreationForm, UserChangeForm
-from .models import User, Vehicle, DriverApplication, Payment, KYC, Notification
+from django.db import transaction
+from .models import User, Vehicle, DriverApplication, Payment, KYC, Notification, DriverPaymentStats, ActivityEvent
+from .activity import record_status_changes
+from .score_cache import invalidate_driver
 
 class CustomUserCreationForm(UserCreationForm):
     class Meta(UserCreationForm.Meta):
@@ -111,17 +117,29 @@ class DriverApplicationAdmin(admin.ModelAdmin):
     
     actions = ['approve_applications', 'reject_applications']
     
+    def _record_activity(self, application_ids):
+        # queryset.update() skips post_save, so append timeline events here
+        record_status_changes(applications=DriverApplication.objects.filter(id__in=application_ids).select_related('vehicle'))
+
     def approve_applications(self, request, queryset):
-        updated = queryset.filter(status=DriverApplication.ApplicationStatus.PENDING).update(
-            status=DriverApplication.ApplicationStatus.APPROVED
+        pending = queryset.filter(status=DriverApplication.ApplicationStatus.PENDING)
+        ids = list(pending.values_list('id', flat=True))
+        updated = pending.update(
+            status=DriverApplication.ApplicationStatus.APPROVED,
+            updated_at=timezone.now(),
         )
+        self._record_activity(ids)
         self.message_user(request, f'{updated} applications were approved.')
     approve_applications.short_description = "Approve selected applications"
     
     def reject_applications(self, request, queryset):
-        updated = queryset.filter(status=DriverApplication.ApplicationStatus.PENDING).update(
-            status=DriverApplication.ApplicationStatus.REJECTED
+        pending = queryset.filter(status=DriverApplication.ApplicationStatus.PENDING)
+        ids = list(pending.values_list('id', flat=True))
+        updated = pending.update(
+            status=DriverApplication.ApplicationStatus.REJECTED,
+            updated_at=timezone.now(),
         )
+        self._record_activity(ids)
         self.message_user(request, f'{updated} applications were rejected.')
     reject_applications.short_description = "Reject selected applications"
 
@@ -198,21 +216,35 @@ class KYCAdmin(admin.ModelAdmin):
         return super().get_queryset(request).select_related('user', 'verified_by')
     
     actions = ['approve_kyc', 'reject_kyc', 'mark_under_review']
+
+    def _invalidate_scores(self, queryset):
+        # queryset.update() skips post_save, so drop cached risk scores and
+        # append timeline events here
+        # The changelist queryset select_related()s user and verified_by, which only() cannot defer
+        kycs = list(queryset.select_related(None).only('id', 'user_id', 'status', 'verified_at'))
+        for kyc in kycs:
+            transaction.on_commit(partial(invalidate_driver, kyc.user_id))
+        record_status_changes(kycs=kycs)
     
     def approve_kyc(self, request, queryset):
         from django.utils import timezone
-        updated = queryset.update(status='APPROVED', verified_by=request.user, verified_at=timezone.now())
+        now = timezone.now()
+        updated = queryset.update(status='APPROVED', verified_by=request.user, verified_at=now, updated_at=now)
+        self._invalidate_scores(queryset)
         self.message_user(request, f'{updated} KYC verification(s) approved successfully.')
     approve_kyc.short_description = "Approve selected KYC verifications"
     
     def reject_kyc(self, request, queryset):
         from django.utils import timezone
-        updated = queryset.update(status='REJECTED', verified_by=request.user, verified_at=timezone.now())
+        now = timezone.now()
+        updated = queryset.update(status='REJECTED', verified_by=request.user, verified_at=now, updated_at=now)
+        self._invalidate_scores(queryset)
         self.message_user(request, f'{updated} KYC verification(s) rejected.')
     reject_kyc.short_description = "Reject selected KYC verifications"
     
     def mark_under_review(self, request, queryset):
-        updated = queryset.update(status='UNDER_REVIEW')
+        updated = queryset.update(status='UNDER_REVIEW', updated_at=timezone.now())
+        self._invalidate_scores(queryset)
         self.message_user(request, f'{updated} KYC verification(s) marked as under review.')
     mark_under_review.short_description = "Mark selected KYC verifications as under review"
 
@@ -230,3 +262,25 @@ class NotificationAdmin(admin.ModelAdmin):
     search_fields = ('title', 'message', 'user__username', 'user__email')
     ordering = ('-created_at',)
     raw_id_fields = ('user', 'application')
+
+
+@admin.register(DriverPaymentStats)
+class DriverPaymentStatsAdmin(admin.ModelAdmin):
+    list_display = ('driver', 'successful_count', 'failed_count', 'total_amount', 'last_payment_date', 'updated_at')
+    search_fields = ('driver__username', 'driver__email')
+    ordering = ('-updated_at',)
+    raw_id_fields = ('driver',)
+    readonly_fields = ('successful_count', 'failed_count', 'total_amount', 'last_payment_date', 'recent_failures', 'updated_at')
+
+
+@admin.register(ActivityEvent)
+class ActivityEventAdmin(admin.ModelAdmin):
+    list_display = ('driver', 'type', 'title', 'status', 'occurred_at')
+    list_filter = ('type', 'occurred_at')
+    search_fields = ('driver__username', 'driver__email', 'description')
+    ordering = ('-occurred_at',)
+    raw_id_fields = ('driver',)
+    readonly_fields = ('driver', 'type', 'object_id', 'status', 'title', 'description', 'occurred_at')
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('driver')
@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+import numpy as np
+from django.db.models import DecimalField, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from .models import DURATION_WEEKS, DriverApplication, Payment, Vehicle
+
+# Amounts are handled as integer kobo (1/100 naira) so schedules add up exactly.
+ONE_DAY = np.timedelta64(1, 'D')
+ONE_WEEK = np.timedelta64(7, 'D')
+
+
+def _to_cents(value) -> int:
+    return int((Decimal(value or 0) * 100).quantize(Decimal('1')))
+
+
+def _to_money(cents) -> str:
+    # Rendered as a string, like the other money fields in API responses
+    return str((Decimal(int(cents)) / 100).quantize(Decimal('0.01')))
+
+
+def _to_date(value) -> Optional[date]:
+    return None if np.isnat(value) else value.astype(date)
+
+
+def financed_vehicles(vehicles=None):
+    """Vehicles on a hire-purchase plan, annotated with schedule inputs.
+
+    Adds ``start_date`` (decision date of the latest approved application,
+    falling back to the vehicle's creation date) and ``paid`` (sum of
+    successful payments), both as correlated subqueries so the whole fleet
+    loads in one query.
+    """
+    if vehicles is None:
+        vehicles = Vehicle.objects.all()
+    approved = (
+        DriverApplication.objects.filter(
+            vehicle=OuterRef('pk'),
+            status=DriverApplication.ApplicationStatus.APPROVED,
+            decision_date__isnull=False,
+        )
+        .order_by('-decision_date')
+        .values('decision_date')[:1]
+    )
+    paid = (
+        Payment.objects.filter(vehicle=OuterRef('pk'), status=Payment.PaymentStatus.SUCCESSFUL)
+        .order_by()
+        .values('vehicle')
+        .annotate(total=Sum('amount'))
+        .values('total')
+    )
+    money = DecimalField(max_digits=14, decimal_places=2)
+    return (
+        vehicles.filter(
+            Q(repayment_duration__in=list(DURATION_WEEKS)),
+            total_receivable__gt=0,
+        )
+        .annotate(
+            start_date=TruncDate(Coalesce(Subquery(approved), F('created_at'))),
+            paid=Coalesce(Subquery(paid, output_field=money), Value(Decimal('0')), output_field=money),
+        )
+    )
+
+
+@dataclass
+class FleetArrears:
+    """Arrears position of every vehicle in a fleet, one array element per vehicle."""
+
+    as_of: date
+    vehicle_ids: list
+    owner_ids: list
+    vehicle_types: list
+    registration_numbers: list
+    start: np.ndarray  # datetime64[D]
+    weeks: np.ndarray
+    installment: np.ndarray  # regular instalment, kobo
+    total: np.ndarray  # total receivable, kobo
+    paid: np.ndarray  # successful payments, kobo
+    expected: np.ndarray  # amount due by as_of, kobo
+    arrears: np.ndarray  # kobo
+    installments_paid: np.ndarray
+    days_past_due: np.ndarray
+    scheduled_end: np.ndarray  # datetime64[D]
+    projected_payoff: np.ndarray  # datetime64[D], NaT when no repayment pace yet
+
+    def __len__(self) -> int:
+        return len(self.vehicle_ids)
+
+    def row(self, i: int) -> Dict[str, object]:
+        return {
+            'vehicle_id': str(self.vehicle_ids[i]),
+            'registration_number': self.registration_numbers[i],
+            'start_date': _to_date(self.start[i]),
+            'weeks': int(self.weeks[i]),
+            'weekly_installment': _to_money(self.installment[i]),
+            'total_receivable': _to_money(self.total[i]),
+            'amount_paid': _to_money(self.paid[i]),
+            'amount_due_to_date': _to_money(self.expected[i]),
+            'arrears_amount': _to_money(self.arrears[i]),
+            'installments_paid': int(self.installments_paid[i]),
+            'days_past_due': int(self.days_past_due[i]),
+            'scheduled_end_date': _to_date(self.scheduled_end[i]),
+            'projected_payoff_date': _to_date(self.projected_payoff[i]),
+            'is_paid_off': bool(self.paid[i] >= self.total[i]),
+        }
+
+    def summary(self) -> Dict[str, object]:
+        return {
+            'as_of': self.as_of,
+            'vehicles': len(self),
+            'vehicles_in_arrears': int(np.count_nonzero(self.arrears)),
+            'total_receivable': _to_money(self.total.sum()),
+            'total_paid': _to_money(self.paid.sum()),
+            'total_arrears': _to_money(self.arrears.sum()),
+        }
+
+    def rows(self, order: Optional[np.ndarray] = None) -> List[Dict[str, object]]:
+        indices = range(len(self)) if order is None else order
+        return [self.row(int(i)) for i in indices]
+
+
+def compute_fleet_arrears(vehicles=None, as_of: Optional[date] = None) -> FleetArrears:
+    """Reconcile payments against every vehicle's weekly schedule in one pass.
+
+    Instalment ``n`` (1-based) falls due ``n`` weeks after the start date; the
+    last instalment absorbs the rounding remainder so the schedule sums to
+    ``total_receivable``. Payments are applied oldest instalment first.
+    Days past due count from the due date of the first instalment not fully
+    covered. The projected payoff extrapolates the average daily repayment
+    pace since the start date; vehicles with no payments fall back to the
+    scheduled end date.
+    """
+    as_of = as_of or timezone.localdate()
+    rows = list(
+        financed_vehicles(vehicles)
+        .order_by('id')
+        .values_list(
+            'id', 'owner_id', 'vehicle_type', 'registration_number',
+            'repayment_duration', 'total_receivable', 'start_date', 'paid',
+        )
+    )
+    columns = list(zip(*rows)) if rows else [()] * 8
+    vehicle_ids, owner_ids, vehicle_types, registrations, durations, receivables, starts, paid_values = columns
+
+    weeks = np.array([DURATION_WEEKS[d] for d in durations], dtype=np.int64)
+    total = np.array([_to_cents(v) for v in receivables], dtype=np.int64)
+    paid = np.array([_to_cents(v) for v in paid_values], dtype=np.int64)
+    start = np.array(starts, dtype='datetime64[D]')
+    today = np.datetime64(as_of, 'D')
+
+    installment = total // np.maximum(weeks, 1)
+    remainder = total - installment * weeks
+
+    # Instalments fallen due by as_of, and the amount they add up to
+    elapsed_days = (today - start) // ONE_DAY
+    due_count = np.clip(elapsed_days // 7, 0, weeks)
+    expected = due_count * installment + np.where(due_count == weeks, remainder, 0)
+    arrears = np.maximum(expected - paid, 0)
+
+    # Instalments fully covered by payments, oldest first
+    paid_off = paid >= total
+    covered = np.where(paid_off, weeks, np.minimum(paid // np.maximum(installment, 1), weeks - 1))
+    first_unpaid_due = start + (covered + 1) * ONE_WEEK
+    days_past_due = np.where(paid_off, 0, np.maximum((today - first_unpaid_due) // ONE_DAY, 0))
+
+    scheduled_end = start + weeks * ONE_WEEK
+    remaining = np.maximum(total - paid, 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pace = np.where(elapsed_days > 0, paid / np.maximum(elapsed_days, 1), 0.0)
+        days_to_payoff = np.ceil(np.where(pace > 0, remaining / pace, 0.0)).astype(np.int64)
+    projected_payoff = np.where(
+        paid_off,
+        np.datetime64('NaT', 'D'),
+        np.where(pace > 0, today + days_to_payoff * ONE_DAY, scheduled_end),
+    )
+
+    return FleetArrears(
+        as_of=as_of,
+        vehicle_ids=list(vehicle_ids),
+        owner_ids=list(owner_ids),
+        vehicle_types=list(vehicle_types),
+        registration_numbers=list(registrations),
+        start=start,
+        weeks=weeks,
+        installment=installment,
+        total=total,
+        paid=paid,
+        expected=expected,
+        arrears=arrears,
+        installments_paid=covered,
+        days_past_due=days_past_due,
+        scheduled_end=scheduled_end,
+        projected_payoff=projected_payoff,
+    )
+
+
+def vehicle_schedule(vehicle: Vehicle, as_of: Optional[date] = None) -> Optional[Dict[str, object]]:
+    """Weekly schedule for one vehicle with payments allocated to each instalment.
+
+    Returns None when the vehicle has no hire-purchase terms. Interest is
+    spread evenly: each instalment carries the same share of
+    ``total_receivable - total_cost``.
+    """
+    fleet = compute_fleet_arrears(Vehicle.objects.filter(pk=vehicle.pk), as_of=as_of)
+    if not len(fleet):
+        return None
+    weeks = int(fleet.weeks[0])
+    total = int(fleet.total[0])
+    paid = int(fleet.paid[0])
+    today = np.datetime64(fleet.as_of, 'D')
+
+    amounts = np.full(weeks, fleet.installment[0], dtype=np.int64)
+    amounts[-1] += total - int(amounts.sum())
+    interest_total = max(total - _to_cents(vehicle.total_cost), 0)
+    interest = np.full(weeks, interest_total // weeks, dtype=np.int64)
+    interest[-1] += interest_total - int(interest.sum())
+    due_dates = fleet.start[0] + np.arange(1, weeks + 1) * ONE_WEEK
+    cumulative = np.cumsum(amounts)
+    allocated = np.clip(paid - (cumulative - amounts), 0, amounts)
+
+    status = np.where(
+        allocated >= amounts, 'PAID',
+        np.where(due_dates <= today, 'OVERDUE', np.where(allocated > 0, 'PARTIAL', 'UPCOMING')),
+    )
+    installments = [
+        {
+            'number': n + 1,
+            'due_date': _to_date(due_dates[n]),
+            'amount': _to_money(amounts[n]),
+            'principal': _to_money(amounts[n] - interest[n]),
+            'interest': _to_money(interest[n]),
+            'cumulative_due': _to_money(cumulative[n]),
+            'paid': _to_money(allocated[n]),
+            'status': str(status[n]),
+        }
+        for n in range(weeks)
+    ]
+    return {'summary': fleet.row(0), 'installments': installments}
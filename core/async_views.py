@@ -0,0 +1,203 @@
+"""Async variants of the read-heavy endpoints, mounted under ``/api/async/``.
+
+Each view returns the same JSON as its counterpart in ``core.views`` but
+awaits the database through Django's async ORM, so under backend/asgi.py a
+worker keeps serving other requests while a query is in flight. Queries
+that do not depend on each other are issued together with
+``asyncio.gather``. Django still runs each ORM call on a worker thread, so
+concurrent queries from one request overlap their waiting rather than
+running in parallel on one connection.
+"""
+import asyncio
+import logging
+
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.renderers import JSONRenderer
+
+from .models import KYC, ActivityEvent, DriverApplication, DriverPaymentStats, Notification, Vehicle
+from .pagination import apaginate_desc, parse_limit
+from .score_cache import aget_or_compute_score, ascore_key
+from .serializers import (
+    DriverApplicationSerializer,
+    KYCSerializer,
+    NotificationCompactSerializer,
+    NotificationSerializer,
+)
+from .tokens import bearer_user, subject_for
+
+logger = logging.getLogger(__name__)
+
+
+def _json(data, status_code=status.HTTP_200_OK):
+    # DRF's renderer, so dates and decimals match the sync endpoints
+    return HttpResponse(JSONRenderer().render(data), status=status_code, content_type='application/json')
+
+
+def _scoped(request, param):
+    """``(user id, None)`` for the ``param`` query value, or ``(None, error response)``.
+
+    The scoping ``core.tokens.scoped_subject`` gives the sync views; these
+    views skip DRF authentication, so the bearer token is read here.
+    """
+    try:
+        caller = bearer_user(request)
+    except AuthenticationFailed as e:
+        return None, _json({'detail': e.detail}, status_code=status.HTTP_401_UNAUTHORIZED)
+    user_id, allowed = subject_for(caller, request.GET.get(param))
+    if not allowed:
+        return None, _json({'error': 'Not allowed'}, status_code=status.HTTP_403_FORBIDDEN)
+    return user_id, None
+
+
+@require_GET
+async def kyc_status(request):
+    """Async ``kyc_status``."""
+    try:
+        user_id, error = _scoped(request, 'user')
+        if error:
+            return error
+        if not user_id:
+            return _json({'error': 'Missing user id'}, status_code=status.HTTP_400_BAD_REQUEST)
+
+        kyc = await KYC.objects.filter(user_id=user_id).afirst()
+        if not kyc:
+            return _json({'status': 'NOT_SUBMITTED'})
+        return _json({'status': kyc.status, 'kyc': KYCSerializer(kyc).data})
+    except Exception as e:
+        return _json({'error': str(e)}, status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@require_GET
+async def credit_risk_score(request):
+    """Async ``credit_risk_score``: the vehicle row and the score's cache key are fetched together."""
+    try:
+        user_id, error = _scoped(request, 'user')
+        if error:
+            return error
+        vehicle_id = request.GET.get('vehicle')
+        if not user_id:
+            return _json({'error': 'Missing user id'}, status_code=status.HTTP_400_BAD_REQUEST)
+
+        if vehicle_id:
+            vehicle, key = await asyncio.gather(
+                Vehicle.objects.filter(id=vehicle_id).afirst(),
+                ascore_key(user_id, vehicle_id),
+            )
+            if vehicle is None:
+                return _json({'error': 'Invalid vehicle'}, status_code=status.HTTP_400_BAD_REQUEST)
+        else:
+            vehicle, key = None, await ascore_key(user_id)
+
+        details, cached = await aget_or_compute_score(key, user_id, vehicle)
+        logger.info(
+            "[CREDIT_RISK_SCORE] logistic details user=%s vehicle=%s cached=%s -> %s",
+            user_id,
+            getattr(vehicle, 'id', None),
+            cached,
+            details,
+        )
+        response = _json({**details, 'cached': cached})
+        response['X-Cache'] = 'HIT' if cached else 'MISS'
+        return response
+    except Exception as e:
+        return _json({'error': str(e)}, status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@require_GET
+async def recent_activity(request):
+    """Async ``recent_activity``: the timeline page and payment summary are fetched together."""
+    driver_id, error = _scoped(request, 'driver')
+    if error:
+        return error
+    if not driver_id:
+        return _json({'error': 'Missing driver id'}, status_code=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        try:
+            (events, next_cursor), stats = await asyncio.gather(
+                apaginate_desc(
+                    ActivityEvent.objects.filter(driver_id=driver_id).only(
+                        'id', 'type', 'title', 'description', 'occurred_at'
+                    ),
+                    'occurred_at',
+                    cursor=request.GET.get('before'),
+                    limit=parse_limit(request.GET.get('limit'), default=10),
+                ),
+                DriverPaymentStats.objects.filter(driver_id=driver_id).afirst(),
+            )
+        except ValueError:
+            return _json({'error': 'Invalid cursor'}, status_code=status.HTTP_400_BAD_REQUEST)
+        activities = [
+            {
+                'type': event.type,
+                'title': event.title,
+                'description': event.description,
+                'timestamp': event.occurred_at.isoformat(),
+            }
+            for event in events
+        ]
+        summary = {
+            'successful_payments': stats.successful_count if stats else 0,
+            'failed_payments': stats.failed_count if stats else 0,
+            'total_paid': str(stats.total_amount) if stats else '0.00',
+            'last_payment_date': stats.last_payment_date.isoformat() if stats and stats.last_payment_date else None,
+        }
+        return _json({'items': activities, 'summary': summary, 'next_cursor': next_cursor})
+    except Exception as e:
+        return _json({'error': str(e)}, status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@require_GET
+async def notifications_list(request):
+    """Async ``notifications_list``."""
+    try:
+        user_id, error = _scoped(request, 'user')
+        if error:
+            return error
+        if not user_id:
+            return _json({'error': 'Missing user id'}, status_code=status.HTTP_400_BAD_REQUEST)
+        compact = request.GET.get('compact') in ('1', 'true', 'True')
+        notes = Notification.objects.filter(user_id=user_id)
+        if compact:
+            notes = notes.select_related('application__vehicle')
+            serializer_class = NotificationCompactSerializer
+        else:
+            notes = notes.select_related('application__vehicle', 'application__applicant')
+            serializer_class = NotificationSerializer
+        with_count = request.GET.get('with_count') in ('1', 'true', 'True')
+        paging = apaginate_desc(
+            notes,
+            'created_at',
+            cursor=request.GET.get('cursor'),
+            limit=parse_limit(request.GET.get('limit')),
+        )
+        try:
+            if with_count:
+                (page, next_cursor), count = await asyncio.gather(paging, notes.acount())
+            else:
+                page, next_cursor = await paging
+        except ValueError:
+            return _json({'error': 'Invalid cursor'}, status_code=status.HTTP_400_BAD_REQUEST)
+        body = {'items': serializer_class(page, many=True).data, 'next_cursor': next_cursor}
+        if with_count:
+            body['count'] = count
+        return _json(body)
+    except Exception as e:
+        return _json({'error': str(e)}, status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@require_GET
+async def application_detail(request, pk):
+    """Async ``application_detail``."""
+    try:
+        application = (
+            await DriverApplication.objects.select_related('vehicle', 'applicant').filter(id=pk).afirst()
+        )
+        if application is None:
+            return _json({'error': 'Application not found'}, status_code=status.HTTP_404_NOT_FOUND)
+        return _json(DriverApplicationSerializer(application).data)
+    except Exception as e:
+        return _json({'error': str(e)}, status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
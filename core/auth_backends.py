@@ -0,0 +1,31 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.db.models.functions import Lower
+
+
+class EmailBackend(ModelBackend):
+    """Authenticate with ``email`` and ``password``; username logins (admin) fall through to ModelBackend.
+
+    The email is matched case-insensitively with ``lower(email) = %s``,
+    which the ``user_email_lower_idx`` functional index serves, and the
+    user is fetched once. ``check_password`` rehashes the password when
+    the hasher's work factor has changed since it was stored.
+    """
+
+    def authenticate(self, request, username=None, password=None, email=None, **kwargs):
+        if email is None:
+            return super().authenticate(request, username=username, password=password, **kwargs)
+        if password is None:
+            return None
+        UserModel = get_user_model()
+        users = list(
+            UserModel._default_manager.alias(email_lower=Lower('email')).filter(email_lower=email.strip().lower())
+        )
+        if not users:
+            # Hash anyway so response time does not reveal unknown emails
+            UserModel().set_password(password)
+            return None
+        for user in users:
+            if user.check_password(password) and self.user_can_authenticate(user):
+                return user
+        return None
@@ -0,0 +1,352 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import platform
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+import django
+import numpy as np
+from django.contrib.auth.hashers import check_password
+from django.db import connection, transaction
+from django.test import AsyncClient, Client, RequestFactory
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from .metrics import RequestMetrics
+from .models import KYC, DriverApplication, Notification, Payment, User, Vehicle
+from .ratelimit import clear_login_limits, login_keys
+
+# Baseline fields compared by ``compare``: latency regresses by ratio,
+# queries regress on any increase.
+COMPARED_LATENCY = ('p50_ms', 'p95_ms')
+
+
+@dataclass(frozen=True)
+class Sample:
+    """One set of related rows a scenario can address."""
+    owner: User
+    vehicle: Vehicle
+    driver: User
+    open_vehicle: Vehicle
+    application: DriverApplication
+    password: str
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    method: str
+    # Returns (path, query params or JSON body) for a sample
+    request: Callable[[Sample], tuple]
+    # Writes run inside a transaction that is rolled back
+    writes: bool = False
+    # Also served by core.async_views under /api/async/
+    has_async: bool = False
+    # Logs in as the sample owner; skipped without the generated users' password
+    needs_password: bool = False
+
+
+def _kyc_payload(s: Sample) -> dict:
+    return {
+        'user': str(s.driver.id),
+        'full_name': s.driver.get_full_name() or s.driver.username,
+        'date_of_birth': '1990-01-01',
+        'address': '1 Allen Ave, Lagos',
+        'document_type': KYC.DocumentType.NATIONAL_ID,
+        'document_number': f'{s.driver.username}-doc',
+    }
+
+
+SCENARIOS = [
+    Scenario('health', 'GET', lambda s: ('/api/health/', {})),
+    Scenario(
+        'login', 'POST',
+        lambda s: ('/api/login/', {'email': s.owner.email, 'password': s.password}),
+        writes=True,
+        needs_password=True,
+    ),
+    Scenario('vehicles_list', 'GET', lambda s: ('/api/vehicles/', {'owner': str(s.owner.id)})),
+    Scenario('vehicle_search', 'GET', lambda s: ('/api/vehicles/search/', {'type': s.open_vehicle.vehicle_type, 'sort': 'weekly_returns'})),
+    Scenario('vehicle_detail', 'GET', lambda s: (f'/api/vehicles/{s.vehicle.id}/', {})),
+    Scenario('vehicle_schedule', 'GET', lambda s: (f'/api/vehicles/{s.vehicle.id}/schedule/', {})),
+    Scenario('owner_arrears', 'GET', lambda s: ('/api/vehicles/arrears/', {'owner': str(s.owner.id)})),
+    Scenario('owner_portfolio', 'GET', lambda s: (f'/api/owners/{s.owner.id}/portfolio/', {})),
+    Scenario('recent_activity', 'GET', lambda s: ('/api/recent-activity/', {'driver': str(s.driver.id)}), has_async=True),
+    Scenario('kyc_status', 'GET', lambda s: ('/api/kyc/status/', {'user': str(s.driver.id)}), has_async=True),
+    Scenario('kyc_submit', 'POST', lambda s: ('/api/kyc/submit/', _kyc_payload(s)), writes=True),
+    Scenario(
+        'risk_score', 'GET',
+        lambda s: ('/api/risk/score/', {'user': str(s.driver.id), 'vehicle': str(s.vehicle.id)}),
+        has_async=True,
+    ),
+    Scenario(
+        'application_submit', 'POST',
+        lambda s: ('/api/applications/submit/', {'applicant': str(s.driver.id), 'vehicle': str(s.open_vehicle.id)}),
+        writes=True,
+    ),
+    Scenario('application_detail', 'GET', lambda s: (f'/api/applications/{s.application.id}/', {}), has_async=True),
+    Scenario(
+        'application_status', 'POST',
+        lambda s: (f'/api/applications/{s.application.id}/status/', {'status': DriverApplication.ApplicationStatus.REJECTED}),
+        writes=True,
+    ),
+    Scenario('owner_applications', 'GET', lambda s: ('/api/applications/owner/', {'owner': str(s.owner.id)})),
+    Scenario('notifications_list', 'GET', lambda s: ('/api/notifications/', {'user': str(s.owner.id)}), has_async=True),
+    Scenario('notifications_unread_count', 'GET', lambda s: ('/api/notifications/unread-count/', {'user': str(s.owner.id)})),
+    Scenario('notifications_mark_read', 'POST', lambda s: ('/api/notifications/mark-read/', {'user': str(s.owner.id)}), writes=True),
+]
+SCENARIO_NAMES = [scenario.name for scenario in SCENARIOS]
+ASYNC_SUFFIX = '@asgi'
+
+
+def load_samples(count: int, password: str = '') -> List[Sample]:
+    """Pick up to ``count`` assigned vehicles; ids are random, so owners spread across the table."""
+    vehicles = Vehicle.objects.filter(driver__isnull=False).select_related('owner', 'driver').order_by('id')[:count]
+    samples = []
+    for vehicle in vehicles:
+        application = (
+            DriverApplication.objects.filter(vehicle__owner_id=vehicle.owner_id)
+            .order_by('-application_date', '-id')
+            .first()
+        )
+        if application is None:
+            continue
+        open_vehicle = (
+            Vehicle.objects.filter(owner_id=vehicle.owner_id, driver__isnull=True).order_by('id').first() or vehicle
+        )
+        samples.append(Sample(vehicle.owner, vehicle, vehicle.driver, open_vehicle, application, password))
+    return samples
+
+
+def _percentile(values: np.ndarray, q: float) -> float:
+    return round(float(np.percentile(values, q)), 3)
+
+
+def run_scenario(
+    client: Client, scenario: Scenario, samples: List[Sample], iterations: int, warmup: int,
+) -> Dict[str, object]:
+    """Time ``iterations`` requests, rotating through ``samples``.
+
+    Latency is wall time around the test client call; queries are counted
+    with the same execute_wrapper the metrics middleware uses.
+    """
+    latencies = np.empty(iterations)
+    queries = np.empty(iterations, dtype=np.int64)
+    statuses = Counter()
+    started = time.perf_counter()
+    for i in range(-warmup, iterations):
+        path, data = scenario.request(samples[i % len(samples)])
+        metrics = RequestMetrics()
+        with connection.execute_wrapper(metrics):
+            t0 = time.perf_counter()
+            if scenario.writes:
+                with transaction.atomic():
+                    response = _send(client, scenario.method, path, data)
+                    transaction.set_rollback(True)
+            else:
+                response = _send(client, scenario.method, path, data)
+            elapsed = time.perf_counter() - t0
+        client.cookies.clear()
+        if i < 0:
+            started = time.perf_counter()
+            continue
+        latencies[i] = elapsed * 1000
+        queries[i] = metrics.queries
+        statuses[str(response.status_code)] += 1
+    wall = time.perf_counter() - started
+    return {
+        **_summary(latencies, wall, statuses),
+        'queries_per_request': round(float(queries.mean()), 2),
+        'max_queries': int(queries.max()),
+    }
+
+
+def run_scenario_async(
+    scenario: Scenario, samples: List[Sample], iterations: int, warmup: int, concurrency: int,
+) -> Dict[str, object]:
+    """Time the async variant of a read scenario through the ASGI handler.
+
+    Up to ``concurrency`` requests are in flight at once on one event loop,
+    the way one ASGI worker serves them, so throughput is requests per
+    second per worker and latency includes time queued behind other
+    requests. Queries run on Django's worker thread and are not counted.
+    """
+    async def run():
+        client = AsyncClient(raise_request_exception=False)
+        slots = asyncio.Semaphore(concurrency)
+
+        async def one(i):
+            path, data = scenario.request(samples[i % len(samples)])
+            async with slots:
+                t0 = time.perf_counter()
+                response = await client.get(path.replace('/api/', '/api/async/', 1), data)
+                return (time.perf_counter() - t0) * 1000, response.status_code
+
+        await asyncio.gather(*(one(i) for i in range(-warmup, 0)))
+        started = time.perf_counter()
+        timings = await asyncio.gather(*(one(i) for i in range(iterations)))
+        return timings, time.perf_counter() - started
+
+    timings, wall = asyncio.run(run())
+    latencies = np.array([elapsed for elapsed, _ in timings])
+    statuses = Counter(str(code) for _, code in timings)
+    return {
+        **_summary(latencies, wall, statuses),
+        'concurrency': concurrency,
+        'queries_per_request': None,
+        'max_queries': None,
+    }
+
+
+def _summary(latencies: np.ndarray, wall: float, statuses: Counter) -> Dict[str, object]:
+    return {
+        'iterations': len(latencies),
+        'p50_ms': _percentile(latencies, 50),
+        'p95_ms': _percentile(latencies, 95),
+        'p99_ms': _percentile(latencies, 99),
+        'mean_ms': round(float(latencies.mean()), 3),
+        'throughput_rps': round(len(latencies) / wall, 1) if wall else 0.0,
+        'statuses': dict(statuses),
+    }
+
+
+def _send(client: Client, method: str, path: str, data: dict):
+    if method == 'GET':
+        return client.get(path, data)
+    return client.post(path, data, content_type='application/json')
+
+
+def _clear_login_limits(samples: List[Sample]) -> None:
+    # Test client requests share one REMOTE_ADDR, so every run shares the IP counter
+    request = RequestFactory().post('/api/login/')
+    for sample in samples:
+        clear_login_limits(login_keys(request, sample.owner.email))
+
+
+def run_benchmarks(
+    names: Optional[List[str]] = None,
+    iterations: int = 200,
+    warmup: int = 20,
+    samples: int = 10,
+    password: str = '',
+    asgi: bool = False,
+    concurrency: int = 10,
+    progress: Optional[Callable[[str, Dict[str, object]], None]] = None,
+) -> Dict[str, object]:
+    """Run the scenarios against the current database and return a baseline document.
+
+    With ``asgi``, only scenarios that have an async variant run, each
+    followed by that variant (result name suffixed ASYNC_SUFFIX) so the two
+    paths can be compared. DEBUG is switched off for the run so query
+    logging does not skew the numbers; unhandled view errors are recorded
+    as 500s rather than raised.
+
+    Scenarios that log in need ``password``: without it they are skipped
+    (listed in ``meta.skipped``), or refused when asked for by name, since
+    wrong passwords would only measure 401s and then rate-limited 429s.
+    Their rate-limit counters are cleared before and after each run.
+    """
+    picked = load_samples(samples, password)
+    if not picked:
+        raise ValueError('No vehicles with an assigned driver; run generate_synthetic_data first.')
+    needs_password = [s.name for s in SCENARIOS if s.needs_password and (not names or s.name in names)]
+    if needs_password and password and not check_password(password, picked[0].owner.password):
+        raise ValueError('The password does not match the generated users.')
+    if needs_password and not password and names:
+        raise ValueError(f"{', '.join(needs_password)} needs the generated users' password.")
+    results, skipped = {}, []
+    with override_settings(DEBUG=False, ALLOWED_HOSTS=['testserver']):
+        client = Client(raise_request_exception=False)
+        for scenario in SCENARIOS:
+            if (names and scenario.name not in names) or (asgi and not scenario.has_async):
+                continue
+            if scenario.needs_password and not password:
+                skipped.append(scenario.name)
+                continue
+            if scenario.needs_password:
+                _clear_login_limits(picked)
+                try:
+                    results[scenario.name] = run_scenario(client, scenario, picked, iterations, warmup)
+                finally:
+                    _clear_login_limits(picked)
+            else:
+                results[scenario.name] = run_scenario(client, scenario, picked, iterations, warmup)
+            if progress:
+                progress(scenario.name, results[scenario.name])
+            if asgi:
+                name = scenario.name + ASYNC_SUFFIX
+                results[name] = run_scenario_async(scenario, picked, iterations, warmup, concurrency)
+                if progress:
+                    progress(name, results[name])
+    return {
+        'meta': {
+            'created_at': timezone.now().isoformat(),
+            'django': django.get_version(),
+            'python': platform.python_version(),
+            'database': connection.vendor,
+            'dataset': {
+                'owners': User.objects.filter(role=User.Role.OWNER).count(),
+                'vehicles': Vehicle.objects.count(),
+                'applications': DriverApplication.objects.count(),
+                'notifications': Notification.objects.count(),
+                'payments': _estimated_rows(Payment),
+            },
+            'iterations': iterations,
+            'samples': len(picked),
+            'skipped': skipped,
+        },
+        'results': results,
+    }
+
+
+def _estimated_rows(model) -> int:
+    # An exact count of a multi-million row table takes seconds on PostgreSQL
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [model._meta.db_table])
+            row = cursor.fetchone()
+        if row and row[0] > 0:
+            return int(row[0])
+    return model.objects.count()
+
+
+def compare(baseline: Dict[str, object], current: Dict[str, object], threshold: float) -> List[Dict[str, object]]:
+    """Return one row per scenario present in both runs, flagging regressions.
+
+    A scenario regresses when p50 or p95 grows by more than ``threshold``
+    (0.2 = 20%) or when it issues more queries per request than before.
+    """
+    rows = []
+    for name, now in current['results'].items():
+        before = baseline['results'].get(name)
+        if before is None:
+            continue
+        reasons = []
+        for key in COMPARED_LATENCY:
+            if before[key] and now[key] > before[key] * (1 + threshold):
+                reasons.append(f'{key} {before[key]:.2f} -> {now[key]:.2f}')
+        if now['max_queries'] is not None and before['max_queries'] is not None and now['max_queries'] > before['max_queries']:
+            reasons.append(f"queries {before['max_queries']} -> {now['max_queries']}")
+        rows.append({
+            'name': name,
+            'p95_before': before['p95_ms'],
+            'p95_after': now['p95_ms'],
+            'change': (now['p95_ms'] / before['p95_ms'] - 1) if before['p95_ms'] else 0.0,
+            'regressions': reasons,
+        })
+    return rows
+
+
+def load_baseline(path: str) -> Dict[str, object]:
+    with open(path) as fh:
+        return json.load(fh)
+
+
+def save_baseline(document: Dict[str, object], path: str) -> None:
+    with open(path, 'w') as fh:
+        json.dump(document, fh, indent=2, sort_keys=True)
+        fh.write('\n')
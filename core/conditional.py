@@ -0,0 +1,109 @@
+"""Conditional GET (ETag / Last-Modified) for the read endpoints the mobile app polls.
+
+``conditional_get(version)`` wraps a DRF handler. Before the view runs,
+``version(request, *args, **kwargs)`` reads only the version columns
+(``updated_at``) of the rows the response is built from; when the
+client's If-None-Match or If-Modified-Since still matches, the view is
+skipped and 304 Not Modified is returned. Otherwise the view runs as
+usual and its response carries the ETag and Last-Modified for the next
+poll.
+
+Version columns only move when a row is saved through the ORM, so every
+``queryset.update()`` or ``bulk_update()`` of these models must set
+``updated_at`` itself.
+"""
+import hashlib
+from calendar import timegm
+from datetime import datetime
+from functools import wraps
+from typing import Callable, NamedTuple, Optional
+
+from django.core.exceptions import ValidationError
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from .models import KYC, DriverApplication, Vehicle
+from .serializers import UserSerializer
+from .tokens import scoped_subject
+
+
+class Version(NamedTuple):
+    # Values that change whenever the response body does
+    parts: tuple
+    last_modified: Optional[datetime] = None
+
+
+def _etag(request, version: Version) -> str:
+    # The negotiated media type is part of the representation (JSON or the browsable API)
+    raw = repr((getattr(request, 'accepted_media_type', ''), version.parts))
+    return quote_etag(hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest())
+
+
+def conditional_get(version_func: Callable[..., Optional[Version]]):
+    """Answer GET/HEAD with 304 when the client's copy is current; tag 200 responses.
+
+    ``version_func`` gets the view's arguments and returns a ``Version``,
+    or None to run the view unconditionally (e.g. a missing row, so the
+    view can answer 404). The version is read before the view, so a
+    concurrent write can only pair an older ETag with a newer body, which
+    costs the client one extra full response and never a stale 304.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            version = version_func(request, *args, **kwargs)
+            if version is None:
+                return view(request, *args, **kwargs)
+            etag = _etag(request, version)
+            last_modified = timegm(version.last_modified.utctimetuple()) if version.last_modified else None
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = view(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+            response.headers.setdefault('ETag', etag)
+            if last_modified is not None:
+                response.headers.setdefault('Last-Modified', http_date(last_modified))
+            # Revalidate on every poll instead of reusing a heuristically fresh copy
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return wrapped
+    return decorator
+
+
+def vehicle_version(request, pk) -> Optional[Version]:
+    row = Vehicle.objects.filter(id=pk).values_list('updated_at', flat=True).first()
+    return Version((row,), row) if row else None
+
+
+def application_version(request, pk) -> Optional[Version]:
+    """The application and its vehicle's ``updated_at``, plus the applicant fields shown.
+
+    User has no version column, so the few applicant columns the response
+    embeds are part of the ETag. Last-Modified only follows the
+    application and vehicle.
+    """
+    applicant_fields = [f'applicant__{name}' for name in UserSerializer.Meta.fields]
+    row = (
+        DriverApplication.objects.filter(id=pk)
+        .values_list('updated_at', 'vehicle__updated_at', *applicant_fields)
+        .first()
+    )
+    if row is None:
+        return None
+    return Version(row, max(row[0], row[1]))
+
+
+def kyc_version(request) -> Optional[Version]:
+    user_id, allowed = scoped_subject(request, request.query_params.get('user'))
+    if not user_id or not allowed:
+        return None  # The view answers 400 / 403
+    try:
+        updated_at = KYC.objects.filter(user_id=user_id).values_list('updated_at', flat=True).first()
+    except (ValidationError, ValueError):
+        return None  # Malformed id; the view reports it
+    if updated_at is None:
+        return Version(('NOT_SUBMITTED',))
+    return Version((updated_at,), updated_at)
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import csv
+import tempfile
+from itertools import islice
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import AsyncIterable, AsyncIterator, Callable, Iterable, Iterator, Optional, Sequence, Tuple
+
+from asgiref.sync import sync_to_async
+from django.utils import timezone
+
+from .models import DriverApplication, Payment, Vehicle
+
+CHUNK_SIZE = 2000
+FORMATS = ('csv', 'xlsx')
+# Leading characters a spreadsheet would evaluate as a formula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+@dataclass(frozen=True)
+class ExportSpec:
+    queryset: Callable
+    columns: Sequence[Tuple[str, str]]  # (header, values_list lookup)
+    date_field: str
+    owner_field: str
+
+
+EXPORTS = {
+    'applications': ExportSpec(
+        queryset=lambda: DriverApplication.objects.all(),
+        columns=(
+            ('id', 'id'),
+            ('applicant', 'applicant__username'),
+            ('vehicle', 'vehicle__registration_number'),
+            ('status', 'status'),
+            ('risk_score', 'risk_score'),
+            ('application_date', 'application_date'),
+            ('decision_date', 'decision_date'),
+        ),
+        date_field='application_date',
+        owner_field='vehicle__owner_id',
+    ),
+    'payments': ExportSpec(
+        queryset=lambda: Payment.objects.all(),
+        columns=(
+            ('transaction_id', 'transaction_id'),
+            ('vehicle', 'vehicle__registration_number'),
+            ('driver', 'driver__username'),
+            ('amount', 'amount'),
+            ('status', 'status'),
+            ('payment_date', 'payment_date'),
+        ),
+        date_field='payment_date',
+        owner_field='vehicle__owner_id',
+    ),
+    'vehicles': ExportSpec(
+        queryset=lambda: Vehicle.objects.all(),
+        columns=(
+            ('id', 'id'),
+            ('registration_number', 'registration_number'),
+            ('vehicle_type', 'vehicle_type'),
+            ('model_name', 'model_name'),
+            ('driver', 'driver__username'),
+            ('total_cost', 'total_cost'),
+            ('amount_paid', 'amount_paid'),
+            ('repayment_duration', 'repayment_duration'),
+            ('total_receivable', 'total_receivable'),
+            ('weekly_returns', 'weekly_returns'),
+            ('is_active', 'is_active'),
+            ('is_fully_paid', 'is_fully_paid'),
+            ('created_at', 'created_at'),
+        ),
+        date_field='created_at',
+        owner_field='owner_id',
+    ),
+}
+
+
+def export_rows(kind: str, owner_id=None, since: Optional[date] = None, until: Optional[date] = None) -> Iterator[tuple]:
+    """Stream an export's rows as tuples, oldest first.
+
+    Uses a ``values_list`` projection over a server-side cursor, so memory
+    is bounded by CHUNK_SIZE rows however large the export is. ``since`` and
+    ``until`` are inclusive local dates, applied as datetime bounds so the
+    date column's index stays usable.
+    """
+    spec = EXPORTS[kind]
+    rows = spec.queryset()
+    if owner_id is not None:
+        rows = rows.filter(**{spec.owner_field: owner_id})
+    if since is not None:
+        rows = rows.filter(**{f'{spec.date_field}__gte': _start_of_day(since)})
+    if until is not None:
+        rows = rows.filter(**{f'{spec.date_field}__lt': _start_of_day(until + timedelta(days=1))})
+    rows = rows.order_by(spec.date_field, 'id').values_list(*[lookup for _, lookup in spec.columns])
+    return rows.iterator(chunk_size=CHUNK_SIZE)
+
+
+async def aexport_rows(kind: str, owner_id=None, since: Optional[date] = None, until: Optional[date] = None) -> AsyncIterator[tuple]:
+    """Async ``export_rows``, for responses streamed by an ASGI server.
+
+    Pulls CHUNK_SIZE rows at a time from the same server-side cursor on the
+    thread that owns the connection. (``QuerySet.aiterator()`` runs a
+    multi-column ``values_list`` query in the async context, which Django
+    refuses.)
+    """
+    rows = export_rows(kind, owner_id, since, until)
+    while True:
+        chunk = await sync_to_async(_next_chunk)(rows)
+        for row in chunk:
+            yield row
+        if len(chunk) < CHUNK_SIZE:
+            break
+
+
+def _next_chunk(rows: Iterator[tuple]) -> list:
+    return list(islice(rows, CHUNK_SIZE))
+
+
+def headers(kind: str) -> list:
+    return [header for header, _ in EXPORTS[kind].columns]
+
+
+def _start_of_day(day: date) -> datetime:
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _cell(value) -> str:
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.isoformat()
+    text = str(value)
+    if text.startswith(FORMULA_PREFIXES) and not _is_number(text):
+        return "'" + text
+    return text
+
+
+def _is_number(text: str) -> bool:
+    try:
+        float(text)
+    except ValueError:
+        return False
+    return True
+
+
+class _Echo:
+    """File-like object whose write() hands the line back to the caller."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(header: Sequence[str], rows: Iterable[tuple]) -> Iterator[str]:
+    """Yield CSV lines one at a time, header first."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow([_cell(value) for value in row])
+
+
+async def aiter_csv(header: Sequence[str], rows: AsyncIterable[tuple]) -> AsyncIterator[str]:
+    """Async ``iter_csv``.
+
+    Under ASGI, Django reads a synchronous streaming body into memory
+    before sending any of it, so ASGI responses must stream from this.
+    """
+    writer = csv.writer(_Echo())
+    yield writer.writerow(header)
+    async for row in rows:
+        yield writer.writerow([_cell(value) for value in row])
+
+
+def write_xlsx(header: Sequence[str], rows: Iterable[tuple]):
+    """Write rows to a temporary .xlsx file and return it rewound.
+
+    Requires the optional ``openpyxl`` package. The write-only workbook
+    spools rows to disk, so memory stays flat, but the zip container means
+    nothing can be sent before the last row is written.
+    """
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        raise ImportError("XLSX export requires the 'openpyxl' package.")
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(list(header))
+    for row in rows:
+        sheet.append([
+            timezone.make_naive(value) if isinstance(value, datetime) and timezone.is_aware(value) else _xlsx_value(value)
+            for value in row
+        ])
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+    return output
+
+
+def _xlsx_value(value):
+    # UUIDs and Decimals are not native cell types; keep numbers numeric.
+    if value is None or isinstance(value, (bool, int, float, date)):
+        return value
+    if isinstance(value, Decimal):
+        return float(value)
+    return _cell(value)
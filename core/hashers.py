@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class TunablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2-SHA256 with the work factor taken from PASSWORD_PBKDF2_ITERATIONS.
+
+    Keeps the ``pbkdf2_sha256`` algorithm name, so it verifies every
+    existing hash and replaces the stock hasher in PASSWORD_HASHERS. When
+    the setting changes, ``must_update`` flags hashes stored with another
+    count and Django rehashes them on the user's next successful login.
+    """
+
+    @property
+    def iterations(self):
+        return getattr(settings, 'PASSWORD_PBKDF2_ITERATIONS', PBKDF2PasswordHasher.iterations)
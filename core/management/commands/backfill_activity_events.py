@@ -0,0 +1,98 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.activity import application_event, kyc_event, payment_event
+from core.models import KYC, ActivityEvent, DriverApplication, Payment
+
+
+class Command(BaseCommand):
+    help = (
+        "Create ActivityEvent rows for KYC, application and payment history "
+        "recorded before the timeline existed. Rows that already have an event "
+        "are skipped, so the command can be re-run safely."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Source rows read and events inserted per batch (default: 2000).',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        sources = [
+            ('KYC', KYC.objects.order_by('submitted_at', 'id'), self._kyc_events),
+            (
+                'application',
+                DriverApplication.objects.select_related('vehicle').only(
+                    'id', 'applicant_id', 'status', 'application_date', 'decision_date',
+                    'vehicle__id', 'vehicle__registration_number',
+                ).order_by('application_date', 'id'),
+                self._application_events,
+            ),
+            (
+                'payment',
+                Payment.objects.select_related('vehicle').only(
+                    'id', 'driver_id', 'status', 'amount', 'payment_date',
+                    'vehicle__id', 'vehicle__registration_number',
+                ).order_by('payment_date', 'id'),
+                self._payment_events,
+            ),
+        ]
+        total = 0
+        for label, queryset, build in sources:
+            created = 0
+            batch = []
+            for row in queryset.iterator(chunk_size=batch_size):
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    created += self._write(batch, build, batch_size)
+                    batch = []
+            if batch:
+                created += self._write(batch, build, batch_size)
+            self.stdout.write(f"{label}: {created} event(s) created")
+            total += created
+
+        self.stdout.write(self.style.SUCCESS(f"Backfilled {total} activity event(s)."))
+
+    def _write(self, rows, build, batch_size):
+        existing = set(
+            ActivityEvent.objects.filter(object_id__in=[row.pk for row in rows]).values_list('object_id', flat=True)
+        )
+        events = [event for row in rows if row.pk not in existing for event in build(row)]
+        with transaction.atomic():
+            ActivityEvent.objects.bulk_create(events, batch_size=batch_size)
+        return len(events)
+
+    def _kyc_events(self, kyc):
+        submitted = kyc_event(kyc, created=True)
+        if not kyc.verified_at:
+            yield submitted
+            return
+        # submit_kyc always leaves the row UNDER_REVIEW; the decision follows.
+        submitted.status = KYC.VerificationStatus.UNDER_REVIEW
+        submitted.description = 'Status: Under Review'
+        yield submitted
+        decided = kyc_event(kyc)
+        decided.occurred_at = kyc.verified_at
+        yield decided
+
+    def _application_events(self, application):
+        registration_number = application.vehicle.registration_number
+        submitted = application_event(application, registration_number, created=True)
+        if application.status == DriverApplication.ApplicationStatus.PENDING:
+            yield submitted
+            return
+        # The original PENDING state is not stored, so the submission event
+        # carries it explicitly before the decision event.
+        submitted.status = DriverApplication.ApplicationStatus.PENDING
+        submitted.description = f'{registration_number} • Status: Pending'
+        yield submitted
+        decided = application_event(application, registration_number)
+        decided.occurred_at = application.decision_date or application.application_date
+        yield decided
+
+    def _payment_events(self, payment):
+        yield payment_event(payment, payment.vehicle.registration_number)
@@ -0,0 +1,136 @@
+import json
+from datetime import datetime
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.models import DriverApplication
+from core.risk_features import iter_application_snapshots
+from core.risk_model import (
+    LinearModel,
+    LogisticModel,
+    _get_linear_coeffs,
+    _get_logistic_coeffs,
+    _linear_feature_matrix,
+    _logistic_feature_matrix,
+    get_linear_model,
+    get_logistic_model,
+)
+
+CATEGORY_EDGES = ((750, 'Excellent'), (650, 'Good'), (550, 'Fair'), (300, 'Poor'))
+
+
+def _load_json(path):
+    try:
+        with open(path, encoding='utf-8') as fh:
+            return json.load(fh)
+    except (OSError, ValueError) as exc:
+        raise CommandError(f"Cannot read {path}: {exc}")
+
+
+def _parse_date(value, name):
+    try:
+        return timezone.make_aware(datetime.strptime(value, '%Y-%m-%d'))
+    except ValueError:
+        raise CommandError(f"--{name} must be YYYY-MM-DD")
+
+
+class Command(BaseCommand):
+    help = (
+        "Backtest risk-model coefficient variants against the application history using "
+        "point-in-time features, printing score distributions and approval-rate deltas."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--logistic-config',
+            help='JSON file with a RISK_LOGISTIC_CONFIG-style dict or a train_risk_model artifact.',
+        )
+        parser.add_argument('--linear-config', help='JSON file with a RISK_LINEAR_CONFIG-style dict.')
+        parser.add_argument(
+            '--threshold',
+            type=int,
+            default=650,
+            help='Score at or above which an application counts as approved (default: 650).',
+        )
+        parser.add_argument('--since', help='Only applications on/after this date (YYYY-MM-DD).')
+        parser.add_argument('--until', help='Only applications before this date (YYYY-MM-DD).')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Applications per streamed chunk.')
+
+    def handle(self, *args, **options):
+        models = {
+            'logistic': [('current', get_logistic_model())],
+            'linear': [('current', get_linear_model())],
+        }
+        if options['logistic_config']:
+            cfg = _load_json(options['logistic_config'])
+            if cfg.get('model') == 'logistic':
+                variant = LogisticModel.from_config(cfg, version=cfg.get('version'))
+            else:
+                variant = LogisticModel.from_config(_get_logistic_coeffs(cfg))
+            models['logistic'].append(('variant', variant))
+        if options['linear_config']:
+            models['linear'].append(('variant', LinearModel.from_config(_get_linear_coeffs(_load_json(options['linear_config'])))))
+
+        apps = DriverApplication.objects.all()
+        if options['since']:
+            apps = apps.filter(application_date__gte=_parse_date(options['since'], 'since'))
+        if options['until']:
+            apps = apps.filter(application_date__lt=_parse_date(options['until'], 'until'))
+
+        scores = {(kind, label): [] for kind, variants in models.items() for label, _ in variants}
+        statuses = []
+        for batch in iter_application_snapshots(apps, chunk_size=max(1, options['chunk_size'])):
+            features = [snap.features for snap in batch]
+            vehicles = [snap.vehicle for snap in batch]
+            statuses.extend(snap.status for snap in batch)
+            X_log = _logistic_feature_matrix(features, vehicles)
+            X_lin = _linear_feature_matrix(features, vehicles)
+            for label, model in models['logistic']:
+                scores[('logistic', label)].append(model.score_matrix(X_log)[2].astype(np.int16))
+            for label, model in models['linear']:
+                scores[('linear', label)].append(model.score_matrix(X_lin).astype(np.int16))
+
+        if not statuses:
+            self.stdout.write('No applications in range.')
+            return
+
+        statuses = np.array(statuses, dtype=object)
+        decided = statuses != DriverApplication.ApplicationStatus.PENDING
+        historical = statuses == DriverApplication.ApplicationStatus.APPROVED
+        threshold = options['threshold']
+        self.stdout.write(f"Applications: {statuses.size} ({int(decided.sum())} decided)")
+        if decided.any():
+            self.stdout.write(f"Historical approval rate (decided): {historical[decided].mean():.1%}")
+        self.stdout.write(f"Approval threshold: score >= {threshold}")
+
+        for kind, variants in models.items():
+            self.stdout.write('')
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{kind.title()} model"))
+            baseline_rate = None
+            for label, model in variants:
+                s = np.concatenate(scores[(kind, label)]).astype(np.int64)
+                approved = s >= threshold
+                rate = approved.mean()
+                p10, p25, p50, p75, p90 = np.percentile(s, [10, 25, 50, 75, 90])
+                self.stdout.write(f"  {label} [{model.version}]")
+                self.stdout.write(
+                    f"    mean {s.mean():.1f}  p10 {p10:.0f}  p25 {p25:.0f}  p50 {p50:.0f}  "
+                    f"p75 {p75:.0f}  p90 {p90:.0f}"
+                )
+                counts = []
+                upper = 851
+                for edge, name in CATEGORY_EDGES:
+                    counts.append(f"{name} {int(((s >= edge) & (s < upper)).sum())}")
+                    upper = edge
+                self.stdout.write(f"    categories: {', '.join(counts)}")
+                line = f"    approval rate {rate:.1%}"
+                if baseline_rate is None:
+                    baseline_rate = rate
+                else:
+                    line += f" (delta vs current {(rate - baseline_rate) * 100:+.1f} pts)"
+                if decided.any():
+                    agreement = (approved[decided] == historical[decided]).mean()
+                    line += f"; agrees with historical decisions {agreement:.1%}"
+                self.stdout.write(line)
@@ -0,0 +1,122 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmark import (
+    ASYNC_SUFFIX,
+    SCENARIO_NAMES,
+    compare,
+    load_baseline,
+    run_benchmarks,
+    save_baseline,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the API routes through Django's test client against the current "
+        "database (see generate_synthetic_data). Reports p50/p95/p99 latency, throughput "
+        "and queries per request; write routes run in a transaction that is rolled back. "
+        "Save a run with --save and check a later one against it with --compare."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'scenarios', nargs='*', metavar='scenario',
+            help=f"Scenarios to run (default: all). Choices: {', '.join(SCENARIO_NAMES)}.",
+        )
+        parser.add_argument('--iterations', type=int, default=200, help='Timed requests per scenario (default: 200).')
+        parser.add_argument('--warmup', type=int, default=20, help='Untimed requests per scenario (default: 20).')
+        parser.add_argument('--samples', type=int, default=10, help='Owners/vehicles to rotate through (default: 10).')
+        parser.add_argument(
+            '--password', default='',
+            help='Password of the generated users (generate_synthetic_data --password). '
+                 'The login scenario is skipped without it.',
+        )
+        parser.add_argument(
+            '--asgi', action='store_true',
+            help='Run the scenarios that have an async variant through both the WSGI and '
+                 'ASGI handlers and compare requests/sec per worker.',
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=10,
+            help='Requests in flight at once on the ASGI worker (default: 10).',
+        )
+        parser.add_argument('--save', metavar='PATH', help='Write the results as a JSON baseline.')
+        parser.add_argument('--compare', metavar='PATH', help='Compare the results with a saved baseline.')
+        parser.add_argument(
+            '--threshold', type=float, default=0.2,
+            help='Relative p50/p95 increase counted as a regression in --compare (default: 0.2).',
+        )
+
+    def handle(self, *args, **options):
+        unknown = set(options['scenarios']) - set(SCENARIO_NAMES)
+        if unknown:
+            raise CommandError(f"Unknown scenario(s): {', '.join(sorted(unknown))}.")
+        if options['iterations'] < 1:
+            raise CommandError('--iterations must be positive.')
+        baseline = None
+        if options['compare']:
+            try:
+                baseline = load_baseline(options['compare'])
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Cannot read baseline: {e}")
+
+        self.stdout.write(
+            f"{'scenario':<28} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>8} {'queries':>8}  statuses"
+        )
+        try:
+            document = run_benchmarks(
+                names=options['scenarios'] or None,
+                iterations=options['iterations'],
+                warmup=max(0, options['warmup']),
+                samples=max(1, options['samples']),
+                password=options['password'],
+                asgi=options['asgi'],
+                concurrency=max(1, options['concurrency']),
+                progress=self._report,
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if document['meta']['skipped']:
+            self.stdout.write(
+                f"Skipped {', '.join(document['meta']['skipped'])}: pass --password to include it."
+            )
+        if options['asgi']:
+            self._compare_handlers(document['results'])
+        if options['save']:
+            save_baseline(document, options['save'])
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {options['save']}."))
+        if baseline is not None:
+            self._compare(baseline, document, options['threshold'])
+
+    def _report(self, name, result):
+        statuses = ' '.join(f'{code}x{count}' for code, count in sorted(result['statuses'].items()))
+        queries = '-' if result['queries_per_request'] is None else f"{result['queries_per_request']:.1f}"
+        self.stdout.write(
+            f"{name:<28} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f} "
+            f"{result['throughput_rps']:>8.1f} {queries:>8}  {statuses}"
+        )
+
+    def _compare_handlers(self, results):
+        self.stdout.write('\nRequests/sec per worker, WSGI vs ASGI:')
+        for name, result in results.items():
+            async_result = results.get(name + ASYNC_SUFFIX)
+            if async_result is None:
+                continue
+            wsgi, asgi = result['throughput_rps'], async_result['throughput_rps']
+            ratio = f'x{asgi / wsgi:.2f}' if wsgi else '-'
+            self.stdout.write(f"{name:<28} {wsgi:>8.1f} -> {asgi:>8.1f}  {ratio}")
+
+    def _compare(self, baseline, document, threshold):
+        rows = compare(baseline, document, threshold)
+        self.stdout.write(f"\nCompared with baseline from {baseline['meta'].get('created_at', 'unknown')}:")
+        regressed = [row for row in rows if row['regressions']]
+        for row in rows:
+            line = f"{row['name']:<28} p95 {row['p95_before']:>9.2f} -> {row['p95_after']:>9.2f} ({row['change']:+.0%})"
+            if row['regressions']:
+                self.stdout.write(self.style.ERROR(f"{line}  REGRESSION: {'; '.join(row['regressions'])}"))
+            else:
+                self.stdout.write(line)
+        if regressed:
+            raise CommandError(f"{len(regressed)} scenario(s) regressed beyond {threshold:.0%}.")
+        self.stdout.write(self.style.SUCCESS('No regressions.'))
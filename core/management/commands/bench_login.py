@@ -0,0 +1,70 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client, RequestFactory
+from django.test.utils import override_settings
+
+from core.benchmark import Scenario, run_scenario
+from core.models import User
+from core.ratelimit import clear_login_limits, login_keys
+
+PASSWORD = 'bench-login-Passw0rd!'
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure /api/login/ latency and logins/sec per CPU for several PBKDF2 work "
+        "factors, plus the cost of a rate-limited (429) attempt. Runs against the current "
+        "database inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--work-factors', default=f"100000,300000,{settings.PASSWORD_PBKDF2_ITERATIONS}",
+            help='Comma-separated PBKDF2 iteration counts to compare '
+                 '(default: 100000,300000 and the configured count).',
+        )
+        parser.add_argument('--iterations', type=int, default=30, help='Timed logins per work factor (default: 30).')
+        parser.add_argument('--warmup', type=int, default=3, help='Untimed logins per work factor (default: 3).')
+
+    def handle(self, *args, **options):
+        try:
+            factors = [int(value) for value in options['work_factors'].split(',') if value.strip()]
+        except ValueError:
+            raise CommandError('--work-factors must be comma-separated integers.')
+        if not factors or min(factors) < 1 or options['iterations'] < 1:
+            raise CommandError('--work-factors and --iterations must be positive.')
+
+        self.stdout.write(f"{'work factor':>12} {'p50 ms':>9} {'p95 ms':>9} {'logins/s':>9} {'queries':>8}  statuses")
+        with override_settings(DEBUG=False, ALLOWED_HOSTS=['testserver']):
+            client = Client(raise_request_exception=False)
+            for factor in factors:
+                result = self._run(client, factor, PASSWORD, options['iterations'], max(0, options['warmup']))
+                self._report(f'{factor:,}', result)
+            # Once an email is over its failure limit, attempts are refused before hashing.
+            limit = settings.LOGIN_FAILURE_LIMITS.get('email', 0)
+            result = self._run(client, factors[-1], 'wrong-password', options['iterations'], limit)
+            self._report('throttled', result)
+
+    def _run(self, client, factor, password, iterations, warmup):
+        email = f'bench-login-{factor}@example.com'
+        scenario = Scenario(
+            'login', 'POST', lambda _: ('/api/login/', {'email': email, 'password': password}), writes=True,
+        )
+        try:
+            with override_settings(PASSWORD_PBKDF2_ITERATIONS=factor), transaction.atomic():
+                User.objects.create_user(
+                    username=f'bench-login-{factor}', email=email, password=PASSWORD, role=User.Role.DRIVER,
+                )
+                result = run_scenario(client, scenario, [None], iterations, warmup)
+                transaction.set_rollback(True)
+        finally:
+            clear_login_limits(login_keys(RequestFactory().post('/api/login/'), email))
+        return result
+
+    def _report(self, label, result):
+        statuses = ' '.join(f'{code}x{count}' for code, count in sorted(result['statuses'].items()))
+        self.stdout.write(
+            f"{label:>12} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {result['throughput_rps']:>9.1f} "
+            f"{result['queries_per_request']:>8.1f}  {statuses}"
+        )
@@ -0,0 +1,73 @@
+import io
+import timeit
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from core.risk_features import DriverFeatures
+from core.risk_model import (
+    LOGISTIC_FEATURES,
+    LogisticModel,
+    _get_logistic_coeffs,
+    _logistic_feature_matrix,
+    _score_category,
+    _should_trace,
+    get_logistic_model,
+)
+
+SAMPLE_FEATURES = DriverFeatures(
+    kyc_status='APPROVED',
+    date_of_birth=date(1990, 5, 17),
+    monthly_income=180000.0,
+    total_success=48,
+    total_failed=3,
+    failed_recent_6m=1,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Micro-benchmark the per-call overhead of logistic scoring (no database): "
+        "rebuilding config and printing traces vs. the compiled model with gated logging."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--number', type=int, default=20000, help='Calls per timing run (default: 20000).')
+        parser.add_argument('--repeat', type=int, default=5, help='Timing runs; the best is reported (default: 5).')
+
+    def handle(self, *args, **options):
+        sink = io.StringIO()
+
+        def legacy_call():
+            # Previous hot path: rebuild coefficients from settings and print two trace lines.
+            model = LogisticModel.from_config(_get_logistic_coeffs())
+            X = _logistic_feature_matrix([SAMPLE_FEATURES], [None])
+            z, probability, score = model.score_matrix(X)
+            features = dict(zip(LOGISTIC_FEATURES, X[0].tolist()))
+            print(f"[CREDIT LOGISTIC] user=bench features: {features}", file=sink)
+            print(
+                f"[CREDIT LOGISTIC] z={float(z[0]):.4f}, probability={float(probability[0]):.4f}, "
+                f"score={int(score[0])}, category={_score_category(int(score[0]))}",
+                file=sink,
+            )
+            sink.seek(0)
+            sink.truncate()
+
+        def compiled_call():
+            model = get_logistic_model()
+            X = _logistic_feature_matrix([SAMPLE_FEATURES], [None])
+            z, probability, score = model.score_matrix(X)
+            _score_category(int(score[0]))
+            _should_trace()
+
+        number, repeat = max(1, options['number']), max(1, options['repeat'])
+        results = {}
+        for label, fn in (('before (rebuild + print)', legacy_call), ('after (compiled + gated log)', compiled_call)):
+            best = min(timeit.repeat(fn, number=number, repeat=repeat))
+            results[label] = best / number * 1e6
+            self.stdout.write(f"{label:<32} {results[label]:8.2f} us/call")
+
+        before, after = results.values()
+        self.stdout.write(self.style.SUCCESS(
+            f"Per-call overhead saved: {before - after:.2f} us ({(1 - after / before) * 100:.1f}%)."
+        ))
@@ -0,0 +1,89 @@
+from datetime import datetime, time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from core.synthetic import DEFAULT_BATCH_SIZE, SyntheticDataGenerator, expected_payments_per_vehicle, prefix_in_use
+
+PER_VEHICLE = expected_payments_per_vehicle(156)
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a synthetic fleet for load testing: owners, vehicles of every type, "
+        "drivers with KYC in every state, applications, notifications and weekly payment "
+        "histories. Output is deterministic for a given --seed, --prefix and --as-of. "
+        f"About {PER_VEHICLE:.0f} payments are generated per vehicle for the default three-year "
+        f"history, so --owners 1200 --vehicles-per-owner 100 gives about "
+        f"{1200 * 100 * PER_VEHICLE / 1e6:.1f}M payments and 10M needs about "
+        f"{round(10e6 / PER_VEHICLE / 100, -2):,.0f} such owners. The run prints the estimate for its own --weeks."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--owners', type=int, default=100, help='Fleet owners to create (default: 100).')
+        parser.add_argument(
+            '--vehicles-per-owner', type=int, default=20, help='Vehicles per owner (default: 20).'
+        )
+        parser.add_argument(
+            '--weeks', type=int, default=156,
+            help='Length of the history in weeks; vehicles are bought across it (default: 156).',
+        )
+        parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0).')
+        parser.add_argument(
+            '--prefix', default='syn',
+            help='Prefix for usernames, registration and transaction numbers (default: syn). '
+                 'Use a new prefix to add a second data set alongside the first.',
+        )
+        parser.add_argument('--as-of', help='Date the history ends, YYYY-MM-DD (default: now).')
+        parser.add_argument(
+            '--password', help='Password for every generated user (default: unusable password).'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help=f'Rows per INSERT (default: {DEFAULT_BATCH_SIZE}).',
+        )
+        parser.add_argument(
+            '--no-activity', action='store_true',
+            help='Skip activity timeline rows (about halves the rows written).',
+        )
+
+    def handle(self, *args, **options):
+        if options['owners'] < 1 or options['vehicles_per_owner'] < 1 or options['weeks'] < 1:
+            raise CommandError('--owners, --vehicles-per-owner and --weeks must be positive.')
+        as_of = None
+        if options['as_of']:
+            day = parse_date(options['as_of'])
+            if day is None:
+                raise CommandError('--as-of must be a date in YYYY-MM-DD format.')
+            as_of = timezone.make_aware(datetime.combine(day, time.min))
+        prefix = options['prefix']
+        if prefix_in_use(prefix):
+            raise CommandError(f"Data with prefix '{prefix}' already exists; pass a different --prefix.")
+
+        estimate = options['owners'] * options['vehicles_per_owner'] * expected_payments_per_vehicle(options['weeks'])
+        self.stdout.write(f"Expecting about {estimate:,.0f} payment(s).")
+        generator = SyntheticDataGenerator(
+            owners=options['owners'],
+            vehicles_per_owner=options['vehicles_per_owner'],
+            history_weeks=options['weeks'],
+            seed=options['seed'],
+            prefix=prefix,
+            password=options['password'],
+            batch_size=max(1, options['batch_size']),
+            activity=not options['no_activity'],
+            as_of=as_of,
+            progress=self._progress,
+        )
+        result = generator.run()
+        rate = result.payments / result.elapsed if result.elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {result.owners} owner(s), {result.vehicles} vehicle(s), {result.drivers} driver(s), "
+            f"{result.kycs} KYC(s), {result.applications} application(s), {result.notifications} "
+            f"notification(s), {result.payments} payment(s) and {result.activity_events} activity event(s) "
+            f"in {result.elapsed:.1f}s ({rate:.0f} payments/s)."
+        ))
+        self.stdout.write("Run 'update_portfolio_rollups --rebuild' to refresh portfolio rollups.")
+
+    def _progress(self, result):
+        self.stdout.write(f"  {result.owners} owner(s), {result.payments} payment(s)...")
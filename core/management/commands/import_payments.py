@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.payment_import import DEFAULT_CHUNK_SIZE, FORMATS, detect_format, import_payments, iter_records
+
+
+class Command(BaseCommand):
+    help = "Import a gateway settlement file (CSV or JSONL) of payments in chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Settlement file to import.')
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            help='File format; detected from the extension when omitted.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help=f'Rows validated and inserted per transaction (default: {DEFAULT_CHUNK_SIZE}).',
+        )
+
+    def handle(self, *args, **options):
+        fmt = options['format'] or detect_format(name=options['path'])
+        if fmt is None:
+            raise CommandError('Cannot tell the file format; pass --format csv or --format jsonl.')
+        try:
+            with open(options['path'], newline='', encoding='utf-8-sig') as stream:
+                result = import_payments(iter_records(stream, fmt), chunk_size=max(1, options['chunk_size']))
+        except OSError as e:
+            raise CommandError(str(e))
+
+        for error in result.errors:
+            self.stderr.write(f"line {error['line']}: {error['error']}")
+        if result.invalid > len(result.errors):
+            self.stderr.write(f"... {result.invalid - len(result.errors)} more invalid row(s)")
+        self.stdout.write(self.style.SUCCESS(
+            f"{result.rows} row(s) read: {result.inserted} inserted, {result.duplicates} duplicate(s), "
+            f"{result.invalid} invalid in {result.elapsed:.2f}s ({result.rows_per_sec:.0f} rows/sec)."
+        ))
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from core.models import DriverPaymentStats, Payment
+from core.payment_stats import rebuild_driver_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild DriverPaymentStats from the Payment table (backfill or repair)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--driver',
+            action='append',
+            dest='drivers',
+            default=[],
+            help='Driver id to rebuild; may be repeated. Defaults to every driver.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of drivers rebuilt per batch (default: 1000).',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        if options['drivers']:
+            driver_ids = options['drivers']
+        else:
+            with_payments = Payment.objects.values_list('driver_id', flat=True).distinct().order_by()
+            with_stats = DriverPaymentStats.objects.values_list('driver_id', flat=True)
+            driver_ids = list(dict.fromkeys(list(with_payments) + list(with_stats)))
+
+        written = 0
+        for start in range(0, len(driver_ids), batch_size):
+            written += rebuild_driver_stats(driver_ids[start:start + batch_size])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt payment stats for {len(driver_ids)} driver(s); {written} row(s) written."
+        ))
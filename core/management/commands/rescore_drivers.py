@@ -0,0 +1,69 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.models import DriverApplication
+from core.risk_model import score_drivers_logistic
+
+
+class Command(BaseCommand):
+    help = "Re-score driver applications in batches with the logistic risk model."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Re-score every application instead of only PENDING ones.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of applications scored per batch (default: 1000).',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Compute scores without saving them.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        apps = DriverApplication.objects.select_related('vehicle').only(
+            'id', 'applicant_id', 'risk_score', 'vehicle__weekly_returns'
+        ).order_by('application_date', 'id')
+        if not options['all']:
+            apps = apps.filter(status=DriverApplication.ApplicationStatus.PENDING)
+
+        scored = 0
+        changed = 0
+        batch = []
+        for app in apps.iterator(chunk_size=batch_size):
+            batch.append(app)
+            if len(batch) >= batch_size:
+                changed += self._score_batch(batch, options['dry_run'])
+                scored += len(batch)
+                batch = []
+        if batch:
+            changed += self._score_batch(batch, options['dry_run'])
+            scored += len(batch)
+
+        suffix = ' (dry run)' if options['dry_run'] else ''
+        self.stdout.write(self.style.SUCCESS(
+            f"Scored {scored} application(s); {changed} risk score(s) changed{suffix}."
+        ))
+
+    def _score_batch(self, batch, dry_run):
+        results = score_drivers_logistic(
+            [app.applicant_id for app in batch],
+            vehicles=[app.vehicle for app in batch],
+        )
+        now = timezone.now()
+        updated = []
+        for app, result in zip(batch, results):
+            if app.risk_score != result['score']:
+                app.risk_score = result['score']
+                app.updated_at = now
+                updated.append(app)
+        if updated and not dry_run:
+            DriverApplication.objects.bulk_update(updated, ['risk_score', 'updated_at'])
+        return len(updated)
@@ -0,0 +1,138 @@
+import hashlib
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.risk_model import LOGISTIC_FEATURES
+from core.risk_training import fit_logistic_irls, iter_training_chunks, predict_proba, roc_auc
+
+
+class Command(BaseCommand):
+    help = (
+        "Fit the logistic risk model from historical applications and payments and "
+        "write a versioned coefficient artifact (see RISK_LOGISTIC_ARTIFACT)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output-dir',
+            default=str(Path(settings.BASE_DIR) / 'risk_models'),
+            help='Directory for the artifact (default: BASE_DIR/risk_models, which git ignores).',
+        )
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Applications per streamed chunk.')
+        parser.add_argument('--min-payments', type=int, default=4, help='Payments needed before an outcome is known.')
+        parser.add_argument(
+            '--max-failed-ratio',
+            type=float,
+            default=0.1,
+            help='Largest failed-payment share still labelled creditworthy (default: 0.1).',
+        )
+        parser.add_argument('--holdout', type=float, default=0.2, help='Fraction held out for AUC (default: 0.2).')
+        parser.add_argument('--l2', type=float, default=1e-4, help='L2 penalty on coefficients.')
+        parser.add_argument('--max-iter', type=int, default=25, help='Maximum IRLS iterations.')
+        parser.add_argument('--seed', type=int, default=0, help='Seed for the holdout split.')
+        parser.add_argument(
+            '--current-stats',
+            action='store_true',
+            help="Use today's payment stats as features instead of rebuilding them as of each "
+                 "application date. They include the payments that decide the label, so the "
+                 "metrics are inflated; for comparison only, not for artifacts you deploy.",
+        )
+
+    def handle(self, *args, **options):
+        if options['current_stats']:
+            self.stderr.write(self.style.WARNING(
+                'Training on current payment stats: the outcome payments leak into the features, '
+                'so AUC is overstated and the artifact should not be deployed.'
+            ))
+        load_start = time.perf_counter()
+        X_parts, y_parts = [], []
+        for X_chunk, y_chunk in iter_training_chunks(
+            chunk_size=max(1, options['chunk_size']),
+            min_payments=options['min_payments'],
+            max_failed_ratio=options['max_failed_ratio'],
+            current_stats=options['current_stats'],
+        ):
+            X_parts.append(X_chunk)
+            y_parts.append(y_chunk)
+        if not X_parts:
+            raise CommandError('No approved applications with a repayment outcome to train on.')
+        X = np.vstack(X_parts)
+        y = np.concatenate(y_parts)
+        del X_parts, y_parts
+        load_seconds = time.perf_counter() - load_start
+
+        if y.min() == y.max():
+            raise CommandError('Training data contains only one outcome class; cannot fit.')
+
+        rng = np.random.default_rng(options['seed'])
+        holdout_mask = rng.random(y.size) < max(0.0, min(0.9, options['holdout']))
+        train_mask = ~holdout_mask
+        if y[train_mask].min() == y[train_mask].max():
+            train_mask[:] = True
+            holdout_mask[:] = False
+
+        fit_start = time.perf_counter()
+        fit = fit_logistic_irls(X[train_mask], y[train_mask], l2=options['l2'], max_iter=options['max_iter'])
+        fit_seconds = time.perf_counter() - fit_start
+
+        auc_train = roc_auc(y[train_mask], predict_proba(fit, X[train_mask]))
+        auc_holdout = roc_auc(y[holdout_mask], predict_proba(fit, X[holdout_mask])) if holdout_mask.any() else None
+
+        trained_at = timezone.now()
+        digest = hashlib.sha1(
+            json.dumps({'intercept': fit.intercept, 'coeffs': fit.coeffs}, sort_keys=True).encode()
+        ).hexdigest()[:8]
+        version = f"{trained_at:%Y%m%d%H%M%S}-{digest}"
+        artifact = {
+            'model': 'logistic',
+            'version': version,
+            'trained_at': trained_at.isoformat(),
+            'features': list(LOGISTIC_FEATURES),
+            'intercept': fit.intercept,
+            'coeffs': fit.coeffs,
+            'metrics': {
+                'rows': int(y.size),
+                'train_rows': int(train_mask.sum()),
+                'holdout_rows': int(holdout_mask.sum()),
+                'positive_rate': float(y.mean()),
+                'auc_train': auc_train,
+                'auc_holdout': auc_holdout,
+                'iterations': fit.iterations,
+                'converged': fit.converged,
+                'load_seconds': round(load_seconds, 3),
+                'fit_seconds': round(fit_seconds, 3),
+            },
+            'params': {
+                'min_payments': options['min_payments'],
+                'max_failed_ratio': options['max_failed_ratio'],
+                'l2': options['l2'],
+                'point_in_time': not options['current_stats'],
+            },
+        }
+
+        output_dir = Path(options['output_dir'])
+        output_dir.mkdir(parents=True, exist_ok=True)
+        path = output_dir / f"logistic-{version}.json"
+        path.write_text(json.dumps(artifact, indent=2), encoding='utf-8')
+
+        def fmt(value):
+            return 'n/a' if value is None else f"{value:.4f}"
+
+        self.stdout.write(
+            f"Rows: {y.size} (train {int(train_mask.sum())}, holdout {int(holdout_mask.sum())}), "
+            f"positive rate {y.mean():.3f}"
+        )
+        self.stdout.write(
+            f"Load {load_seconds:.2f}s, fit {fit_seconds:.3f}s in {fit.iterations} iteration(s)"
+            f"{'' if fit.converged else ' (not converged)'}"
+        )
+        self.stdout.write(f"AUC train {fmt(auc_train)}, holdout {fmt(auc_holdout)}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {path}. Set RISK_LOGISTIC_ARTIFACT to this path to score with it."
+        ))
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.rollups import reset_payment_rollups, update_portfolio_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Fold new payments into the portfolio rollups and refresh fleet financials. "
+        "Run every few minutes (e.g. from cron); each run only reads payments since "
+        "the previous watermark."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Recompute fleet financials for every owner, not only those with changes.',
+        )
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Drop payment rollups and rebuild them from all payments '
+                 '(after payments were edited or deleted).',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        if options['rebuild']:
+            reset_payment_rollups()
+        result = update_portfolio_rollups(full=options['full'] or options['rebuild'])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Payments rolled up for {result['payment_owners']} owner(s); "
+            f"fleet financials refreshed for {result['vehicle_owners']} owner(s) "
+            f"({result['vehicle_rows']} row(s)) in {elapsed:.2f}s."
+        ))
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack
+from contextvars import ContextVar
+from typing import Dict, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import HttpResponse, HttpResponseNotFound
+
+# Histogram upper bounds (Prometheus ``le`` labels)
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+_current: ContextVar[Optional['RequestMetrics']] = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """Timings gathered while one request is handled."""
+
+    __slots__ = ('queries', 'db_time', 'serializer_time', 'serializer_depth')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializer_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper hook: time every query on this request
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.total = 0.0
+        self.samples = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.samples += 1
+
+
+class Registry:
+    """In-process histograms keyed by (metric, view name).
+
+    Each worker process keeps its own registry; Prometheus sums them when
+    every worker is scraped.
+    """
+
+    METRICS = {
+        'http_request_duration_seconds': ('Total time spent handling the request.', SECONDS_BUCKETS),
+        'db_query_duration_seconds': ('Time spent in SQL per request.', SECONDS_BUCKETS),
+        'db_queries_per_request': ('SQL queries issued per request.', QUERY_BUCKETS),
+        'serializer_duration_seconds': ('Time spent producing serializer data per request.', SECONDS_BUCKETS),
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, str], Histogram] = {}
+
+    def observe(self, view: str, total: float, metrics: RequestMetrics) -> None:
+        values = {
+            'http_request_duration_seconds': total,
+            'db_query_duration_seconds': metrics.db_time,
+            'db_queries_per_request': metrics.queries,
+            'serializer_duration_seconds': metrics.serializer_time,
+        }
+        with self._lock:
+            for name, value in values.items():
+                key = (name, view)
+                if key not in self._histograms:
+                    self._histograms[key] = Histogram(self.METRICS[name][1])
+                self._histograms[key].observe(value)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        with self._lock:
+            for name, (help_text, _) in self.METRICS.items():
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} histogram')
+                for (metric, view), hist in sorted(self._histograms.items()):
+                    if metric != name:
+                        continue
+                    label = view.replace('\\', '\\\\').replace('"', '\\"')
+                    cumulative = 0
+                    for bound, count in zip(hist.buckets + (float('inf'),), hist.counts):
+                        cumulative += count
+                        le = '+Inf' if bound == float('inf') else repr(float(bound))
+                        lines.append(f'{name}_bucket{{view="{label}",le="{le}"}} {cumulative}')
+                    lines.append(f'{name}_sum{{view="{label}"}} {hist.total!r}')
+                    lines.append(f'{name}_count{{view="{label}"}} {hist.samples}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+def _enabled() -> bool:
+    return bool(getattr(settings, 'REQUEST_METRICS_ENABLED', False))
+
+
+def _install_serializer_timing() -> None:
+    """Time DRF ``serializer.data`` calls against the current request.
+
+    Serializer and ListSerializer both build their output through
+    BaseSerializer.data, so wrapping that one property covers every
+    serializer; nested calls are only counted once.
+    """
+    from rest_framework.serializers import BaseSerializer
+
+    original = BaseSerializer.data
+    if getattr(original.fget, '_timed', False):
+        return
+
+    def data(self):
+        metrics = _current.get()
+        if metrics is None:
+            return original.fget(self)
+        metrics.serializer_depth += 1
+        started = time.perf_counter()
+        try:
+            return original.fget(self)
+        finally:
+            metrics.serializer_depth -= 1
+            if not metrics.serializer_depth:
+                metrics.serializer_time += time.perf_counter() - started
+
+    data._timed = True
+    BaseSerializer.data = property(data)
+
+
+class RequestMetricsMiddleware:
+    """Record query count, DB time, serializer time and latency per view.
+
+    Enabled by REQUEST_METRICS_ENABLED. Adds a Server-Timing header to every
+    response and feeds the histograms served by ``metrics_view``. Queries
+    are counted on the request thread's connections; an async view's ORM
+    calls run on worker threads and are not included.
+    """
+
+    def __init__(self, get_response):
+        if not _enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        _install_serializer_timing()
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total = time.perf_counter() - started
+
+        match = getattr(request, 'resolver_match', None)
+        view = (match.view_name if match else None) or 'unresolved'
+        if view != 'metrics':
+            registry.observe(view, total, metrics)
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.queries} queries"',
+            f'serialize;dur={metrics.serializer_time * 1000:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ])
+        return response
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint; 404 unless REQUEST_METRICS_ENABLED."""
+    if not _enabled():
+        return HttpResponseNotFound()
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.core.handlers.asgi import ASGIRequest
+
+
+def is_asgi(request) -> bool:
+    """True when ``request`` (a Django or DRF request) came in through backend/asgi.py.
+
+    Read from the flag ServerInterfaceMiddleware sets; False without it.
+    """
+    return getattr(request, 'is_asgi', False)
+
+
+class ServerInterfaceMiddleware:
+    """Flag each request with the interface that received it, as ``request.is_asgi``.
+
+    Sync views (including every DRF view) run the same way under WSGI and
+    ASGI; the flag lets them pick an async response body when an ASGI
+    server will stream it. DRF's Request passes the attribute through.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        request.is_asgi = isinstance(request, ASGIRequest)
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        return await self.get_response(request)
@@ -0,0 +1,81 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:37
+
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Q, Sum
+from django.utils import timezone
+
+# Same window as core.risk_features.RECENT_FAILURE_WINDOW at the time of writing
+RECENT_FAILURE_WINDOW = timedelta(days=6 * 30)
+BATCH_SIZE = 2000
+
+
+def build_payment_stats(apps, schema_editor):
+    """Fill the table from existing payments, as ``rebuild_payment_stats`` would."""
+    Payment = apps.get_model('core', 'Payment')
+    DriverPaymentStats = apps.get_model('core', 'DriverPaymentStats')
+    now = timezone.now()
+    failures = defaultdict(list)
+    recent = (
+        Payment.objects.filter(status='FAILED', payment_date__gte=now - RECENT_FAILURE_WINDOW)
+        .order_by('payment_date')
+        .values_list('driver_id', 'payment_date')
+    )
+    for driver_id, payment_date in recent.iterator(chunk_size=BATCH_SIZE):
+        failures[driver_id].append(payment_date.isoformat())
+    aggregates = (
+        Payment.objects.values('driver_id')
+        .annotate(
+            successful_count=Count('id', filter=Q(status='SUCCESSFUL')),
+            failed_count=Count('id', filter=Q(status='FAILED')),
+            total_amount=Sum('amount', filter=Q(status='SUCCESSFUL')),
+            last_payment_date=Max('payment_date'),
+        )
+        .order_by()
+    )
+    rows = []
+    for row in aggregates.iterator(chunk_size=BATCH_SIZE):
+        rows.append(DriverPaymentStats(
+            driver_id=row['driver_id'],
+            successful_count=row['successful_count'],
+            failed_count=row['failed_count'],
+            total_amount=row['total_amount'] or Decimal('0'),
+            last_payment_date=row['last_payment_date'],
+            recent_failures=failures.get(row['driver_id'], []),
+        ))
+        if len(rows) >= BATCH_SIZE:
+            DriverPaymentStats.objects.bulk_create(rows)
+            rows = []
+    DriverPaymentStats.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_notification'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DriverPaymentStats',
+            fields=[
+                ('driver', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='payment_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('successful_count', models.IntegerField(default=0)),
+                ('failed_count', models.IntegerField(default=0)),
+                ('total_amount', models.DecimalField(decimal_places=2, default=0.0, max_digits=14)),
+                ('last_payment_date', models.DateTimeField(blank=True, null=True)),
+                ('recent_failures', models.JSONField(blank=True, default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Driver Payment Stats',
+                'verbose_name_plural': 'Driver Payment Stats',
+            },
+        ),
+        migrations.RunPython(build_payment_stats, migrations.RunPython.noop),
+    ]
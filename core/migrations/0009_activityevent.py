@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:47
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_notification_feed_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityEvent',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('type', models.CharField(choices=[('KYC', 'KYC'), ('APPLICATION', 'Application'), ('PAYMENT', 'Payment')], max_length=50)),
+                ('object_id', models.UUIDField(db_index=True)),
+                ('status', models.CharField(blank=True, max_length=50)),
+                ('title', models.CharField(max_length=150)),
+                ('description', models.CharField(blank=True, max_length=255)),
+                ('occurred_at', models.DateTimeField()),
+                ('driver', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity_events', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ('-occurred_at',),
+                'indexes': [models.Index(fields=['driver', '-occurred_at', '-id'], name='activity_driver_time_idx')],
+            },
+        ),
+    ]
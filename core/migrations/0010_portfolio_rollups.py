@@ -0,0 +1,77 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:50
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_activityevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('value', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PaymentDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('vehicle_type', models.CharField(choices=[('KEKE', 'Keke'), ('BUS', 'Bus'), ('BIKE', 'Bike')], max_length=50)),
+                ('day', models.DateField()),
+                ('successful_count', models.IntegerField(default=0)),
+                ('failed_count', models.IntegerField(default=0)),
+                ('collected_amount', models.DecimalField(decimal_places=2, default=0.0, max_digits=14)),
+                ('failed_amount', models.DecimalField(decimal_places=2, default=0.0, max_digits=14)),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payment_daily_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('owner', 'vehicle_type', 'day'), name='uniq_payment_daily_rollup')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PaymentWeeklyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('vehicle_type', models.CharField(choices=[('KEKE', 'Keke'), ('BUS', 'Bus'), ('BIKE', 'Bike')], max_length=50)),
+                ('week_start', models.DateField()),
+                ('successful_count', models.IntegerField(default=0)),
+                ('failed_count', models.IntegerField(default=0)),
+                ('collected_amount', models.DecimalField(decimal_places=2, default=0.0, max_digits=14)),
+                ('failed_amount', models.DecimalField(decimal_places=2, default=0.0, max_digits=14)),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payment_weekly_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('owner', 'vehicle_type', 'week_start'), name='uniq_payment_weekly_rollup')],
+            },
+        ),
+        migrations.CreateModel(
+            name='VehicleFinancialRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('vehicle_type', models.CharField(choices=[('KEKE', 'Keke'), ('BUS', 'Bus'), ('BIKE', 'Bike')], max_length=50)),
+                ('vehicle_count', models.IntegerField(default=0)),
+                ('financed_count', models.IntegerField(default=0)),
+                ('fully_paid_count', models.IntegerField(default=0)),
+                ('in_arrears_count', models.IntegerField(default=0)),
+                ('defaulted_count', models.IntegerField(default=0)),
+                ('total_cost', models.DecimalField(decimal_places=2, default=0.0, max_digits=16)),
+                ('total_receivable', models.DecimalField(decimal_places=2, default=0.0, max_digits=16)),
+                ('amount_collected', models.DecimalField(decimal_places=2, default=0.0, max_digits=16)),
+                ('arrears_amount', models.DecimalField(decimal_places=2, default=0.0, max_digits=16)),
+                ('weekly_expected', models.DecimalField(decimal_places=2, default=0.0, max_digits=16)),
+                ('computed_at', models.DateTimeField()),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='vehicle_financial_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('owner', 'vehicle_type'), name='uniq_vehicle_financial_rollup')],
+            },
+        ),
+    ]
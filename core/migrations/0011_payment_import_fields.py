@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:51
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_portfolio_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payment',
+            name='created_at',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='payment',
+            name='payment_date',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        # Existing rows were inserted at their payment_date; keep rollup
+        # watermarks from re-reading them.
+        migrations.RunSQL(
+            'UPDATE core_payment SET created_at = payment_date',
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
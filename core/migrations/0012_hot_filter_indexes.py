@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_payment_import_fields'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='notification',
+            name='notif_user_read_created_idx',
+        ),
+        migrations.AddIndex(
+            model_name='driverapplication',
+            index=models.Index(fields=['applicant', 'vehicle', '-application_date'], name='app_applicant_vehicle_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='driverapplication',
+            index=models.Index(fields=['vehicle', '-application_date', '-id'], name='app_vehicle_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='driverapplication',
+            index=models.Index(condition=models.Q(('status', 'PENDING')), fields=['vehicle', '-application_date'], name='app_pending_vehicle_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='driverapplication',
+            index=models.Index(condition=models.Q(('status', 'APPROVED')), fields=['vehicle', '-decision_date'], name='app_approved_vehicle_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='notif_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['user', '-created_at'], name='notif_user_unread_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['driver', 'status', 'payment_date'], name='payment_driver_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(condition=models.Q(('status', 'FAILED')), fields=['driver', 'payment_date'], name='payment_failed_driver_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['vehicle', 'status'], include=('amount',), name='payment_vehicle_status_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:15
+
+from django.db import migrations, models
+
+PREFIX_INDEX = 'vehicle_open_model_prefix_idx'
+
+
+def create_model_prefix_index(apps, schema_editor):
+    # Model name prefix search: istartswith compiles to UPPER(model_name) LIKE 'X%',
+    # which a text_pattern_ops btree serves as a range scan. The operator
+    # class only exists on PostgreSQL, so the index is not in Vehicle.Meta.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        f'CREATE INDEX {PREFIX_INDEX} ON core_vehicle (UPPER(model_name) text_pattern_ops) '
+        'WHERE driver_id IS NULL AND is_active'
+    )
+
+
+def drop_model_prefix_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {PREFIX_INDEX}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_user_email_lower_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(condition=models.Q(('driver__isnull', True), ('is_active', True)), fields=['vehicle_type', 'weekly_returns', 'id'], name='vehicle_open_type_weekly_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(condition=models.Q(('driver__isnull', True), ('is_active', True)), fields=['weekly_returns', 'id'], name='vehicle_open_weekly_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(condition=models.Q(('driver__isnull', True), ('is_active', True)), fields=['-created_at', '-id'], name='vehicle_open_created_idx'),
+        ),
+        migrations.RunPython(create_model_prefix_index, drop_model_prefix_index),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:40
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def backfill_updated_at(apps, schema_editor):
+    DriverApplication = apps.get_model('core', 'DriverApplication')
+    DriverApplication.objects.update(updated_at=Coalesce('decision_date', 'application_date'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_vehicle_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='driverapplication',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_driverapplication_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='paymentweeklyrollup',
+            name='expected_amount',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=16, null=True),
+        ),
+    ]
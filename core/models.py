@@ -1,7 +1,12 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models.functions import Lower
+from django.utils import timezone
 import uuid
 
+# Weekly instalments per hire-purchase term (months)
+DURATION_WEEKS = {12: 52, 18: 78, 24: 104}
+
 class User(AbstractUser):
     class Role(models.TextChoices):
         OWNER = "OGA", "Oga"
@@ -11,6 +16,12 @@ class User(AbstractUser):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     role = models.CharField(max_length=50, choices=Role.choices)
     phone_number = models.CharField(max_length=15, blank=True, null=True)
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Case-insensitive email login (core.auth_backends.EmailBackend)
+            models.Index(Lower('email'), name='user_email_lower_idx'),
+        ]
     
 
 
@@ -49,8 +60,7 @@ class Vehicle(models.Model):
     def save(self, *args, **kwargs):
         # Calculate weekly returns using precise week mapping
         if self.total_receivable and self.repayment_duration:
-            duration_to_weeks = {12: 52, 18: 78, 24: 104}
-            weeks = duration_to_weeks.get(self.repayment_duration, 0)
+            weeks = DURATION_WEEKS.get(self.repayment_duration, 0)
             if weeks:
                 self.weekly_returns = self.total_receivable / weeks
             else:
@@ -62,6 +72,31 @@ class Vehicle(models.Model):
     def __str__(self):
         return f"{self.model_name} - {self.registration_number}"
 
+    class Meta:
+        # Marketplace search (views.vehicle_search) only reads open vehicles
+        indexes = [
+            # Type filter, cheapest first
+            models.Index(
+                fields=['vehicle_type', 'weekly_returns', 'id'],
+                condition=models.Q(driver__isnull=True, is_active=True),
+                name='vehicle_open_type_weekly_idx',
+            ),
+            # Weekly returns range and sort without a type filter
+            models.Index(
+                fields=['weekly_returns', 'id'],
+                condition=models.Q(driver__isnull=True, is_active=True),
+                name='vehicle_open_weekly_idx',
+            ),
+            # Newest first
+            models.Index(
+                fields=['-created_at', '-id'],
+                condition=models.Q(driver__isnull=True, is_active=True),
+                name='vehicle_open_created_idx',
+            ),
+            # The model name prefix index is PostgreSQL-only (text_pattern_ops)
+            # and is created in migration 0014 instead.
+        ]
+
 
 class DriverApplication(models.Model):
     class ApplicationStatus(models.TextChoices):
@@ -78,10 +113,32 @@ class DriverApplication(models.Model):
 
     application_date = models.DateTimeField(auto_now_add=True)
     decision_date = models.DateTimeField(null=True, blank=True)
+    # Version for conditional GETs; queryset.update() callers must set it
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"Application by {self.applicant.username} for {self.vehicle.model_name}"
 
+    class Meta:
+        indexes = [
+            # Driver's applications, and the duplicate-application check
+            models.Index(fields=['applicant', 'vehicle', '-application_date'], name='app_applicant_vehicle_idx'),
+            # Owner listings join through vehicle and page by date
+            models.Index(fields=['vehicle', '-application_date', '-id'], name='app_vehicle_date_idx'),
+            # Pending queue
+            models.Index(
+                fields=['vehicle', '-application_date'],
+                condition=models.Q(status='PENDING'),
+                name='app_pending_vehicle_idx',
+            ),
+            # Latest approval per vehicle (amortization start date)
+            models.Index(
+                fields=['vehicle', '-decision_date'],
+                condition=models.Q(status='APPROVED'),
+                name='app_approved_vehicle_idx',
+            ),
+        ]
+
 
 class Payment(models.Model):
     class PaymentStatus(models.TextChoices):
@@ -95,12 +152,54 @@ class Payment(models.Model):
     driver = models.ForeignKey(User, on_delete=models.CASCADE, related_name='payments_made', limit_choices_to={'role': User.Role.DRIVER})
     
     amount = models.DecimalField(max_digits=10, decimal_places=2)
-    payment_date = models.DateTimeField(auto_now_add=True)
+    # Settlement time; imported gateway files carry their own timestamps
+    payment_date = models.DateTimeField(default=timezone.now)
     status = models.CharField(max_length=50, choices=PaymentStatus.choices)
+    # Insert time, which incremental jobs use as their watermark
+    created_at = models.DateTimeField(default=timezone.now, db_index=True, editable=False)
 
     def __str__(self):
         return f"Payment of {self.amount} for {self.vehicle.registration_number}"
 
+    class Meta:
+        indexes = [
+            # Driver history and stats rebuilds
+            models.Index(fields=['driver', 'status', 'payment_date'], name='payment_driver_status_idx'),
+            # Recent-failure windows
+            models.Index(
+                fields=['driver', 'payment_date'],
+                condition=models.Q(status='FAILED'),
+                name='payment_failed_driver_idx',
+            ),
+            # Per-vehicle collected totals without touching the heap
+            models.Index(fields=['vehicle', 'status'], include=['amount'], name='payment_vehicle_status_idx'),
+        ]
+
+
+class DriverPaymentStats(models.Model):
+    """Per-driver payment summary, kept in sync with Payment writes.
+
+    Lets risk scoring read one row per driver instead of scanning the whole
+    payment history. Rebuild with ``manage.py rebuild_payment_stats``.
+    """
+    driver = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='payment_stats')
+
+    successful_count = models.IntegerField(default=0)
+    failed_count = models.IntegerField(default=0)
+    total_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0.00)  # Successful payments only
+    last_payment_date = models.DateTimeField(null=True, blank=True)
+    # ISO timestamps of failed payments inside the recent-failure window
+    recent_failures = models.JSONField(default=list, blank=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Payment stats for {self.driver.username}"
+
+    class Meta:
+        verbose_name = "Driver Payment Stats"
+        verbose_name_plural = "Driver Payment Stats"
+
 
 class KYC(models.Model):
     class VerificationStatus(models.TextChoices):
@@ -170,4 +269,120 @@ class Notification(models.Model):
         return f"{self.title} -> {self.user.username}"
 
     class Meta:
-        ordering = ('-created_at',)
\ No newline at end of file
+        ordering = ('-created_at',)
+        indexes = [
+            # Feed pages per user, in keyset order
+            models.Index(fields=['user', '-created_at', '-id'], name='notif_user_created_idx'),
+            # Unread counts and unread feeds
+            models.Index(
+                fields=['user', '-created_at'],
+                condition=models.Q(is_read=False),
+                name='notif_user_unread_idx',
+            ),
+        ]
+
+class ActivityEvent(models.Model):
+    """Append-only entry in a driver's activity timeline.
+
+    Written by the KYC, application and payment signal handlers so the
+    timeline is one indexed range query per page. Backfill existing history
+    with ``manage.py backfill_activity_events``.
+    """
+    class EventType(models.TextChoices):
+        KYC = "KYC", "KYC"
+        APPLICATION = "APPLICATION", "Application"
+        PAYMENT = "PAYMENT", "Payment"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    driver = models.ForeignKey(User, on_delete=models.CASCADE, related_name='activity_events')
+    type = models.CharField(max_length=50, choices=EventType.choices)
+    object_id = models.UUIDField(db_index=True)  # KYC, application or payment described
+    status = models.CharField(max_length=50, blank=True)
+    title = models.CharField(max_length=150)
+    description = models.CharField(max_length=255, blank=True)
+    occurred_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.title} ({self.driver_id})"
+
+    class Meta:
+        ordering = ('-occurred_at',)
+        indexes = [
+            # Timeline pages per driver, newest first
+            models.Index(fields=['driver', '-occurred_at', '-id'], name='activity_driver_time_idx'),
+        ]
+
+
+class PaymentDailyRollup(models.Model):
+    """Payments per owner, vehicle type and day.
+
+    Maintained incrementally by ``manage.py update_portfolio_rollups`` from
+    payments newer than its watermark; the portfolio endpoint reads only the
+    rollup tables.
+    """
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='payment_daily_rollups')
+    vehicle_type = models.CharField(max_length=50, choices=Vehicle.VehicleType.choices)
+    day = models.DateField()
+
+    successful_count = models.IntegerField(default=0)
+    failed_count = models.IntegerField(default=0)
+    collected_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0.00)  # Successful payments
+    failed_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0.00)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['owner', 'vehicle_type', 'day'], name='uniq_payment_daily_rollup'),
+        ]
+
+
+class PaymentWeeklyRollup(models.Model):
+    """Payments per owner, vehicle type and week (weeks start on Monday)."""
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='payment_weekly_rollups')
+    vehicle_type = models.CharField(max_length=50, choices=Vehicle.VehicleType.choices)
+    week_start = models.DateField()
+
+    successful_count = models.IntegerField(default=0)
+    failed_count = models.IntegerField(default=0)
+    collected_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0.00)
+    failed_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0.00)
+    # Weekly instalments due, as of the last vehicle rollup during the week; null if none ran
+    expected_amount = models.DecimalField(max_digits=16, decimal_places=2, null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['owner', 'vehicle_type', 'week_start'], name='uniq_payment_weekly_rollup'),
+        ]
+
+
+class VehicleFinancialRollup(models.Model):
+    """Fleet financials per owner and vehicle type, as of ``computed_at``."""
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='vehicle_financial_rollups')
+    vehicle_type = models.CharField(max_length=50, choices=Vehicle.VehicleType.choices)
+
+    vehicle_count = models.IntegerField(default=0)
+    financed_count = models.IntegerField(default=0)  # Vehicles with hire-purchase terms
+    fully_paid_count = models.IntegerField(default=0)
+    in_arrears_count = models.IntegerField(default=0)
+    defaulted_count = models.IntegerField(default=0)  # Past PORTFOLIO_DEFAULT_DAYS_PAST_DUE
+    total_cost = models.DecimalField(max_digits=16, decimal_places=2, default=0.00)
+    total_receivable = models.DecimalField(max_digits=16, decimal_places=2, default=0.00)
+    amount_collected = models.DecimalField(max_digits=16, decimal_places=2, default=0.00)
+    arrears_amount = models.DecimalField(max_digits=16, decimal_places=2, default=0.00)
+    weekly_expected = models.DecimalField(max_digits=16, decimal_places=2, default=0.00)  # Financed, not yet paid off
+
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['owner', 'vehicle_type'], name='uniq_vehicle_financial_rollup'),
+        ]
+
+
+class RollupWatermark(models.Model):
+    """High-water mark of the source rows a rollup has already folded in."""
+    name = models.CharField(max_length=50, primary_key=True)
+    value = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name}: {self.value}"
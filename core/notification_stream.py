@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from abc import ABC, abstractmethod
+import threading
+from collections import defaultdict
+from functools import lru_cache
+from typing import Optional
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from .risk_features import id_key
+
+
+class Subscription(ABC):
+    """A single stream consumer; yields JSON strings published for one user.
+
+    Messages are only guaranteed once ``open()`` has returned.
+    """
+
+    async def open(self) -> None:
+        """Start receiving messages; brokers that subscribe on creation need nothing here."""
+
+    @abstractmethod
+    async def next(self, timeout: float) -> Optional[str]:
+        """Return the next message, or None if ``timeout`` seconds pass first."""
+
+    @abstractmethod
+    async def close(self) -> None:
+        """Stop receiving messages and release the subscription's resources."""
+
+
+class InProcessBroker:
+    """Pub/sub inside one process.
+
+    ``publish`` may be called from any thread (sync views run in a worker
+    thread under ASGI); messages are handed to each subscriber's event loop
+    with ``call_soon_threadsafe``. Only reaches streams served by the same
+    process, so multi-worker deployments should use RedisBroker.
+    """
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, user_id, message: str) -> None:
+        with self._lock:
+            targets = list(self._subscribers.get(id_key(user_id), ()))
+        for sub in targets:
+            sub.loop.call_soon_threadsafe(sub.offer, message)
+
+    def subscribe(self, user_id) -> Subscription:
+        sub = _InProcessSubscription(self, id_key(user_id), asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscribers[sub.key].add(sub)
+        return sub
+
+    def _remove(self, sub: '_InProcessSubscription') -> None:
+        with self._lock:
+            subs = self._subscribers.get(sub.key)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subscribers[sub.key]
+
+
+class _InProcessSubscription(Subscription):
+    def __init__(self, broker: InProcessBroker, key: str, loop, queue_size: int):
+        self.broker = broker
+        self.key = key
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=queue_size)
+
+    def offer(self, message: str) -> None:
+        # Slow consumers drop their oldest message rather than block publishers.
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+
+    async def next(self, timeout: float) -> Optional[str]:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def close(self) -> None:
+        self.broker._remove(self)
+
+
+class RedisBroker:
+    """Pub/sub over Redis channels, shared by every worker process.
+
+    Requires the optional ``redis`` package (``pip install redis``).
+    """
+
+    def __init__(self, url: str = 'redis://localhost:6379/0', channel_prefix: str = 'notifications'):
+        try:
+            import redis  # noqa: F401
+        except ImportError:
+            raise ImproperlyConfigured("RedisBroker requires the 'redis' package.")
+        self.url = url
+        self.channel_prefix = channel_prefix
+        self._client = None
+
+    def _channel(self, user_id) -> str:
+        return f'{self.channel_prefix}:{id_key(user_id)}'
+
+    def publish(self, user_id, message: str) -> None:
+        import redis
+        if self._client is None:
+            self._client = redis.Redis.from_url(self.url)
+        self._client.publish(self._channel(user_id), message)
+
+    def subscribe(self, user_id) -> Subscription:
+        return _RedisSubscription(self.url, self._channel(user_id))
+
+
+class _RedisSubscription(Subscription):
+    def __init__(self, url: str, channel: str):
+        import redis.asyncio
+        self.client = redis.asyncio.Redis.from_url(url)
+        self.pubsub = self.client.pubsub()
+        self.channel = channel
+
+    async def open(self) -> None:
+        # Redis drops messages published before the SUBSCRIBE is acknowledged
+        await self.pubsub.subscribe(self.channel)
+
+    async def next(self, timeout: float) -> Optional[str]:
+        message = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        if not message:
+            return None
+        data = message['data']
+        return data.decode() if isinstance(data, bytes) else data
+
+    async def close(self) -> None:
+        await self.pubsub.aclose()
+        await self.client.aclose()
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    """Broker configured by NOTIFICATION_BROKER / NOTIFICATION_BROKER_OPTIONS."""
+    path = getattr(settings, 'NOTIFICATION_BROKER', 'core.notification_stream.InProcessBroker')
+    options = getattr(settings, 'NOTIFICATION_BROKER_OPTIONS', None) or {}
+    return import_string(path)(**options)
+
+
+@receiver(setting_changed)
+def _reset_broker(setting, **kwargs):
+    if setting in ('NOTIFICATION_BROKER', 'NOTIFICATION_BROKER_OPTIONS'):
+        get_broker.cache_clear()
+
+
+def publish_notification(notification) -> None:
+    """Push a notification to the owner's open streams (compact payload)."""
+    from .serializers import NotificationCompactSerializer
+    from rest_framework.renderers import JSONRenderer
+
+    data = NotificationCompactSerializer(notification).data
+    get_broker().publish(notification.user_id, JSONRenderer().render(data).decode())
+
+
+def format_event(message: str, event_id: Optional[str] = None) -> str:
+    """Format one server-sent event frame."""
+    lines = []
+    if event_id:
+        lines.append(f'id: {event_id}')
+    lines.append('event: notification')
+    lines.extend(f'data: {line}' for line in message.splitlines() or [''])
+    return '\n'.join(lines) + '\n\n'
+
+
+def event_id_of(message: str) -> Optional[str]:
+    try:
+        return json.loads(message).get('id')
+    except (ValueError, AttributeError):
+        return None
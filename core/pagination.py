@@ -0,0 +1,126 @@
+import base64
+import json
+import uuid
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+
+def parse_limit(value, default=DEFAULT_LIMIT, maximum=MAX_LIMIT):
+    """Clamp a ``limit`` query param to [1, maximum]; invalid values use the default."""
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(maximum, limit))
+
+
+def encode_cursor(*values):
+    raw = json.dumps([str(v) for v in values]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor, size):
+    """Return the ``size`` string values in a cursor; raise ValueError if malformed."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError('Invalid cursor')
+    return values
+
+
+def decode_pk(value):
+    """Parse the id half of a cursor; raise ValueError unless it is a UUID."""
+    try:
+        return uuid.UUID(value)
+    except (AttributeError, TypeError, ValueError):
+        raise ValueError('Invalid cursor')
+
+
+def decode_timestamp_cursor(cursor):
+    """Decode a (timestamp, id) cursor into (datetime, UUID)."""
+    timestamp, pk = decode_cursor(cursor, 2)
+    try:
+        parsed = parse_datetime(timestamp)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValueError('Invalid cursor')
+    return parsed, decode_pk(pk)
+
+
+def before_cursor(field, timestamp, pk):
+    """Rows strictly after (timestamp, pk) in ``-field, -id`` order."""
+    return Q(**{f'{field}__lt': timestamp}) | Q(**{field: timestamp, 'id__lt': pk})
+
+
+def paginate_desc(queryset, field, cursor=None, limit=DEFAULT_LIMIT):
+    """Return (rows, next_cursor) for ``queryset`` ordered by ``-field, -id``.
+
+    Raises ValueError for a malformed cursor.
+    """
+    rows = list(_desc_page(queryset, field, cursor, limit))
+    return _with_next_cursor(rows, field, limit)
+
+
+async def apaginate_desc(queryset, field, cursor=None, limit=DEFAULT_LIMIT):
+    """Async ``paginate_desc`` for async views."""
+    rows = [row async for row in _desc_page(queryset, field, cursor, limit)]
+    return _with_next_cursor(rows, field, limit)
+
+
+def _desc_page(queryset, field, cursor, limit):
+    queryset = queryset.order_by(f'-{field}', '-id')
+    if cursor:
+        timestamp, pk = decode_timestamp_cursor(cursor)
+        queryset = queryset.filter(before_cursor(field, timestamp, pk))
+    # One extra row tells us whether there is a next page
+    return queryset[:limit + 1]
+
+
+def _with_next_cursor(rows, field, limit):
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, field).isoformat(), last.pk)
+    return rows, next_cursor
+
+
+def paginate_keyset(queryset, field, cursor=None, limit=DEFAULT_LIMIT, descending=False, parse=str):
+    """Return (rows, next_cursor) for ``queryset`` ordered by ``field, id``, both descending if asked.
+
+    ``parse`` turns the cursor's string value back into a ``field`` value.
+    Raises ValueError for a malformed cursor.
+    """
+    sign, op = ('-', 'lt') if descending else ('', 'gt')
+    queryset = queryset.order_by(f'{sign}{field}', f'{sign}id')
+    if cursor:
+        value, pk = decode_cursor(cursor, 2)
+        pk = decode_pk(pk)
+        try:
+            value = parse(value)
+        except (ValueError, ArithmeticError):
+            raise ValueError('Invalid cursor')
+        if value is None:
+            raise ValueError('Invalid cursor')
+        # The inclusive bound lets the index scan start at the cursor;
+        # the OR alone is only applied as a filter.
+        queryset = queryset.filter(
+            Q(**{f'{field}__{op}e': value}),
+            Q(**{f'{field}__{op}': value}) | Q(**{field: value, f'id__{op}': pk}),
+        )
+    rows = list(queryset[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        value = getattr(last, field)
+        next_cursor = encode_cursor(value.isoformat() if hasattr(value, 'isoformat') else value, last.pk)
+    return rows, next_cursor
@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import codecs
+import csv
+import json
+import time
+import uuid
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, Value, When
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .activity import payment_event
+from .models import ActivityEvent, Payment, User, Vehicle
+from .payment_stats import rebuild_driver_stats
+from .score_cache import invalidate_driver, invalidate_vehicle
+
+FORMATS = ('csv', 'jsonl')
+DEFAULT_CHUNK_SIZE = 2000
+MAX_REPORTED_ERRORS = 100
+
+
+@dataclass
+class ImportResult:
+    rows: int = 0
+    inserted: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    errors: List[Dict[str, object]] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            'rows': self.rows,
+            'inserted': self.inserted,
+            'duplicates': self.duplicates,
+            'invalid': self.invalid,
+            'errors': self.errors,
+            'elapsed_seconds': round(self.elapsed, 3),
+            'rows_per_sec': round(self.rows_per_sec, 1),
+        }
+
+    def add_error(self, line: int, message: str) -> None:
+        self.invalid += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'error': message})
+
+
+def iter_records(stream, fmt: str) -> Iterator[Tuple[int, object]]:
+    """Yield (line number, raw record) from a text stream, one line at a time.
+
+    CSV needs a header row with transaction_id, vehicle, driver, amount,
+    status and optionally payment_date. JSONL has one object per line with
+    the same keys. Unparseable JSON lines are yielded as their error message.
+    """
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+    elif fmt == 'jsonl':
+        for line_no, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield line_no, json.loads(line)
+            except ValueError as e:
+                yield line_no, f'Invalid JSON: {e}'
+    else:
+        raise ValueError(f'Unsupported format: {fmt}')
+
+
+def parse_record(record) -> Payment:
+    """Build an unsaved Payment from one record; raise ValueError if invalid."""
+    if not isinstance(record, dict):
+        raise ValueError(record if isinstance(record, str) else 'Record must be an object')
+    transaction_id = str(record.get('transaction_id') or '').strip()
+    if not transaction_id:
+        raise ValueError('Missing transaction_id')
+    if len(transaction_id) > 100:
+        raise ValueError('transaction_id longer than 100 characters')
+    try:
+        vehicle_id = uuid.UUID(str(record.get('vehicle') or ''))
+        driver_id = uuid.UUID(str(record.get('driver') or ''))
+    except ValueError:
+        raise ValueError('vehicle and driver must be UUIDs')
+    try:
+        amount = Decimal(str(record.get('amount')))
+    except (InvalidOperation, TypeError):
+        raise ValueError('Invalid amount')
+    if not amount.is_finite() or amount <= 0 or amount.as_tuple().exponent < -2 or amount >= Decimal('1e8'):
+        raise ValueError('Invalid amount')
+    payment_status = str(record.get('status') or '').strip().upper()
+    if payment_status not in Payment.PaymentStatus.values:
+        raise ValueError('status must be SUCCESSFUL or FAILED')
+    payment_date = timezone.now()
+    if record.get('payment_date'):
+        payment_date = parse_datetime(str(record['payment_date']))
+        if payment_date is None:
+            raise ValueError('Invalid payment_date')
+        if timezone.is_naive(payment_date):
+            payment_date = timezone.make_aware(payment_date)
+    return Payment(
+        transaction_id=transaction_id,
+        vehicle_id=vehicle_id,
+        driver_id=driver_id,
+        amount=amount,
+        status=payment_status,
+        payment_date=payment_date,
+    )
+
+
+def import_payments(records: Iterable[Tuple[int, object]], chunk_size: int = DEFAULT_CHUNK_SIZE) -> ImportResult:
+    """Validate and insert payment records in chunks.
+
+    Each chunk costs a fixed number of queries: one lookup each for known
+    vehicles, drivers and transaction ids, one ``bulk_create`` with
+    ``ignore_conflicts`` (so a concurrent import of the same file cannot
+    fail the chunk), one query for which rows actually landed, and one
+    aggregated UPDATE of vehicle balances, all in one transaction.
+    Derived data (driver stats, cached scores, activity) is refreshed for
+    the drivers and vehicles touched.
+    """
+    result = ImportResult()
+    started = time.perf_counter()
+    chunk = []
+    for line, record in records:
+        result.rows += 1
+        try:
+            chunk.append((line, parse_record(record)))
+        except ValueError as e:
+            result.add_error(line, str(e))
+        if len(chunk) >= chunk_size:
+            _import_chunk(chunk, result)
+            chunk = []
+    if chunk:
+        _import_chunk(chunk, result)
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+def _import_chunk(chunk: List[Tuple[int, Payment]], result: ImportResult) -> None:
+    vehicles = {
+        row['id']: row
+        for row in Vehicle.objects.filter(id__in={p.vehicle_id for _, p in chunk}).values(
+            'id', 'registration_number'
+        )
+    }
+    drivers = set(User.objects.filter(id__in={p.driver_id for _, p in chunk}).values_list('id', flat=True))
+    existing = set(
+        Payment.objects.filter(transaction_id__in={p.transaction_id for _, p in chunk})
+        .values_list('transaction_id', flat=True)
+    )
+
+    pending = []
+    for line, payment in chunk:
+        if payment.transaction_id in existing:
+            result.duplicates += 1
+        elif payment.vehicle_id not in vehicles:
+            result.add_error(line, 'Unknown vehicle')
+        elif payment.driver_id not in drivers:
+            result.add_error(line, 'Unknown driver')
+        else:
+            existing.add(payment.transaction_id)  # Repeats within the chunk
+            pending.append(payment)
+    if not pending:
+        return
+
+    with transaction.atomic():
+        Payment.objects.bulk_create(pending, ignore_conflicts=True)
+        # ignore_conflicts hides which rows were skipped; ids are generated
+        # client side, so the ones that exist now are the ones inserted.
+        landed = set(Payment.objects.filter(id__in=[p.id for p in pending]).values_list('id', flat=True))
+        inserted = [p for p in pending if p.id in landed]
+        result.duplicates += len(pending) - len(inserted)
+        result.inserted += len(inserted)
+        _apply_vehicle_balances(inserted)
+        ActivityEvent.objects.bulk_create(
+            [payment_event(p, vehicles[p.vehicle_id]['registration_number']) for p in inserted]
+        )
+
+    driver_ids = {p.driver_id for p in inserted}
+    rebuild_driver_stats(driver_ids)
+    for driver_id in driver_ids:
+        invalidate_driver(driver_id)
+    for vehicle_id in {p.vehicle_id for p in inserted}:
+        invalidate_vehicle(vehicle_id)
+
+
+def _apply_vehicle_balances(payments: List[Payment]) -> None:
+    """Add successful amounts to each vehicle with one UPDATE, then flip is_fully_paid."""
+    totals: Dict[uuid.UUID, Decimal] = {}
+    for p in payments:
+        if p.status == Payment.PaymentStatus.SUCCESSFUL:
+            totals[p.vehicle_id] = totals.get(p.vehicle_id, Decimal('0')) + p.amount
+    if not totals:
+        return
+    money = DecimalField(max_digits=10, decimal_places=2)
+    now = timezone.now()
+    Vehicle.objects.filter(id__in=totals).update(
+        amount_paid=F('amount_paid') + Case(
+            *[When(id=vehicle_id, then=Value(amount, output_field=money)) for vehicle_id, amount in totals.items()],
+            output_field=money,
+        ),
+        updated_at=now,
+    )
+    Vehicle.objects.filter(id__in=totals, is_fully_paid=False, amount_paid__gte=F('total_cost')).update(
+        is_fully_paid=True,
+        updated_at=now,
+    )
+
+
+def detect_format(name: Optional[str] = None, content_type: Optional[str] = None) -> Optional[str]:
+    """Pick 'csv' or 'jsonl' from a file name or Content-Type header."""
+    content_type = (content_type or '').split(';')[0].strip().lower()
+    if content_type in ('text/csv', 'application/csv'):
+        return 'csv'
+    if content_type in ('application/x-ndjson', 'application/jsonl', 'application/x-jsonlines'):
+        return 'jsonl'
+    name = (name or '').lower()
+    if name.endswith('.csv'):
+        return 'csv'
+    if name.endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    return None
+
+
+def decode_lines(lines: Iterable[bytes]) -> Iterator[str]:
+    """Decode a byte-line iterator (e.g. a request body) lazily, dropping any BOM."""
+    return codecs.iterdecode(lines, 'utf-8-sig')
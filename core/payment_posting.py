@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Optional, Tuple
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from .models import Payment, Vehicle
+from .score_cache import invalidate_vehicle
+
+
+class PaymentConflict(ValueError):
+    """A transaction_id was posted again with different details."""
+
+
+def _same_payment(payment: Payment, vehicle_id, driver_id, amount: Decimal, payment_status: str) -> bool:
+    return (
+        str(payment.vehicle_id) == str(vehicle_id)
+        and str(payment.driver_id) == str(driver_id)
+        and payment.amount == amount
+        and payment.status == payment_status
+    )
+
+
+def _existing(transaction_id: str, vehicle_id, driver_id, amount: Decimal, payment_status: str) -> Optional[Payment]:
+    payment = Payment.objects.filter(transaction_id=transaction_id).first()
+    if payment is not None and not _same_payment(payment, vehicle_id, driver_id, amount, payment_status):
+        raise PaymentConflict(f'Transaction {transaction_id} was already posted with different details')
+    return payment
+
+
+def post_payment(
+    transaction_id: str,
+    vehicle_id,
+    driver_id,
+    amount: Decimal,
+    payment_status: str = Payment.PaymentStatus.SUCCESSFUL,
+    payment_date=None,
+) -> Tuple[Payment, bool]:
+    """Record a payment and apply it to the vehicle balance atomically.
+
+    Returns (payment, created). Posting the same ``transaction_id`` again
+    (a webhook retry) returns the stored payment with ``created=False`` and
+    changes nothing; posting it with different details raises
+    PaymentConflict. Raises Vehicle.DoesNotExist for an unknown vehicle.
+
+    The vehicle row is locked for the whole transaction, so concurrent
+    postings to one vehicle are serialised and retries of one transaction
+    cannot both pass the idempotency check. The balance is incremented
+    with an F() expression and ``is_fully_paid`` flips in the same UPDATE.
+    """
+    amount = Decimal(str(amount))
+    existing = _existing(transaction_id, vehicle_id, driver_id, amount, payment_status)
+    if existing is not None:
+        return existing, False
+
+    with transaction.atomic():
+        vehicle = (
+            Vehicle.objects.select_for_update()
+            .only('id', 'registration_number')
+            .get(id=vehicle_id)
+        )
+        # Re-check under the lock: a retry may have committed while we waited.
+        existing = _existing(transaction_id, vehicle_id, driver_id, amount, payment_status)
+        if existing is not None:
+            return existing, False
+        try:
+            with transaction.atomic():
+                payment = Payment.objects.create(
+                    transaction_id=transaction_id,
+                    vehicle=vehicle,
+                    driver_id=driver_id,
+                    amount=amount,
+                    status=payment_status,
+                    payment_date=payment_date or timezone.now(),
+                )
+        except IntegrityError:
+            # Same transaction_id committed concurrently against another vehicle.
+            existing = _existing(transaction_id, vehicle_id, driver_id, amount, payment_status)
+            if existing is None:
+                raise
+            return existing, False
+
+        if payment_status == Payment.PaymentStatus.SUCCESSFUL:
+            Vehicle.objects.filter(id=vehicle.id).update(
+                amount_paid=F('amount_paid') + amount,
+                is_fully_paid=Case(
+                    When(total_cost__lte=F('amount_paid') + amount, then=Value(True)),
+                    default=F('is_fully_paid'),
+                ),
+                updated_at=timezone.now(),
+            )
+            # update() skips post_save, so drop cached scores for the vehicle
+            transaction.on_commit(lambda: invalidate_vehicle(vehicle.id))
+    return payment, True
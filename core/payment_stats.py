@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from decimal import Decimal
+from typing import Iterable
+
+from django.db import transaction
+from django.db.models import Count, Max, Q, Sum
+from django.utils import timezone
+
+from .models import DriverPaymentStats, Payment
+from .risk_features import RECENT_FAILURE_WINDOW, recent_failures_within
+
+
+def record_payment(payment: Payment) -> None:
+    """Fold a newly created payment into its driver's stats row.
+
+    Runs under a row lock so concurrent payments for the same driver cannot
+    lose updates.
+    """
+    with transaction.atomic():
+        stats, _ = DriverPaymentStats.objects.select_for_update().get_or_create(driver_id=payment.driver_id)
+        if payment.status == Payment.PaymentStatus.SUCCESSFUL:
+            stats.successful_count += 1
+            stats.total_amount = (stats.total_amount or Decimal('0')) + (payment.amount or Decimal('0'))
+        elif payment.status == Payment.PaymentStatus.FAILED:
+            stats.failed_count += 1
+            stats.recent_failures = list(stats.recent_failures or []) + [payment.payment_date.isoformat()]
+        if payment.payment_date and (stats.last_payment_date is None or payment.payment_date > stats.last_payment_date):
+            stats.last_payment_date = payment.payment_date
+        stats.recent_failures = recent_failures_within(stats.recent_failures)
+        stats.save()
+
+
+def rebuild_driver_stats(driver_ids: Iterable) -> int:
+    """Recompute stats for the given drivers from their Payment rows.
+
+    Uses one aggregate query plus one query for recent failures, then upserts
+    the results. Drivers without payments lose their stats row. Returns the
+    number of stats rows written.
+    """
+    driver_ids = list(dict.fromkeys(driver_ids))
+    if not driver_ids:
+        return 0
+
+    now = timezone.now()
+    aggregates = (
+        Payment.objects.filter(driver_id__in=driver_ids)
+        .values('driver_id')
+        .annotate(
+            successful_count=Count('id', filter=Q(status=Payment.PaymentStatus.SUCCESSFUL)),
+            failed_count=Count('id', filter=Q(status=Payment.PaymentStatus.FAILED)),
+            total_amount=Sum('amount', filter=Q(status=Payment.PaymentStatus.SUCCESSFUL)),
+            last_payment_date=Max('payment_date'),
+        )
+        .order_by()
+    )
+    failures = defaultdict(list)
+    recent = (
+        Payment.objects.filter(
+            driver_id__in=driver_ids,
+            status=Payment.PaymentStatus.FAILED,
+            payment_date__gte=now - RECENT_FAILURE_WINDOW,
+        )
+        .order_by('payment_date')
+        .values_list('driver_id', 'payment_date')
+    )
+    for driver_id, payment_date in recent:
+        failures[driver_id].append(payment_date.isoformat())
+
+    rows = [
+        DriverPaymentStats(
+            driver_id=row['driver_id'],
+            successful_count=row['successful_count'],
+            failed_count=row['failed_count'],
+            total_amount=row['total_amount'] or Decimal('0'),
+            last_payment_date=row['last_payment_date'],
+            recent_failures=failures.get(row['driver_id'], []),
+            updated_at=now,
+        )
+        for row in aggregates
+    ]
+    with transaction.atomic():
+        DriverPaymentStats.objects.filter(driver_id__in=driver_ids).exclude(
+            driver_id__in=[r.driver_id for r in rows]
+        ).delete()
+        DriverPaymentStats.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['driver'],
+            update_fields=[
+                'successful_count', 'failed_count', 'total_amount',
+                'last_payment_date', 'recent_failures', 'updated_at',
+            ],
+        )
+    return len(rows)
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+KEY_PREFIX = 'ratelimit'
+
+
+def _cache():
+    return caches[getattr(settings, 'LOGIN_RATE_LIMIT_CACHE_ALIAS', 'default')]
+
+
+def failure_window() -> int:
+    return int(getattr(settings, 'LOGIN_FAILURE_WINDOW', 300))
+
+
+def login_keys(request, email: Optional[str]) -> Dict[str, str]:
+    """Counter keys for a login attempt, by limit name (see LOGIN_FAILURE_LIMITS).
+
+    Uses REMOTE_ADDR: X-Forwarded-For is client controlled unless a trusted
+    proxy rewrites REMOTE_ADDR.
+    """
+    keys = {'ip': f"{KEY_PREFIX}:login:ip:{request.META.get('REMOTE_ADDR', '')}"}
+    if email:
+        keys['email'] = f'{KEY_PREFIX}:login:email:{email.strip().lower()}'
+    return keys
+
+
+def login_blocked(keys: Dict[str, str]) -> bool:
+    """True when any counter has reached its limit in the current window."""
+    limits = getattr(settings, 'LOGIN_FAILURE_LIMITS', {})
+    counts = _cache().get_many(list(keys.values()))
+    return any(counts.get(key, 0) >= limits[name] for name, key in keys.items() if name in limits)
+
+
+def record_login_failure(keys: Dict[str, str]) -> None:
+    cache = _cache()
+    for key in keys.values():
+        # add() starts a fixed window; incr() keeps its expiry
+        if not cache.add(key, 1, failure_window()):
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.add(key, 1, failure_window())  # Expired between add() and incr()
+
+
+def reset_login_failures(keys: Dict[str, str]) -> None:
+    """Clear the email counter after a successful login; the IP counter keeps running."""
+    if 'email' in keys:
+        _cache().delete(keys['email'])
+
+
+def clear_login_limits(keys: Dict[str, str]) -> None:
+    """Drop every counter in ``keys``, IP included (benchmarks and tests start from zero)."""
+    _cache().delete_many(list(keys.values()))
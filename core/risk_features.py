@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+import uuid
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.db.models import Count, F, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import KYC, DriverApplication, DriverPaymentStats, Payment, Vehicle
+
+# Window used for the "recent failures" feature.
+RECENT_FAILURE_WINDOW = timedelta(days=6 * 30)
+
+
+@dataclass(frozen=True)
+class DriverFeatures:
+    """Raw inputs shared by the risk models for a single driver."""
+
+    kyc_status: Optional[str] = None
+    date_of_birth: Optional[date] = None
+    monthly_income: float = 0.0
+    total_success: int = 0
+    total_failed: int = 0
+    failed_recent_6m: int = 0
+    # Date the features describe; None means today.
+    as_of: Optional[date] = None
+
+    @property
+    def has_kyc(self) -> bool:
+        return self.kyc_status is not None
+
+    @property
+    def kyc_approved(self) -> float:
+        return 1.0 if self.kyc_status == KYC.VerificationStatus.APPROVED else 0.0
+
+    @property
+    def kyc_under_review(self) -> float:
+        return 1.0 if self.kyc_status == KYC.VerificationStatus.UNDER_REVIEW else 0.0
+
+    @property
+    def age_years(self) -> float:
+        return years_from_dob(self.date_of_birth, self.as_of)
+
+    @property
+    def success_ratio(self) -> float:
+        total = self.total_success + self.total_failed
+        return float(self.total_success) / float(total) if total > 0 else 0.0
+
+
+EMPTY_FEATURES = DriverFeatures()
+
+
+def years_from_dob(dob, as_of: Optional[date] = None) -> float:
+    if not dob:
+        return 0.0
+    try:
+        today = as_of or timezone.now().date()
+        years = today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
+        return float(max(0, years))
+    except Exception:
+        return 0.0
+
+
+def ages_from_dobs(dobs: Sequence, as_of: Optional[Sequence] = None) -> np.ndarray:
+    """Vectorised equivalent of years_from_dob over a sequence of dates/None.
+
+    ``as_of`` optionally gives a per-row reference date (None entries mean
+    today).
+    """
+    ages = np.zeros(len(dobs), dtype=np.float64)
+    present = np.array([d is not None for d in dobs], dtype=bool)
+    if not present.any():
+        return ages
+    today = timezone.now().date()
+    refs = [
+        (as_of[i] if as_of is not None and as_of[i] is not None else today)
+        for i, d in enumerate(dobs) if d is not None
+    ]
+    known = [d for d in dobs if d is not None]
+    ref_years = np.array([r.year for r in refs], dtype=np.int64)
+    ref_months = np.array([r.month for r in refs], dtype=np.int64)
+    ref_days = np.array([r.day for r in refs], dtype=np.int64)
+    years = np.array([d.year for d in known], dtype=np.int64)
+    months = np.array([d.month for d in known], dtype=np.int64)
+    days = np.array([d.day for d in known], dtype=np.int64)
+    before_birthday = (months > ref_months) | ((months == ref_months) & (days > ref_days))
+    ages[present] = np.maximum(0, ref_years - years - before_birthday.astype(np.int64))
+    return ages
+
+
+def id_key(value) -> str:
+    """Normalise a user id (UUID or str) so query results can be matched back."""
+    try:
+        return str(uuid.UUID(str(value)))
+    except ValueError:
+        return str(value)
+
+
+def recent_failures_within(timestamps: Iterable[str], now: Optional[datetime] = None) -> List[str]:
+    """Keep the ISO failure timestamps that fall inside RECENT_FAILURE_WINDOW."""
+    cutoff = (now or timezone.now()) - RECENT_FAILURE_WINDOW
+    kept = []
+    for value in timestamps or []:
+        parsed = parse_datetime(value) if isinstance(value, str) else None
+        if parsed and parsed >= cutoff:
+            kept.append(value)
+    return kept
+
+
+def fetch_driver_features(applicant_ids: Iterable) -> Dict[str, DriverFeatures]:
+    """Return features for many drivers, keyed by id_key(applicant_id).
+
+    Runs a single query: users LEFT JOIN their KYC row and their
+    DriverPaymentStats row, so the cost is one row per driver however long
+    the payment history is. Unknown ids are simply absent from the result;
+    callers should fall back to EMPTY_FEATURES.
+    """
+    ids = list(dict.fromkeys(id_key(a) for a in applicant_ids))
+    if not ids:
+        return {}
+    User = get_user_model()
+    now = timezone.now()
+    rows = User.objects.filter(id__in=ids).values(
+        'id',
+        'kyc__status',
+        'kyc__date_of_birth',
+        'kyc__monthly_income',
+        'payment_stats__successful_count',
+        'payment_stats__failed_count',
+        'payment_stats__recent_failures',
+    )
+    features = {}
+    for row in rows:
+        features[str(row['id'])] = DriverFeatures(
+            kyc_status=row['kyc__status'],
+            date_of_birth=row['kyc__date_of_birth'],
+            monthly_income=float(row['kyc__monthly_income'] or 0.0),
+            total_success=row['payment_stats__successful_count'] or 0,
+            total_failed=row['payment_stats__failed_count'] or 0,
+            failed_recent_6m=len(recent_failures_within(row['payment_stats__recent_failures'], now)),
+        )
+    return features
+
+
+def get_driver_features(applicant_id) -> DriverFeatures:
+    """Return features for one driver (one query)."""
+    return fetch_driver_features([applicant_id]).get(id_key(applicant_id), EMPTY_FEATURES)
+
+
+async def aget_driver_features(applicant_id) -> DriverFeatures:
+    """Async ``get_driver_features``.
+
+    The KYC row and the payment stats row are read with the async ORM as
+    two concurrent queries instead of one join; a driver with neither gets
+    EMPTY_FEATURES, as an unknown id does in fetch_driver_features.
+    """
+    kyc, stats = await asyncio.gather(
+        KYC.objects.filter(user_id=applicant_id).values('status', 'date_of_birth', 'monthly_income').afirst(),
+        DriverPaymentStats.objects.filter(driver_id=applicant_id)
+        .values('successful_count', 'failed_count', 'recent_failures')
+        .afirst(),
+    )
+    kyc = kyc or {}
+    stats = stats or {}
+    return DriverFeatures(
+        kyc_status=kyc.get('status'),
+        date_of_birth=kyc.get('date_of_birth'),
+        monthly_income=float(kyc.get('monthly_income') or 0.0),
+        total_success=stats.get('successful_count') or 0,
+        total_failed=stats.get('failed_count') or 0,
+        failed_recent_6m=len(recent_failures_within(stats.get('recent_failures'))),
+    )
+
+
+@dataclass(frozen=True)
+class ApplicationSnapshot:
+    """An application with its driver's features as of the application date."""
+
+    application_id: uuid.UUID
+    applicant_id: uuid.UUID
+    status: str
+    risk_score: Optional[int]
+    application_date: datetime
+    features: DriverFeatures
+    vehicle: Vehicle
+
+
+def iter_application_snapshots(applications=None, chunk_size: int = 2000) -> Iterator[List[ApplicationSnapshot]]:
+    """Yield point-in-time snapshots for applications, ``chunk_size`` at a time.
+
+    Payment-history features are rebuilt from payments made strictly before
+    each application's ``application_date`` (and, for recent failures, within
+    RECENT_FAILURE_WINDOW before it), and age is taken on that date. All of
+    it comes from one set-based query that joins applications to the
+    applicant's payments and aggregates per application, streamed with a
+    server-side cursor. KYC status/income and vehicle financials are not
+    versioned, so their current values are used.
+    """
+    if applications is None:
+        applications = DriverApplication.objects.all()
+    before_app = Q(applicant__payments_made__payment_date__lt=F('application_date'))
+    rows = (
+        applications.values(
+            'id',
+            'applicant_id',
+            'status',
+            'risk_score',
+            'application_date',
+            'applicant__kyc__status',
+            'applicant__kyc__date_of_birth',
+            'applicant__kyc__monthly_income',
+            'vehicle_id',
+            'vehicle__weekly_returns',
+            'vehicle__interest_rate',
+            'vehicle__repayment_duration',
+            'vehicle__total_cost',
+            'vehicle__amount_paid',
+        )
+        .annotate(
+            total_success=Count(
+                'applicant__payments_made',
+                filter=before_app & Q(applicant__payments_made__status=Payment.PaymentStatus.SUCCESSFUL),
+            ),
+            total_failed=Count(
+                'applicant__payments_made',
+                filter=before_app & Q(applicant__payments_made__status=Payment.PaymentStatus.FAILED),
+            ),
+            failed_recent_6m=Count(
+                'applicant__payments_made',
+                filter=before_app & Q(
+                    applicant__payments_made__status=Payment.PaymentStatus.FAILED,
+                    applicant__payments_made__payment_date__gte=F('application_date') - RECENT_FAILURE_WINDOW,
+                ),
+            ),
+        )
+        .order_by('application_date', 'id')
+    )
+
+    batch = []
+    for row in rows.iterator(chunk_size=chunk_size):
+        batch.append(ApplicationSnapshot(
+            application_id=row['id'],
+            applicant_id=row['applicant_id'],
+            status=row['status'],
+            risk_score=row['risk_score'],
+            application_date=row['application_date'],
+            features=DriverFeatures(
+                kyc_status=row['applicant__kyc__status'],
+                date_of_birth=row['applicant__kyc__date_of_birth'],
+                monthly_income=float(row['applicant__kyc__monthly_income'] or 0.0),
+                total_success=row['total_success'],
+                total_failed=row['total_failed'],
+                failed_recent_6m=row['failed_recent_6m'],
+                as_of=row['application_date'].date(),
+            ),
+            vehicle=Vehicle(
+                id=row['vehicle_id'],
+                weekly_returns=row['vehicle__weekly_returns'],
+                interest_rate=row['vehicle__interest_rate'],
+                repayment_duration=row['vehicle__repayment_duration'],
+                total_cost=row['vehicle__total_cost'],
+                amount_paid=row['vehicle__amount_paid'],
+            ),
+        ))
+        if len(batch) >= chunk_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -1,19 +1,68 @@
 from __future__ import annotations
 
-from datetime import timedelta
-from typing import Dict, Tuple, Optional
-import math
-
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Tuple, Optional, Sequence
+import hashlib
+import json
+import logging
+import random
+
+import numpy as np
 from django.conf import settings
-from django.utils import timezone
-
-from .models import KYC, Payment, Vehicle
-
-
-def _get_linear_coeffs() -> Dict[str, float]:
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from .models import KYC, Vehicle
+from .risk_features import (
+    DriverFeatures,
+    EMPTY_FEATURES,
+    ages_from_dobs,
+    fetch_driver_features,
+    get_driver_features,
+    id_key,
+)
+
+# Column order of the logistic feature matrix.
+LOGISTIC_FEATURES: Tuple[str, ...] = (
+    'kyc_approved',
+    'kyc_under_review',
+    'age_years',
+    'monthly_income_100k',
+    'success_ratio',
+    'failed_recent_6m',
+    'weekly_returns_10k',
+)
+
+# Column order of the linear feature matrix (also the order terms are summed).
+LINEAR_FEATURES: Tuple[str, ...] = (
+    'kyc_approved',
+    'age_years',
+    'weekly_returns_10k',
+    'interest_rate',
+    'repayment_duration_months',
+    'down_payment_ratio',
+    'success_ratio',
+    'failed_recent_6m',
+)
+
+# Settings that feed the compiled models; changing any of them rebuilds.
+MODEL_SETTINGS = frozenset({
+    'RISK_LOGISTIC_CONFIG',
+    'RISK_LOGISTIC_ARTIFACT',
+    'RISK_LINEAR_CONFIG',
+    'RISK_TRACE_SAMPLE_RATE',
+})
+
+logger = logging.getLogger('core.risk')
+
+
+def _get_linear_coeffs(cfg: Optional[Dict[str, object]] = None) -> Dict[str, float]:
     """Return intercept and coefficients for the linear risk model.
 
-    The settings may override defaults via RISK_LINEAR_CONFIG, e.g.:
+    ``cfg`` defaults to settings.RISK_LINEAR_CONFIG. The settings may override defaults via RISK_LINEAR_CONFIG, e.g.:
     RISK_LINEAR_CONFIG = {
         'intercept': 600,
         'coeffs': {
@@ -41,7 +90,8 @@ def _get_linear_coeffs() -> Dict[str, float]:
             'failed_recent_6m': -25.0,
         },
     }
-    cfg = getattr(settings, 'RISK_LINEAR_CONFIG', None)
+    if cfg is None:
+        cfg = getattr(settings, 'RISK_LINEAR_CONFIG', None)
     if not cfg or not isinstance(cfg, dict):
         return default
     intercept = cfg.get('intercept', default['intercept'])
@@ -51,10 +101,10 @@ def _get_linear_coeffs() -> Dict[str, float]:
     return {'intercept': float(intercept), 'coeffs': {k: float(v) for k, v in merged_coeffs.items()}}
 
 
-def _get_logistic_coeffs() -> Dict[str, float]:
+def _get_logistic_coeffs(cfg: Optional[Dict[str, object]] = None) -> Dict[str, float]:
     """Return intercept and coefficients for the logistic risk model.
 
-    Configurable via settings.RISK_LOGISTIC_CONFIG.
+    Configurable via settings.RISK_LOGISTIC_CONFIG, or pass ``cfg`` directly.
     Features used:
       - kyc_approved (0/1)
       - kyc_under_review (0/1)
@@ -76,7 +126,8 @@ def _get_logistic_coeffs() -> Dict[str, float]:
             'weekly_returns_10k': -0.4,
         },
     }
-    cfg = getattr(settings, 'RISK_LOGISTIC_CONFIG', None)
+    if cfg is None:
+        cfg = getattr(settings, 'RISK_LOGISTIC_CONFIG', None)
     if not cfg or not isinstance(cfg, dict):
         return default
     intercept = cfg.get('intercept', default['intercept'])
@@ -85,180 +136,296 @@ def _get_logistic_coeffs() -> Dict[str, float]:
     return {'intercept': float(intercept), 'coeffs': {k: float(v) for k, v in merged_coeffs.items()}}
 
 
-def _years_from_dob(dob) -> float:
-    if not dob:
-        return 0.0
-    try:
-        today = timezone.now().date()
-        years = today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
-        return float(max(0, years))
-    except Exception:
-        return 0.0
+def _config_version(cfg: Dict[str, object]) -> str:
+    payload = json.dumps(cfg, sort_keys=True, default=str).encode()
+    return hashlib.sha1(payload).hexdigest()[:12]
 
 
-def _sigmoid(x: float) -> float:
-    try:
-        return 1.0 / (1.0 + math.exp(-x))
-    except OverflowError:
-        # Gracefully handle extreme values
-        return 0.0 if x < 0 else 1.0
+@dataclass(frozen=True, eq=False)
+class LogisticModel:
+    """Immutable logistic model compiled once from settings.
+
+    ``weights`` is aligned with LOGISTIC_FEATURES and read-only; ``version``
+    changes whenever the intercept or any coefficient changes.
+    """
+
+    intercept: float
+    weights: np.ndarray
+    version: str
+
+    @classmethod
+    def from_config(cls, cfg: Dict[str, object], version: Optional[str] = None) -> 'LogisticModel':
+        coeffs = cfg['coeffs']
+        weights = np.array([float(coeffs.get(name, 0.0)) for name in LOGISTIC_FEATURES], dtype=np.float64)
+        weights.setflags(write=False)
+        return cls(
+            intercept=float(cfg['intercept']),
+            weights=weights,
+            version=version or _config_version(cfg),
+        )
+
+    def score_matrix(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return (z, probability, score) arrays for a feature matrix.
+
+        Columns of ``X`` follow LOGISTIC_FEATURES. The single-driver and batch
+        scorers both go through here so their results are identical.
+        """
+        z = np.full(X.shape[0], self.intercept, dtype=np.float64)
+        for col in range(len(LOGISTIC_FEATURES)):
+            z += self.weights[col] * X[:, col]
+        with np.errstate(over='ignore'):
+            probability = 1.0 / (1.0 + np.exp(-z))
+        score = np.clip(np.rint(300 + probability * 550), 300, 850).astype(np.int64)
+        return z, probability, score
+
+
+@dataclass(frozen=True)
+class LinearModel:
+    """Immutable linear model compiled once from settings."""
+
+    intercept: float
+    coeffs: Mapping[str, float]
+    version: str
+
+    @classmethod
+    def from_config(cls, cfg: Dict[str, object]) -> 'LinearModel':
+        return cls(
+            intercept=float(cfg['intercept']),
+            coeffs=MappingProxyType(dict(cfg['coeffs'])),
+            version=_config_version(cfg),
+        )
+
+    def score_matrix(self, X: np.ndarray) -> np.ndarray:
+        """Return clamped integer scores for a matrix whose columns follow LINEAR_FEATURES."""
+        score = np.full(X.shape[0], self.intercept, dtype=np.float64)
+        for col, name in enumerate(LINEAR_FEATURES):
+            score += self.coeffs.get(name, 0.0) * X[:, col]
+        return np.rint(np.clip(score, 300.0, 850.0)).astype(np.int64)
+
 
+def load_logistic_artifact(path) -> Dict[str, object]:
+    """Read a coefficient artifact written by ``manage.py train_risk_model``."""
+    with open(path, encoding='utf-8') as fh:
+        artifact = json.load(fh)
+    if artifact.get('model') != 'logistic' or not isinstance(artifact.get('coeffs'), dict):
+        raise ImproperlyConfigured(f"{path} is not a logistic risk model artifact")
+    return artifact
 
-def compute_driver_credit_score_logistic(applicant_id, vehicle: Optional[Vehicle] = None) -> Dict[str, object]:
+
+@lru_cache(maxsize=None)
+def get_logistic_model() -> LogisticModel:
+    """Process-wide logistic model; rebuilt only when its settings change.
+
+    A trained artifact named by RISK_LOGISTIC_ARTIFACT takes precedence over
+    RISK_LOGISTIC_CONFIG.
+    """
+    artifact_path = getattr(settings, 'RISK_LOGISTIC_ARTIFACT', None)
+    if artifact_path:
+        artifact = load_logistic_artifact(artifact_path)
+        return LogisticModel.from_config(artifact, version=artifact.get('version'))
+    return LogisticModel.from_config(_get_logistic_coeffs())
+
+
+@lru_cache(maxsize=None)
+def get_linear_model() -> LinearModel:
+    """Process-wide linear model; rebuilt only when its settings change."""
+    return LinearModel.from_config(_get_linear_coeffs())
+
+
+@lru_cache(maxsize=None)
+def _trace_sample_rate() -> float:
+    return max(0.0, min(1.0, float(getattr(settings, 'RISK_TRACE_SAMPLE_RATE', 1.0))))
+
+
+@receiver(setting_changed)
+def _reset_compiled_models(setting, **kwargs):
+    if setting in MODEL_SETTINGS:
+        get_logistic_model.cache_clear()
+        get_linear_model.cache_clear()
+        _trace_sample_rate.cache_clear()
+
+
+def _should_trace() -> bool:
+    """DEBUG on the 'core.risk' logger enables traces, sampled by RISK_TRACE_SAMPLE_RATE."""
+    if not logger.isEnabledFor(logging.DEBUG):
+        return False
+    rate = _trace_sample_rate()
+    return rate >= 1.0 or random.random() < rate
+
+
+def _score_category(score: int) -> str:
+    if score >= 750:
+        return 'Excellent'
+    if score >= 650:
+        return 'Good'
+    if score >= 550:
+        return 'Fair'
+    return 'Poor'
+
+
+def _weekly_returns_10k(vehicle: Optional[Vehicle]) -> float:
+    if not vehicle:
+        return 0.0
+    try:
+        weekly_returns = float(vehicle.weekly_returns or 0.0)
+    except Exception:
+        weekly_returns = 0.0
+    return weekly_returns / 10000.0
+
+
+def _logistic_feature_matrix(
+    features: Sequence[DriverFeatures],
+    vehicles: Sequence[Optional[Vehicle]],
+) -> np.ndarray:
+    """Build the (n, len(LOGISTIC_FEATURES)) matrix for the logistic model."""
+    n = len(features)
+    status = np.array([f.kyc_status for f in features], dtype=object)
+    success = np.array([f.total_success for f in features], dtype=np.float64)
+    failed = np.array([f.total_failed for f in features], dtype=np.float64)
+    total = success + failed
+    success_ratio = np.divide(success, total, out=np.zeros(n, dtype=np.float64), where=total > 0)
+    return np.column_stack([
+        (status == KYC.VerificationStatus.APPROVED).astype(np.float64),
+        (status == KYC.VerificationStatus.UNDER_REVIEW).astype(np.float64),
+        ages_from_dobs([f.date_of_birth for f in features], [f.as_of for f in features]),
+        np.array([f.monthly_income for f in features], dtype=np.float64) / 100000.0,
+        success_ratio,
+        np.array([f.failed_recent_6m for f in features], dtype=np.float64),
+        np.array([_weekly_returns_10k(v) for v in vehicles], dtype=np.float64),
+    ])
+
+
+def compute_driver_credit_score_logistic(
+    applicant_id,
+    vehicle: Optional[Vehicle] = None,
+    features: Optional[DriverFeatures] = None,
+) -> Dict[str, object]:
     """Compute probability of creditworthiness using a logistic model.
 
+    ``features`` may be passed when the caller has already fetched them via
+    get_driver_features(); otherwise they are loaded with one query.
+
     Returns a dict with:
       - probability: float in [0,1]
       - score: int in [300, 850]
       - category: str in {Excellent, Good, Fair, Poor}
     """
-    cfg = _get_logistic_coeffs()
-    intercept = float(cfg['intercept'])
-    C = cfg['coeffs']
-
-    # KYC and personal features
-    kyc = KYC.objects.filter(user_id=applicant_id).first()
-    kyc_approved = 1.0 if (kyc and kyc.status == KYC.VerificationStatus.APPROVED) else 0.0
-    kyc_under_review = 1.0 if (kyc and kyc.status == KYC.VerificationStatus.UNDER_REVIEW) else 0.0
-    age_years = _years_from_dob(getattr(kyc, 'date_of_birth', None)) if kyc else 0.0
-    try:
-        income = float(getattr(kyc, 'monthly_income', 0.0) or 0.0)
-    except Exception:
-        income = 0.0
-    monthly_income_100k = income / 100000.0
-
-    # Payment history
-    total_success = Payment.objects.filter(driver_id=applicant_id, status=Payment.PaymentStatus.SUCCESSFUL).count()
-    total_failed = Payment.objects.filter(driver_id=applicant_id, status=Payment.PaymentStatus.FAILED).count()
-    total = total_success + total_failed
-    success_ratio = float(total_success) / float(total) if total > 0 else 0.0
-
-    six_months_ago = timezone.now() - timedelta(days=6 * 30)
-    failed_recent_6m = Payment.objects.filter(
-        driver_id=applicant_id,
-        status=Payment.PaymentStatus.FAILED,
-        payment_date__gte=six_months_ago,
-    ).count()
-
-    # Vehicle financials (optional)
-    weekly_returns_10k = 0.0
-    if vehicle:
-        try:
-            weekly_returns = float(vehicle.weekly_returns or 0.0)
-        except Exception:
-            weekly_returns = 0.0
-        weekly_returns_10k = weekly_returns / 10000.0
-
-    # Logistic linear combination
-    z = intercept
-    z += C.get('kyc_approved', 0.0) * kyc_approved
-    z += C.get('kyc_under_review', 0.0) * kyc_under_review
-    z += C.get('age_years', 0.0) * age_years
-    z += C.get('monthly_income_100k', 0.0) * monthly_income_100k
-    z += C.get('success_ratio', 0.0) * success_ratio
-    z += C.get('failed_recent_6m', 0.0) * float(failed_recent_6m)
-    z += C.get('weekly_returns_10k', 0.0) * weekly_returns_10k
-
-    # Debug print of features and linear term for terminal visibility
-    print(
-        (
-            f"[CREDIT LOGISTIC] user={applicant_id} "
-            f"features: kyc_approved={kyc_approved}, kyc_under_review={kyc_under_review}, age_years={age_years}, "
-            f"monthly_income_100k={monthly_income_100k:.4f}, success_ratio={success_ratio:.4f}, "
-            f"failed_recent_6m={failed_recent_6m}, weekly_returns_10k={weekly_returns_10k:.4f}"
+    model = get_logistic_model()
+    if features is None:
+        features = get_driver_features(applicant_id)
+
+    X = _logistic_feature_matrix([features], [vehicle])
+    z, probability, score = model.score_matrix(X)
+    z, probability, score = float(z[0]), float(probability[0]), int(score[0])
+    category = _score_category(score)
+
+    if _should_trace():
+        logger.debug(
+            "[CREDIT LOGISTIC] user=%s model=%s z=%.4f probability=%.4f score=%s category=%s",
+            applicant_id,
+            model.version,
+            z,
+            probability,
+            score,
+            category,
+            extra={
+                'risk_trace': {
+                    'user': str(applicant_id),
+                    'model_version': model.version,
+                    'features': dict(zip(LOGISTIC_FEATURES, X[0].tolist())),
+                    'z': z,
+                    'probability': probability,
+                    'score': score,
+                    'category': category,
+                }
+            },
         )
-    )
-
-    probability = _sigmoid(z)
-    score = int(round(300 + probability * 550))
-    score = max(300, min(850, score))
-
-    if score >= 750:
-        category = 'Excellent'
-    elif score >= 650:
-        category = 'Good'
-    elif score >= 550:
-        category = 'Fair'
-    else:
-        category = 'Poor'
-
-    # Final computation printout
-    print(
-        (
-            f"[CREDIT LOGISTIC] z={z:.4f}, probability={probability:.4f}, score={score}, category={category}"
-        )
-    )
 
     return {
-        'probability': float(probability),
-        'score': int(score),
+        'probability': probability,
+        'score': score,
         'category': category,
     }
 
 
-def compute_driver_credit_score_linear(applicant_id, vehicle: Vehicle) -> int:
-    """Compute credit score using a simple linear regression-style formula.
+def score_drivers_logistic(
+    applicant_ids: Iterable,
+    vehicles: Optional[Sequence[Optional[Vehicle]]] = None,
+) -> List[Dict[str, object]]:
+    """Score many drivers in one pass with the logistic model.
 
-    Features derive from existing KYC, Payment, and Vehicle fields and combine
-    via configurable coefficients. The final score is clamped to [300, 850].
+    ``vehicles`` is optional and, when given, must be aligned with
+    ``applicant_ids`` (entries may be None). Features for all drivers are
+    fetched with a single query, and each result equals
+    compute_driver_credit_score_logistic for the same pair. Results are
+    returned in input order.
     """
-    coeffs_cfg = _get_linear_coeffs()
-    intercept = float(coeffs_cfg['intercept'])
-    C = coeffs_cfg['coeffs']
-
-    # KYC
-    kyc = KYC.objects.filter(user_id=applicant_id).first()
-    kyc_approved = 1.0 if (kyc and kyc.status == KYC.VerificationStatus.APPROVED) else 0.0
-    age_years = _years_from_dob(getattr(kyc, 'date_of_birth', None)) if kyc else 0.0
-
-    # Payments
-    total_success = Payment.objects.filter(driver_id=applicant_id, status=Payment.PaymentStatus.SUCCESSFUL).count()
-    total_failed = Payment.objects.filter(driver_id=applicant_id, status=Payment.PaymentStatus.FAILED).count()
-    total = total_success + total_failed
-    success_ratio = float(total_success) / float(total) if total > 0 else 0.0
-
-    six_months_ago = timezone.now() - timedelta(days=6 * 30)
-    failed_recent_6m = Payment.objects.filter(
-        driver_id=applicant_id,
-        status=Payment.PaymentStatus.FAILED,
-        payment_date__gte=six_months_ago,
-    ).count()
-
-    # Vehicle financials
-    try:
-        weekly_returns = float(vehicle.weekly_returns or 0.0)
-    except Exception:
-        weekly_returns = 0.0
-    weekly_returns_10k = weekly_returns / 10000.0
+    keys = [id_key(a) for a in applicant_ids]
+    n = len(keys)
+    if vehicles is None:
+        vehicles = [None] * n
+    else:
+        vehicles = list(vehicles)
+        if len(vehicles) != n:
+            raise ValueError('vehicles must be aligned with applicant_ids')
+    if n == 0:
+        return []
+
+    by_id = fetch_driver_features(keys)
+    X = _logistic_feature_matrix([by_id.get(k, EMPTY_FEATURES) for k in keys], vehicles)
+    _, probability, score = get_logistic_model().score_matrix(X)
+
+    return [
+        {
+            'probability': float(p),
+            'score': int(s),
+            'category': _score_category(int(s)),
+        }
+        for p, s in zip(probability, score)
+    ]
 
-    try:
-        interest_rate = float(vehicle.interest_rate or 0.0)
-    except Exception:
-        interest_rate = 0.0
 
+def _vehicle_float(vehicle: Optional[Vehicle], field: str) -> float:
     try:
-        repayment_duration_months = float(vehicle.repayment_duration or 0)
+        return float(getattr(vehicle, field) or 0.0)
     except Exception:
-        repayment_duration_months = 0.0
+        return 0.0
 
-    try:
-        total_cost = float(vehicle.total_cost or 0.0)
-        amount_paid = float(vehicle.amount_paid or 0.0)
-        down_payment_ratio = (amount_paid / total_cost) if total_cost > 0 else 0.0
-    except Exception:
-        down_payment_ratio = 0.0
-
-    # Linear combination
-    score = intercept
-    score += C.get('kyc_approved', 0.0) * kyc_approved
-    score += C.get('age_years', 0.0) * age_years
-    score += C.get('weekly_returns_10k', 0.0) * weekly_returns_10k
-    score += C.get('interest_rate', 0.0) * interest_rate
-    score += C.get('repayment_duration_months', 0.0) * repayment_duration_months
-    score += C.get('down_payment_ratio', 0.0) * down_payment_ratio
-    score += C.get('success_ratio', 0.0) * success_ratio
-    score += C.get('failed_recent_6m', 0.0) * float(failed_recent_6m)
-
-    # Clamp and round
-    score = int(round(max(300.0, min(850.0, score))))
-    return score
\ No newline at end of file
+
+def _linear_feature_matrix(
+    features: Sequence[DriverFeatures],
+    vehicles: Sequence[Optional[Vehicle]],
+) -> np.ndarray:
+    """Build the (n, len(LINEAR_FEATURES)) matrix for the linear model."""
+    n = len(features)
+    success = np.array([f.total_success for f in features], dtype=np.float64)
+    failed = np.array([f.total_failed for f in features], dtype=np.float64)
+    total = success + failed
+    total_cost = np.array([_vehicle_float(v, 'total_cost') for v in vehicles], dtype=np.float64)
+    amount_paid = np.array([_vehicle_float(v, 'amount_paid') for v in vehicles], dtype=np.float64)
+    return np.column_stack([
+        np.array([f.kyc_approved for f in features], dtype=np.float64),
+        ages_from_dobs([f.date_of_birth for f in features], [f.as_of for f in features]),
+        np.array([_weekly_returns_10k(v) for v in vehicles], dtype=np.float64),
+        np.array([_vehicle_float(v, 'interest_rate') for v in vehicles], dtype=np.float64),
+        np.array([_vehicle_float(v, 'repayment_duration') for v in vehicles], dtype=np.float64),
+        np.divide(amount_paid, total_cost, out=np.zeros(n, dtype=np.float64), where=total_cost > 0),
+        np.divide(success, total, out=np.zeros(n, dtype=np.float64), where=total > 0),
+        np.array([f.failed_recent_6m for f in features], dtype=np.float64),
+    ])
+
+
+def compute_driver_credit_score_linear(
+    applicant_id,
+    vehicle: Vehicle,
+    features: Optional[DriverFeatures] = None,
+) -> int:
+    """Compute credit score using a simple linear regression-style formula.
+
+    Features derive from existing KYC, Payment, and Vehicle fields and combine
+    via configurable coefficients. The final score is clamped to [300, 850].
+    """
+    if features is None:
+        features = get_driver_features(applicant_id)
+    X = _linear_feature_matrix([features], [vehicle])
+    return int(get_linear_model().score_matrix(X)[0])
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+from django.db.models import Count, Q
+
+from .models import DriverApplication, Payment
+from .risk_features import EMPTY_FEATURES, fetch_driver_features, id_key, iter_application_snapshots
+from .risk_model import LOGISTIC_FEATURES, _logistic_feature_matrix
+
+
+@dataclass
+class FitResult:
+    intercept: float
+    coeffs: dict
+    iterations: int
+    converged: bool
+
+
+def iter_training_chunks(
+    chunk_size: int = 2000,
+    min_payments: int = 4,
+    max_failed_ratio: float = 0.1,
+    current_stats: bool = False,
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """Yield (X, y) blocks for approved applications with a repayment outcome.
+
+    Applications are streamed with a server-side cursor. Each block costs one
+    feature query and one payment aggregate, so memory stays bounded by
+    ``chunk_size`` rows. An application is labelled creditworthy (1) when the
+    driver's payments on that vehicle number at least ``min_payments`` and no
+    more than ``max_failed_ratio`` of them failed. Applications with fewer
+    payments have no outcome yet and are skipped.
+
+    Features are rebuilt as of each application date (see
+    iter_application_snapshots), so the payments that decide the label do
+    not leak into the inputs. ``current_stats`` uses today's
+    DriverPaymentStats instead; those already count the outcome payments,
+    so a model fitted on them scores near-perfect AUC and is useless for
+    new applicants. It exists only to compare against.
+    """
+    approved = DriverApplication.objects.filter(status=DriverApplication.ApplicationStatus.APPROVED)
+    if not current_stats:
+        for snapshots in iter_application_snapshots(approved, chunk_size=chunk_size):
+            block = _training_block(
+                [(snap.applicant_id, snap.vehicle.id) for snap in snapshots],
+                [snap.features for snap in snapshots],
+                [snap.vehicle for snap in snapshots],
+                min_payments,
+                max_failed_ratio,
+            )
+            if block is not None:
+                yield block
+        return
+
+    apps = (
+        approved.select_related('vehicle')
+        .only('id', 'applicant_id', 'vehicle__id', 'vehicle__weekly_returns')
+        .order_by('application_date', 'id')
+    )
+    batch = []
+    for app in apps.iterator(chunk_size=chunk_size):
+        batch.append(app)
+        if len(batch) >= chunk_size:
+            block = _current_block(batch, min_payments, max_failed_ratio)
+            if block is not None:
+                yield block
+            batch = []
+    if batch:
+        block = _current_block(batch, min_payments, max_failed_ratio)
+        if block is not None:
+            yield block
+
+
+def _current_block(batch, min_payments: int, max_failed_ratio: float) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    features = fetch_driver_features(app.applicant_id for app in batch)
+    return _training_block(
+        [(app.applicant_id, app.vehicle_id) for app in batch],
+        [features.get(id_key(app.applicant_id), EMPTY_FEATURES) for app in batch],
+        [app.vehicle for app in batch],
+        min_payments,
+        max_failed_ratio,
+    )
+
+
+def _training_block(pairs, features, vehicles, min_payments: int, max_failed_ratio: float) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """Label (driver, vehicle) pairs from their payments and build the matrix."""
+    outcomes = {
+        (str(row['driver_id']), str(row['vehicle_id'])): (row['ok'], row['bad'])
+        for row in Payment.objects.filter(
+            driver_id__in={driver_id for driver_id, _ in pairs},
+            vehicle_id__in={vehicle_id for _, vehicle_id in pairs},
+        )
+        .values('driver_id', 'vehicle_id')
+        .annotate(
+            ok=Count('id', filter=Q(status=Payment.PaymentStatus.SUCCESSFUL)),
+            bad=Count('id', filter=Q(status=Payment.PaymentStatus.FAILED)),
+        )
+        .order_by()
+    }
+
+    kept, labels = [], []
+    for i, (driver_id, vehicle_id) in enumerate(pairs):
+        ok, bad = outcomes.get((str(driver_id), str(vehicle_id)), (0, 0))
+        total = ok + bad
+        if total < min_payments:
+            continue
+        kept.append(i)
+        labels.append(1.0 if bad / total <= max_failed_ratio else 0.0)
+    if not kept:
+        return None
+    X = _logistic_feature_matrix([features[i] for i in kept], [vehicles[i] for i in kept])
+    return X, np.array(labels, dtype=np.float64)
+
+
+def fit_logistic_irls(
+    X: np.ndarray,
+    y: np.ndarray,
+    l2: float = 1e-4,
+    max_iter: int = 25,
+    tol: float = 1e-6,
+) -> FitResult:
+    """Fit an L2-regularised logistic regression by IRLS (Newton's method).
+
+    The intercept is not penalised. Each iteration is a handful of dense
+    matrix products over ``X``, so the cost is linear in the number of rows.
+    """
+    n, k = X.shape
+    X1 = np.column_stack([np.ones(n), X])
+    beta = np.zeros(k + 1)
+    penalty = np.full(k + 1, l2)
+    penalty[0] = 0.0
+
+    converged = False
+    iterations = 0
+    for iterations in range(1, max_iter + 1):
+        with np.errstate(over='ignore'):
+            p = 1.0 / (1.0 + np.exp(-(X1 @ beta)))
+        w = np.clip(p * (1.0 - p), 1e-10, None)
+        gradient = X1.T @ (y - p) - penalty * beta
+        hessian = (X1 * w[:, None]).T @ X1 + np.diag(penalty)
+        step = np.linalg.solve(hessian, gradient)
+        beta += step
+        if np.max(np.abs(step)) < tol:
+            converged = True
+            break
+
+    return FitResult(
+        intercept=float(beta[0]),
+        coeffs={name: float(b) for name, b in zip(LOGISTIC_FEATURES, beta[1:])},
+        iterations=iterations,
+        converged=converged,
+    )
+
+
+def predict_proba(fit: FitResult, X: np.ndarray) -> np.ndarray:
+    weights = np.array([fit.coeffs[name] for name in LOGISTIC_FEATURES])
+    with np.errstate(over='ignore'):
+        return 1.0 / (1.0 + np.exp(-(fit.intercept + X @ weights)))
+
+
+def roc_auc(y: np.ndarray, scores: np.ndarray) -> Optional[float]:
+    """Area under the ROC curve via the rank-sum statistic (ties averaged)."""
+    n_pos = int(np.sum(y == 1))
+    n_neg = int(y.size - n_pos)
+    if n_pos == 0 or n_neg == 0:
+        return None
+    order = np.argsort(scores, kind='mergesort')
+    sorted_scores = scores[order]
+    ranks = np.empty(scores.size, dtype=np.float64)
+    ranks[order] = np.arange(1, scores.size + 1)
+    # Average the ranks of tied scores
+    _, inverse, counts = np.unique(sorted_scores, return_inverse=True, return_counts=True)
+    if np.any(counts > 1):
+        rank_sums = np.bincount(inverse, weights=np.arange(1, scores.size + 1))
+        ranks[order] = (rank_sums / counts)[inverse]
+    return float((ranks[y == 1].sum() - n_pos * (n_pos + 1) / 2.0) / (n_pos * n_neg))
@@ -0,0 +1,282 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Set
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .amortization import compute_fleet_arrears
+from .models import (
+    DriverApplication,
+    Payment,
+    PaymentDailyRollup,
+    PaymentWeeklyRollup,
+    RollupWatermark,
+    Vehicle,
+    VehicleFinancialRollup,
+)
+
+PAYMENTS_WATERMARK = 'portfolio_payments'
+VEHICLES_WATERMARK = 'portfolio_vehicles'
+PAYMENT_METRICS = ('successful_count', 'failed_count', 'collected_amount', 'failed_amount')
+VEHICLE_METRICS = (
+    'vehicle_count', 'financed_count', 'fully_paid_count', 'in_arrears_count', 'defaulted_count',
+    'total_cost', 'total_receivable', 'amount_collected', 'arrears_amount', 'weekly_expected',
+    'computed_at',
+)
+
+
+def _lag() -> timedelta:
+    """How far behind now the payment watermark trails.
+
+    created_at is stamped at insert, so a slow transaction can commit a row
+    older than one already committed; the lag leaves time for it.
+    """
+    return timedelta(seconds=int(getattr(settings, 'ROLLUP_LAG_SECONDS', 300)))
+
+
+def _default_days() -> int:
+    return int(getattr(settings, 'PORTFOLIO_DEFAULT_DAYS_PAST_DUE', 30))
+
+
+def _lock_watermark(name: str) -> RollupWatermark:
+    """Fetch a watermark row under a row lock; concurrent runs queue here."""
+    RollupWatermark.objects.get_or_create(name=name)
+    return RollupWatermark.objects.select_for_update().get(name=name)
+
+
+def _upsert_increments(model, period_field: str, deltas: Dict[tuple, Dict[str, object]]) -> None:
+    """Add ``deltas`` keyed by (owner_id, vehicle_type, period) onto existing rows."""
+    if not deltas:
+        return
+    owners = {owner for owner, _, _ in deltas}
+    periods = {period for _, _, period in deltas}
+    existing = {
+        (row['owner_id'], row['vehicle_type'], row[period_field]): row
+        for row in model.objects.filter(owner_id__in=owners, **{f'{period_field}__in': periods}).values(
+            'owner_id', 'vehicle_type', period_field, *PAYMENT_METRICS
+        )
+    }
+    rows = []
+    for key, delta in deltas.items():
+        current = existing.get(key, {})
+        owner_id, vehicle_type, period = key
+        rows.append(model(
+            owner_id=owner_id,
+            vehicle_type=vehicle_type,
+            **{period_field: period},
+            **{name: current.get(name, 0) + delta[name] for name in PAYMENT_METRICS},
+        ))
+    model.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['owner', 'vehicle_type', period_field],
+        update_fields=list(PAYMENT_METRICS),
+    )
+
+
+def roll_up_payments(until=None) -> Set:
+    """Fold payments made since the watermark into the daily/weekly rollups.
+
+    Only payments inserted in (watermark, until] are read, grouped in the
+    database by owner, vehicle type and payment day. The watermark follows
+    insert time rather than payment_date so back-dated imports still count. ``until`` defaults to now minus
+    ROLLUP_LAG_SECONDS. Returns the ids of owners whose rollups changed.
+    """
+    until = until or timezone.now() - _lag()
+    with transaction.atomic():
+        mark = _lock_watermark(PAYMENTS_WATERMARK)
+        if mark.value is not None and mark.value >= until:
+            return set()
+        window = Payment.objects.filter(created_at__lte=until)
+        if mark.value is not None:
+            window = window.filter(created_at__gt=mark.value)
+        grouped = (
+            window.values(
+                owner=F('vehicle__owner_id'),
+                type=F('vehicle__vehicle_type'),
+                day=TruncDate('payment_date'),
+            )
+            .annotate(
+                successful_count=Count('id', filter=Q(status=Payment.PaymentStatus.SUCCESSFUL)),
+                failed_count=Count('id', filter=Q(status=Payment.PaymentStatus.FAILED)),
+                collected_amount=Sum('amount', filter=Q(status=Payment.PaymentStatus.SUCCESSFUL)),
+                failed_amount=Sum('amount', filter=Q(status=Payment.PaymentStatus.FAILED)),
+            )
+            .order_by()
+        )
+
+        daily = {}
+        weekly = defaultdict(lambda: dict.fromkeys(PAYMENT_METRICS, 0))
+        for row in grouped:
+            delta = {name: row[name] or 0 for name in PAYMENT_METRICS}
+            daily[(row['owner'], row['type'], row['day'])] = delta
+            week_start = row['day'] - timedelta(days=row['day'].weekday())
+            bucket = weekly[(row['owner'], row['type'], week_start)]
+            for name in PAYMENT_METRICS:
+                bucket[name] += delta[name]
+
+        _upsert_increments(PaymentDailyRollup, 'day', daily)
+        _upsert_increments(PaymentWeeklyRollup, 'week_start', dict(weekly))
+        mark.value = until
+        mark.save()
+    return {owner for owner, _, _ in daily}
+
+
+def _naira(kobo) -> Decimal:
+    return (Decimal(int(round(kobo))) / 100).quantize(Decimal('0.01'))
+
+
+def roll_up_vehicles(owner_ids: Optional[Iterable] = None, as_of=None) -> int:
+    """Recompute fleet financials per owner and vehicle type.
+
+    Vehicle counts and costs come from one grouped query; arrears, defaults
+    and collections come from the vectorized amortization engine and are
+    summed per group with numpy. ``owner_ids=None`` recomputes every owner.
+    Each group's ``weekly_expected`` is also recorded on the PaymentWeeklyRollup
+    row of the week containing ``as_of``, so past weeks keep the figure they
+    had. Returns the number of rollup rows written.
+    """
+    now = timezone.now()
+    as_of = as_of or timezone.localdate(now)
+    vehicles = Vehicle.objects.all()
+    if owner_ids is not None:
+        owner_ids = list(owner_ids)
+        vehicles = vehicles.filter(owner_id__in=owner_ids)
+
+    groups = {}
+    for row in (
+        vehicles.values('owner_id', 'vehicle_type')
+        .annotate(
+            vehicle_count=Count('id'),
+            fully_paid_count=Count('id', filter=Q(is_fully_paid=True)),
+            total_cost=Sum('total_cost'),
+        )
+        .order_by()
+    ):
+        groups[(row['owner_id'], row['vehicle_type'])] = VehicleFinancialRollup(
+            owner_id=row['owner_id'],
+            vehicle_type=row['vehicle_type'],
+            vehicle_count=row['vehicle_count'],
+            fully_paid_count=row['fully_paid_count'],
+            total_cost=row['total_cost'] or Decimal('0'),
+            computed_at=now,
+        )
+
+    fleet = compute_fleet_arrears(vehicles, as_of=as_of)
+    if len(fleet):
+        keys = list(zip(fleet.owner_ids, fleet.vehicle_types))
+        unique_keys = list(dict.fromkeys(keys))
+        index = {key: i for i, key in enumerate(unique_keys)}
+        group = np.array([index[key] for key in keys], dtype=np.int64)
+        size = len(unique_keys)
+        outstanding = fleet.paid < fleet.total
+
+        def count(mask):
+            return np.bincount(group, weights=mask.astype(np.int64), minlength=size).astype(np.int64)
+
+        def kobo_sum(values):
+            return np.bincount(group, weights=values, minlength=size)
+
+        financed = np.bincount(group, minlength=size)
+        in_arrears = count(fleet.arrears > 0)
+        defaulted = count(fleet.days_past_due > _default_days())
+        receivable = kobo_sum(fleet.total)
+        collected = kobo_sum(fleet.paid)
+        arrears = kobo_sum(fleet.arrears)
+        expected = kobo_sum(np.where(outstanding, fleet.installment, 0))
+
+        for i, key in enumerate(unique_keys):
+            rollup = groups[key]
+            rollup.financed_count = int(financed[i])
+            rollup.in_arrears_count = int(in_arrears[i])
+            rollup.defaulted_count = int(defaulted[i])
+            rollup.total_receivable = _naira(receivable[i])
+            rollup.amount_collected = _naira(collected[i])
+            rollup.arrears_amount = _naira(arrears[i])
+            rollup.weekly_expected = _naira(expected[i])
+
+    rows = list(groups.values())
+    with transaction.atomic():
+        existing = VehicleFinancialRollup.objects.all()
+        if owner_ids is not None:
+            existing = existing.filter(owner_id__in=owner_ids)
+        stale = [
+            pk for pk, owner_id, vehicle_type in existing.values_list('id', 'owner_id', 'vehicle_type')
+            if (owner_id, vehicle_type) not in groups
+        ]
+        if stale:
+            VehicleFinancialRollup.objects.filter(id__in=stale).delete()
+        VehicleFinancialRollup.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['owner', 'vehicle_type'],
+            update_fields=list(VEHICLE_METRICS),
+        )
+        week_start = as_of - timedelta(days=as_of.weekday())
+        PaymentWeeklyRollup.objects.bulk_create(
+            [
+                PaymentWeeklyRollup(
+                    owner_id=row.owner_id,
+                    vehicle_type=row.vehicle_type,
+                    week_start=week_start,
+                    expected_amount=row.weekly_expected,
+                )
+                for row in rows
+            ],
+            update_conflicts=True,
+            unique_fields=['owner', 'vehicle_type', 'week_start'],
+            update_fields=['expected_amount'],
+        )
+    return len(rows)
+
+
+def update_portfolio_rollups(full: bool = False) -> Dict[str, object]:
+    """Bring every portfolio rollup up to date; what the management command runs.
+
+    Payments are folded in from their watermark. Vehicle financials are
+    recomputed for owners with new payments, edited vehicles or new
+    approvals since the last run, and for every owner on the first run of a
+    day (arrears age with the calendar even when nothing is written) or when
+    ``full`` is set.
+    """
+    owners = roll_up_payments()
+    payment_owners = len(owners)
+    now = timezone.now()
+    with transaction.atomic():
+        mark = _lock_watermark(VEHICLES_WATERMARK)
+        refresh_all = full or mark.value is None or timezone.localdate(mark.value) < timezone.localdate(now)
+        if refresh_all:
+            written = roll_up_vehicles()
+            refreshed = 'all'
+        else:
+            owners |= set(Vehicle.objects.filter(updated_at__gt=mark.value).values_list('owner_id', flat=True))
+            owners |= set(
+                DriverApplication.objects.filter(decision_date__gt=mark.value).values_list('vehicle__owner_id', flat=True)
+            )
+            written = roll_up_vehicles(owners) if owners else 0
+            refreshed = len(owners)
+        mark.value = now
+        mark.save()
+    return {'payment_owners': payment_owners, 'vehicle_owners': refreshed, 'vehicle_rows': written}
+
+
+def reset_payment_rollups() -> None:
+    """Drop payment rollups and their watermark so the next run rebuilds them.
+
+    Needed after payments are edited or deleted, which the incremental pass
+    cannot see. Weekly rows keep their ``expected_amount`` snapshot, which
+    cannot be rebuilt, and only have their payment metrics zeroed.
+    """
+    with transaction.atomic():
+        PaymentDailyRollup.objects.all().delete()
+        PaymentWeeklyRollup.objects.filter(expected_amount__isnull=True).delete()
+        PaymentWeeklyRollup.objects.update(**dict.fromkeys(PAYMENT_METRICS, 0))
+        RollupWatermark.objects.filter(name=PAYMENTS_WATERMARK).delete()
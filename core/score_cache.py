@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .models import Vehicle
+from .risk_features import aget_driver_features, id_key
+from .risk_model import compute_driver_credit_score_logistic, get_logistic_model
+
+KEY_PREFIX = 'risk'
+
+
+def _cache():
+    return caches[getattr(settings, 'RISK_SCORE_CACHE_ALIAS', 'default')]
+
+
+def _ttl() -> int:
+    return int(getattr(settings, 'RISK_SCORE_CACHE_TTL', 300))
+
+
+def _generation_key(kind: str, object_id) -> str:
+    return f'{KEY_PREFIX}:gen:{kind}:{id_key(object_id)}'
+
+
+def _generations(*keys: str) -> Dict[str, str]:
+    """Fetch generation tokens, creating any that are missing.
+
+    Tokens are random rather than counters, so a token that was evicted can
+    never come back with an old value and resurrect stale scores.
+    """
+    cache = _cache()
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            cache.add(key, uuid.uuid4().hex, None)
+            found[key] = cache.get(key)
+    return found
+
+
+def invalidate_driver(driver_id) -> None:
+    """Drop every cached score for a driver (KYC or payment change)."""
+    _cache().set(_generation_key('driver', driver_id), uuid.uuid4().hex, None)
+
+
+def invalidate_vehicle(vehicle_id) -> None:
+    """Drop every cached score that used this vehicle's financials."""
+    _cache().set(_generation_key('vehicle', vehicle_id), uuid.uuid4().hex, None)
+
+
+def _score_key(driver_id, vehicle_id, gens: Dict[str, str]) -> str:
+    return ':'.join([
+        KEY_PREFIX,
+        'score',
+        id_key(driver_id),
+        id_key(vehicle_id) if vehicle_id else '-',
+        gens[_generation_key('driver', driver_id)],
+        gens[_generation_key('vehicle', vehicle_id)] if vehicle_id else '-',
+        get_logistic_model().version,
+    ])
+
+
+def _generation_keys(driver_id, vehicle_id) -> List[str]:
+    keys = [_generation_key('driver', driver_id)]
+    if vehicle_id:
+        keys.append(_generation_key('vehicle', vehicle_id))
+    return keys
+
+
+def get_or_compute_score(driver_id, vehicle: Optional[Vehicle] = None) -> Tuple[Dict[str, object], bool]:
+    """Return (details, cached) for a driver/vehicle pair.
+
+    Scores are keyed by driver, vehicle and config version, plus the current
+    invalidation generation of the driver and vehicle. The model version
+    comes from the compiled logistic model, so a coefficient change misses.
+    """
+    vehicle_id = getattr(vehicle, 'id', None)
+    key = _score_key(driver_id, vehicle_id, _generations(*_generation_keys(driver_id, vehicle_id)))
+
+    cache = _cache()
+    details = cache.get(key)
+    if details is not None:
+        return details, True
+    details = compute_driver_credit_score_logistic(applicant_id=driver_id, vehicle=vehicle)
+    cache.set(key, details, _ttl())
+    return details, False
+
+
+async def _agenerations(*keys: str) -> Dict[str, str]:
+    cache = _cache()
+    found = await cache.aget_many(keys)
+    for key in keys:
+        if key not in found:
+            await cache.aadd(key, uuid.uuid4().hex, None)
+            found[key] = await cache.aget(key)
+    return found
+
+
+async def ascore_key(driver_id, vehicle_id=None) -> str:
+    """Cache key of the current score for a driver/vehicle pair.
+
+    Needs only ids, so async views can look it up while the vehicle row is
+    still being fetched.
+    """
+    return _score_key(driver_id, vehicle_id, await _agenerations(*_generation_keys(driver_id, vehicle_id)))
+
+
+async def aget_or_compute_score(key: str, driver_id, vehicle: Optional[Vehicle] = None) -> Tuple[Dict[str, object], bool]:
+    """Async ``get_or_compute_score`` for a key from ``ascore_key``.
+
+    On a miss the features are read with the async ORM and scored in
+    process, so no request thread is held by a sync_to_async call.
+    """
+    cache = _cache()
+    details = await cache.aget(key)
+    if details is not None:
+        return details, True
+    features = await aget_driver_features(driver_id)
+    details = compute_driver_credit_score_logistic(applicant_id=driver_id, vehicle=vehicle, features=features)
+    await cache.aset(key, details, _ttl())
+    return details, False
@@ -227,4 +227,22 @@ class NotificationSerializer(serializers.ModelSerializer):
             'id', 'user', 'title', 'message', 'type', 'application',
             'is_read', 'created_at'
         )
-        read_only_fields = ('id', 'created_at')
\ No newline at end of file
+        read_only_fields = ('id', 'created_at')
+
+
+class NotificationCompactSerializer(serializers.ModelSerializer):
+    """Notification with the application reduced to its id and a few summary fields."""
+    application = serializers.PrimaryKeyRelatedField(read_only=True)
+    application_status = serializers.CharField(source='application.status', read_only=True, default=None)
+    vehicle_registration_number = serializers.CharField(
+        source='application.vehicle.registration_number', read_only=True, default=None
+    )
+
+    class Meta:
+        model = Notification
+        fields = (
+            'id', 'user', 'title', 'message', 'type', 'application',
+            'application_status', 'vehicle_registration_number',
+            'is_read', 'created_at'
+        )
+        read_only_fields = fields
@@ -0,0 +1,74 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .activity import application_event, kyc_event, last_recorded_status, payment_event
+from .models import KYC, DriverApplication, Notification, Payment, Vehicle
+from .notification_stream import publish_notification
+from .payment_stats import rebuild_driver_stats, record_payment
+from .score_cache import invalidate_driver, invalidate_vehicle
+
+
+@receiver(post_save, sender=Payment)
+def update_payment_stats_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        record_payment(instance)
+    else:
+        # Status or amount may have changed; recompute from history.
+        rebuild_driver_stats([instance.driver_id])
+
+
+@receiver(post_delete, sender=Payment)
+def update_payment_stats_on_delete(sender, instance, **kwargs):
+    rebuild_driver_stats([instance.driver_id])
+
+
+@receiver(post_save, sender=Payment)
+@receiver(post_delete, sender=Payment)
+@receiver(post_save, sender=KYC)
+@receiver(post_delete, sender=KYC)
+def invalidate_driver_scores(sender, instance, **kwargs):
+    # After commit, so a concurrent scorer cannot cache the old row under the new generation
+    transaction.on_commit(partial(invalidate_driver, instance.driver_id if sender is Payment else instance.user_id))
+
+
+@receiver(post_save, sender=Vehicle)
+@receiver(post_delete, sender=Vehicle)
+def invalidate_vehicle_scores(sender, instance, **kwargs):
+    transaction.on_commit(partial(invalidate_vehicle, instance.pk))
+
+
+@receiver(post_save, sender=Notification)
+def push_new_notification(sender, instance, created, raw=False, **kwargs):
+    if raw or not created:
+        return
+    # Only announce rows that actually committed; a broker outage is logged
+    # rather than failing the request that created the notification.
+    transaction.on_commit(partial(publish_notification, instance), robust=True)
+
+
+@receiver(post_save, sender=KYC)
+def append_kyc_activity(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created or last_recorded_status(instance.pk) != instance.status:
+        kyc_event(instance, created=created).save()
+
+
+@receiver(post_save, sender=DriverApplication)
+def append_application_activity(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and 'status' not in update_fields):
+        return
+    if created or last_recorded_status(instance.pk) != instance.status:
+        application_event(instance, created=created).save()
+
+
+@receiver(post_save, sender=Payment)
+def append_payment_activity(sender, instance, created, raw=False, **kwargs):
+    if raw or not created:
+        return
+    payment_event(instance, instance.vehicle.registration_number).save()
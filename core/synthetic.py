@@ -0,0 +1,484 @@
+from __future__ import annotations
+
+import csv
+import io
+import random
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Callable, List, Optional
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .activity import application_event, kyc_event, payment_event_text
+from .models import (
+    DURATION_WEEKS,
+    KYC,
+    ActivityEvent,
+    DriverApplication,
+    Notification,
+    Payment,
+    User,
+    Vehicle,
+)
+from .payment_stats import rebuild_driver_stats
+
+DEFAULT_BATCH_SIZE = 5000
+# Objects buffered before a flush; bounds memory at any scale.
+FLUSH_ROWS = 100_000
+
+# Purchase price ranges in naira, per vehicle type
+PRICE_RANGES = {
+    Vehicle.VehicleType.KEKE: (2_500_000, 4_500_000),
+    Vehicle.VehicleType.BUS: (12_000_000, 25_000_000),
+    Vehicle.VehicleType.BIKE: (900_000, 1_600_000),
+}
+MODEL_NAMES = {
+    Vehicle.VehicleType.KEKE: ('Bajaj RE', 'TVS King', 'Piaggio Ape'),
+    Vehicle.VehicleType.BUS: ('Toyota Hiace', 'Nissan Urvan', 'Mazda E2000'),
+    Vehicle.VehicleType.BIKE: ('Bajaj Boxer', 'Honda Ace', 'TVS Apache'),
+}
+# Same rates as VehicleSerializer
+INTEREST_RATES = {12: Decimal('0.30'), 18: Decimal('0.45'), 24: Decimal('0.50')}
+# Share of vehicles with an approved driver; the rest are still on offer
+ASSIGNED_SHARE = 0.85
+# Applicants who never got a vehicle, per vehicle
+EXTRA_APPLICANTS = 0.5
+# Per-driver reliability bounds: chance a weekly instalment is attempted,
+# and chance an attempt fails (failed attempts are retried)
+ON_TIME_RANGE = (0.75, 1.0)
+FAILURE_RATE_RANGE = (0.0, 0.15)
+MAX_ATTEMPTS = 3
+KYC_STATUSES = KYC.VerificationStatus.values
+DOCUMENT_TYPES = KYC.DocumentType.values
+
+CENT = Decimal('0.01')
+
+
+@dataclass
+class GenerationResult:
+    owners: int = 0
+    vehicles: int = 0
+    drivers: int = 0
+    kycs: int = 0
+    applications: int = 0
+    notifications: int = 0
+    payments: int = 0
+    activity_events: int = 0
+    elapsed: float = 0.0
+
+
+@contextmanager
+def _explicit_timestamps(*models):
+    """Let bulk_create store the timestamps we set on auto_now(_add) fields."""
+    saved = []
+    for model in models:
+        for field in model._meta.concrete_fields:
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                saved.append((field, field.auto_now, field.auto_now_add))
+                field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+PAYMENT_COLUMNS = ('id', 'transaction_id', 'vehicle_id', 'driver_id', 'amount', 'status', 'payment_date', 'created_at')
+EVENT_COLUMNS = ('id', 'driver_id', 'type', 'object_id', 'status', 'title', 'description', 'occurred_at')
+
+
+class _Batch:
+    """Rows waiting to be written, in foreign-key order.
+
+    The small tables are held as model instances for ``bulk_create``.
+    Payments and activity events, which are most of the volume, are held
+    as plain tuples in PAYMENT_COLUMNS / EVENT_COLUMNS order and skip the
+    ORM entirely (see ``insert_rows``).
+    """
+
+    ORDER = (User, Vehicle, KYC, DriverApplication, Notification)
+
+    def __init__(self):
+        self.objects = {model: [] for model in self.ORDER}
+        self.payments: List[tuple] = []
+        self.events: List[tuple] = []
+        self.drivers: List[uuid.UUID] = []
+
+    def __len__(self):
+        return sum(len(rows) for rows in self.objects.values()) + len(self.payments) + len(self.events)
+
+    def add(self, obj):
+        self.objects[type(obj)].append(obj)
+
+
+def insert_rows(model, columns, rows, batch_size: int = DEFAULT_BATCH_SIZE) -> None:
+    """Insert tuples of raw column values into ``model``'s table.
+
+    PostgreSQL gets a single ``COPY ... FROM STDIN``, several times faster
+    than multi-row INSERTs. Other backends use ``executemany`` with values
+    prepared by each field, so UUIDs, decimals and datetimes are stored the
+    way the ORM would store them.
+    """
+    if not rows:
+        return
+    opts = model._meta
+    table = connection.ops.quote_name(opts.db_table)
+    names = ', '.join(connection.ops.quote_name(opts.get_field(c).column) for c in columns)
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            buffer = io.StringIO()
+            # Unquoted empty fields are NULL in COPY's CSV format.
+            csv.writer(buffer).writerows(rows)
+            buffer.seek(0)
+            cursor.copy_expert(f'COPY {table} ({names}) FROM STDIN WITH (FORMAT csv)', buffer)
+            return
+        db_fields = [opts.get_field(c) for c in columns]
+        sql = f'INSERT INTO {table} ({names}) VALUES ({", ".join(["%s"] * len(columns))})'
+        for start in range(0, len(rows), batch_size):
+            cursor.executemany(sql, [
+                [field.get_db_prep_save(value, connection) for field, value in zip(db_fields, row)]
+                for row in rows[start:start + batch_size]
+            ])
+
+
+class SyntheticDataGenerator:
+    """Build a realistic fleet: owners, vehicles, drivers, KYC, applications,
+    notifications, weekly payment histories and the activity timeline.
+
+    Every owner's slice is drawn from its own RNG seeded by ``(seed, prefix,
+    owner index)``, so for a fixed ``as_of`` the output (including UUIDs) is
+    identical across runs and batch sizes. Rows are bulk inserted, bypassing
+    the post_save handlers; the derived rows those handlers would write
+    (activity events, owner notifications, driver payment stats) are built
+    here instead. Portfolio rollups are left to ``update_portfolio_rollups``.
+    """
+
+    def __init__(
+        self,
+        owners: int,
+        vehicles_per_owner: int = 20,
+        history_weeks: int = 156,
+        seed: int = 0,
+        prefix: str = 'syn',
+        password: Optional[str] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        activity: bool = True,
+        as_of: Optional[datetime] = None,
+        progress: Optional[Callable[[GenerationResult], None]] = None,
+    ):
+        self.owners = owners
+        self.vehicles_per_owner = vehicles_per_owner
+        self.history_weeks = history_weeks
+        self.seed = seed
+        self.prefix = prefix
+        self.batch_size = batch_size
+        self.activity = activity
+        self.as_of = as_of or timezone.now()
+        self.progress = progress
+        # Hashing is deliberately slow, so every user shares one hash
+        # (an unusable one when no password is given).
+        self.password = make_password(password)
+        self.result = GenerationResult()
+
+    def run(self) -> GenerationResult:
+        started = time.perf_counter()
+        batch = _Batch()
+        with _explicit_timestamps(Vehicle, KYC, DriverApplication, Notification):
+            for index in range(self.owners):
+                self._owner(index, batch)
+                if len(batch) >= FLUSH_ROWS:
+                    self._flush(batch)
+                    batch = _Batch()
+            self._flush(batch)
+        self.result.elapsed = time.perf_counter() - started
+        return self.result
+
+    def _flush(self, batch: _Batch) -> None:
+        with transaction.atomic():
+            for model in batch.ORDER:
+                model.objects.bulk_create(batch.objects[model], batch_size=self.batch_size)
+            insert_rows(Payment, PAYMENT_COLUMNS, batch.payments, self.batch_size)
+            insert_rows(ActivityEvent, EVENT_COLUMNS, batch.events, self.batch_size)
+            rebuild_driver_stats(batch.drivers)
+        if self.progress:
+            self.progress(self.result)
+
+    # Row builders
+
+    def _owner(self, index: int, batch: _Batch) -> None:
+        rng = random.Random(f'{self.seed}:{self.prefix}:{index}')
+        window = timedelta(weeks=self.history_weeks)
+        owner = User(
+            id=_uuid(rng),
+            username=f'{self.prefix}-owner-{index}',
+            email=f'{self.prefix}-owner-{index}@example.com',
+            password=self.password,
+            role=User.Role.OWNER,
+            phone_number=_phone(rng),
+            date_joined=self.as_of - window - timedelta(days=rng.randint(1, 90)),
+        )
+        batch.add(owner)
+        self.result.owners += 1
+
+        vehicle_types = Vehicle.VehicleType.values
+        vehicles = []
+        for v in range(self.vehicles_per_owner):
+            vehicle_type = vehicle_types[(index + v) % len(vehicle_types)]
+            vehicle = self._vehicle(rng, owner, index, v, vehicle_type, window)
+            batch.add(vehicle)
+            vehicles.append(vehicle)
+
+        for v, vehicle in enumerate(vehicles):
+            if rng.random() < ASSIGNED_SHARE:
+                self._assigned_driver(rng, batch, owner, index, v, vehicle)
+        open_vehicles = [vehicle for vehicle in vehicles if vehicle.driver_id is None]
+        for d in range(int(len(vehicles) * EXTRA_APPLICANTS)):
+            # Most applicants go after vehicles that are still on offer
+            pool = open_vehicles if open_vehicles and rng.random() < 0.6 else vehicles
+            self._applicant(rng, batch, owner, index, d, rng.choice(pool))
+
+    def _vehicle(self, rng, owner, index, v, vehicle_type, window) -> Vehicle:
+        low, high = PRICE_RANGES[vehicle_type]
+        total_cost = Decimal(rng.randrange(low, high, 50_000))
+        duration = rng.choice(tuple(DURATION_WEEKS))
+        rate = INTEREST_RATES[duration]
+        total_receivable = (total_cost * (1 + rate)).quantize(CENT)
+        created_at = self.as_of - window * rng.random()
+        self.result.vehicles += 1
+        return Vehicle(
+            id=_uuid(rng),
+            owner=owner,
+            vehicle_type=vehicle_type,
+            model_name=rng.choice(MODEL_NAMES[vehicle_type]),
+            registration_number=f'{self.prefix[:6].upper()}{index:06d}{v:04d}',
+            total_cost=total_cost,
+            repayment_duration=duration,
+            interest_rate=rate,
+            total_receivable=total_receivable,
+            # bulk_create skips Vehicle.save(), which normally derives this
+            weekly_returns=(total_receivable / DURATION_WEEKS[duration]).quantize(CENT),
+            created_at=created_at,
+            updated_at=created_at,
+        )
+
+    def _driver(self, rng, batch, username, joined) -> User:
+        driver = User(
+            id=_uuid(rng),
+            username=username,
+            email=f'{username}@example.com',
+            password=self.password,
+            role=User.Role.DRIVER,
+            first_name=rng.choice(('Chinedu', 'Aisha', 'Tunde', 'Ngozi', 'Emeka', 'Bola', 'Musa', 'Ifeoma')),
+            last_name=rng.choice(('Okafor', 'Bello', 'Adeyemi', 'Eze', 'Ibrahim', 'Okonkwo', 'Balogun')),
+            phone_number=_phone(rng),
+            date_joined=joined,
+        )
+        batch.add(driver)
+        self.result.drivers += 1
+        return driver
+
+    def _kyc(self, rng, batch, driver, submitted_at, kyc_status) -> None:
+        decided = kyc_status in (KYC.VerificationStatus.APPROVED, KYC.VerificationStatus.REJECTED)
+        verified_at = submitted_at + timedelta(hours=rng.randint(2, 96)) if decided else None
+        kyc = KYC(
+            id=_uuid(rng),
+            user=driver,
+            full_name=f'{driver.first_name} {driver.last_name}',
+            date_of_birth=(self.as_of - timedelta(days=rng.randint(21 * 365, 60 * 365))).date(),
+            address=f'{rng.randint(1, 200)} {rng.choice(("Allen Ave", "Bode Thomas St", "Awolowo Rd"))}, Lagos',
+            document_type=rng.choice(DOCUMENT_TYPES),
+            document_number=f'{driver.username}-doc',
+            monthly_income=Decimal(rng.randrange(80_000, 600_000, 5_000)),
+            status=kyc_status,
+            submitted_at=submitted_at,
+            verified_at=verified_at,
+            updated_at=verified_at or submitted_at,
+        )
+        batch.add(kyc)
+        self.result.kycs += 1
+        if self.activity:
+            submitted = kyc_event(kyc, created=True)
+            if decided:
+                submitted.status = KYC.VerificationStatus.UNDER_REVIEW
+                submitted.description = 'Status: Under Review'
+                decision = kyc_event(kyc)
+                decision.occurred_at = verified_at
+                self._events(rng, batch, submitted, decision)
+            else:
+                self._events(rng, batch, submitted)
+
+    def _application(self, rng, batch, owner, driver, vehicle, applied_at, app_status, decided_at=None):
+        application = DriverApplication(
+            id=_uuid(rng),
+            applicant=driver,
+            vehicle=vehicle,
+            status=app_status,
+            risk_score=rng.randint(20, 95),
+            application_date=applied_at,
+            decision_date=decided_at,
+            updated_at=decided_at or applied_at,
+        )
+        batch.add(application)
+        self.result.applications += 1
+        batch.add(Notification(
+            id=_uuid(rng),
+            user=owner,
+            title='New Driver Application',
+            message=f'{driver.get_full_name() or driver.username} applied for {vehicle.registration_number}',
+            type=Notification.NotificationType.APPLICATION_SUBMITTED,
+            application=application,
+            is_read=decided_at is not None or rng.random() < 0.3,
+            created_at=applied_at,
+        ))
+        self.result.notifications += 1
+        if self.activity:
+            submitted = application_event(application, vehicle.registration_number, created=True)
+            if decided_at is None:
+                self._events(rng, batch, submitted)
+            else:
+                submitted.status = DriverApplication.ApplicationStatus.PENDING
+                submitted.description = f'{vehicle.registration_number} • Status: Pending'
+                self._events(rng, batch, submitted, application_event(application, vehicle.registration_number))
+        return application
+
+    def _assigned_driver(self, rng, batch, owner, index, v, vehicle) -> None:
+        username = f'{self.prefix}-driver-{index}-{v}'
+        submitted_at = vehicle.created_at + timedelta(hours=rng.randint(1, 72))
+        driver = self._driver(rng, batch, username, submitted_at - timedelta(days=rng.randint(0, 30)))
+        self._kyc(rng, batch, driver, submitted_at, KYC.VerificationStatus.APPROVED)
+        applied_at = submitted_at + timedelta(days=rng.randint(1, 7))
+        decided_at = applied_at + timedelta(days=rng.randint(1, 5))
+        if decided_at >= self.as_of:
+            return
+        self._application(
+            rng, batch, owner, driver, vehicle, applied_at, DriverApplication.ApplicationStatus.APPROVED, decided_at
+        )
+        vehicle.driver = driver
+        batch.drivers.append(driver.id)
+        self._payments(rng, batch, driver, vehicle, decided_at)
+
+    def _applicant(self, rng, batch, owner, index, d, vehicle) -> None:
+        username = f'{self.prefix}-applicant-{index}-{d}'
+        submitted_at = vehicle.created_at + timedelta(hours=rng.randint(1, 24 * 60))
+        if submitted_at >= self.as_of:
+            submitted_at = vehicle.created_at
+        driver = self._driver(rng, batch, username, submitted_at - timedelta(days=rng.randint(0, 30)))
+        if rng.random() < 0.1:
+            return  # Signed up, never submitted KYC
+        kyc_status = KYC_STATUSES[d % len(KYC_STATUSES)]
+        self._kyc(rng, batch, driver, submitted_at, kyc_status)
+        applied_at = submitted_at + timedelta(hours=rng.randint(1, 48))
+        if applied_at >= self.as_of:
+            return
+        if vehicle.driver_id is None and kyc_status != KYC.VerificationStatus.REJECTED:
+            self._application(rng, batch, owner, driver, vehicle, applied_at, DriverApplication.ApplicationStatus.PENDING)
+        else:
+            decided_at = min(applied_at + timedelta(days=rng.randint(1, 5)), self.as_of)
+            self._application(
+                rng, batch, owner, driver, vehicle, applied_at, DriverApplication.ApplicationStatus.REJECTED, decided_at
+            )
+
+    def _payments(self, rng, batch, driver, vehicle, start) -> None:
+        """Weekly instalments from the approval date until paid off or ``as_of``.
+
+        Each driver gets a reliability: the chance an instalment is attempted
+        on time, and the chance an attempt fails. A failed attempt is retried
+        a day or two later, so missed weeks and failures both show up as
+        arrears the way real histories do.
+        """
+        weeks = DURATION_WEEKS[vehicle.repayment_duration]
+        on_time = rng.uniform(*ON_TIME_RANGE)
+        failure_rate = rng.uniform(*FAILURE_RATE_RANGE)
+        amount = vehicle.weekly_returns
+        paid = Decimal('0')
+        registration_number = vehicle.registration_number
+        successful_status, failed_status = Payment.PaymentStatus.SUCCESSFUL.value, Payment.PaymentStatus.FAILED.value
+        successful_text = payment_event_text(successful_status, amount, registration_number)
+        failed_text = payment_event_text(failed_status, amount, registration_number)
+        payment_type = ActivityEvent.EventType.PAYMENT.value
+        payments_before = len(batch.payments)
+        for week in range(1, weeks + 1):
+            due = start + timedelta(weeks=week)
+            if due >= self.as_of:
+                break
+            if rng.random() > on_time:
+                continue  # Missed week
+            attempt = due + timedelta(minutes=rng.randint(0, 36 * 60))
+            for n in range(MAX_ATTEMPTS):
+                if attempt >= self.as_of:
+                    break
+                failed = rng.random() < failure_rate
+                payment_status = failed_status if failed else successful_status
+                payment_id = _uuid(rng)
+                batch.payments.append((
+                    payment_id, f'{registration_number}-{week}-{n}', vehicle.id, driver.id,
+                    amount, payment_status, attempt, attempt,
+                ))
+                if self.activity:
+                    title, description = failed_text if failed else successful_text
+                    batch.events.append((
+                        _uuid(rng), driver.id, payment_type, payment_id, payment_status, title, description, attempt,
+                    ))
+                if not failed:
+                    paid += amount
+                    break
+                attempt += timedelta(hours=rng.randint(12, 48))
+        self.result.payments += len(batch.payments) - payments_before
+        self.result.activity_events += (len(batch.payments) - payments_before) if self.activity else 0
+        vehicle.amount_paid = paid
+        vehicle.is_fully_paid = paid >= vehicle.total_cost
+        vehicle.updated_at = max(vehicle.created_at, min(start + timedelta(weeks=weeks), self.as_of))
+
+    def _events(self, rng, batch, *events) -> None:
+        for event in events:
+            batch.events.append((
+                _uuid(rng), event.driver_id, event.type, event.object_id,
+                event.status, event.title, event.description, event.occurred_at,
+            ))
+        self.result.activity_events += len(events)
+
+
+def expected_payments_per_vehicle(history_weeks: int = 156) -> float:
+    """Mean payment rows generated per vehicle for a ``history_weeks`` history.
+
+    Derived from the generator's own distributions: purchases are uniform
+    over the history, instalments run from approval (about a week after
+    purchase, plus half a week lost to whole-week rounding) for
+    DURATION_WEEKS or until ``as_of``, and only ASSIGNED_SHARE of vehicles
+    have a paying driver.
+    """
+    lag = 1.7  # weeks
+    span = max(0.0, history_weeks - lag)
+    weeks = []
+    for duration in DURATION_WEEKS.values():
+        # Mean of min(duration, weeks since approval), for approval uniform over the span
+        if span >= duration:
+            weeks.append((duration * duration / 2 + duration * (span - duration)) / history_weeks)
+        else:
+            weeks.append(span * span / 2 / history_weeks)
+    instalment_weeks = sum(weeks) / len(weeks)
+    attempted = sum(ON_TIME_RANGE) / 2
+    # Mean attempts per instalment, averaging over the failure-rate range
+    low, high = FAILURE_RATE_RANGE
+    steps = 100
+    rates = [low + (high - low) * (i + 0.5) / steps for i in range(steps)]
+    attempts = sum(sum(rate ** n for n in range(MAX_ATTEMPTS)) for rate in rates) / steps
+    return ASSIGNED_SHARE * instalment_weeks * attempted * attempts
+
+
+def _uuid(rng: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def _phone(rng: random.Random) -> str:
+    return f'080{rng.randrange(10 ** 8):08d}'
+
+
+def prefix_in_use(prefix: str) -> bool:
+    return User.objects.filter(username__startswith=f'{prefix}-').exists()
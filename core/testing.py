@@ -0,0 +1,21 @@
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+
+@contextmanager
+def max_queries(limit: int, using: str = DEFAULT_DB_ALIAS):
+    """Fail if the block runs more than ``limit`` queries on ``using``.
+
+    Unlike assertNumQueries this sets an upper bound, so an endpoint that
+    gets cheaper does not break its test. The failure lists every query.
+
+        with max_queries(3):
+            client.get('/api/notifications/', {'user': user_id})
+    """
+    with CaptureQueriesContext(connections[using]) as ctx:
+        yield ctx
+    if len(ctx) > limit:
+        queries = '\n'.join(f'{n}. {query["sql"]}' for n, query in enumerate(ctx.captured_queries, start=1))
+        raise AssertionError(f'{len(ctx)} queries executed, at most {limit} expected:\n{queries}')
@@ -1,3 +1,1552 @@
-from django.test import TestCase
+import asyncio
+import contextlib
+import importlib
+import io
+import json
+import math
+import os
+import random
+import tempfile
+import threading
+import unittest
+import uuid
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+
+from django.apps import apps as django_apps
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.db import close_old_connections, connection, transaction
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from .models import (
+    KYC,
+    ActivityEvent,
+    DriverApplication,
+    DriverPaymentStats,
+    Notification,
+    Payment,
+    PaymentWeeklyRollup,
+    User,
+    Vehicle,
+)
+from .amortization import compute_fleet_arrears, vehicle_schedule
+from .benchmark import compare, load_baseline, load_samples, save_baseline
+from .metrics import registry
+from .notification_stream import InProcessBroker, Subscription, event_id_of, format_event, publish_notification
+from . import exports
+from .pagination import encode_cursor
+from .payment_posting import PaymentConflict, post_payment
+from .ratelimit import login_blocked, login_keys, record_login_failure
+from .risk_features import aget_driver_features, get_driver_features, iter_application_snapshots
+from .risk_model import (
+    LINEAR_FEATURES,
+    LOGISTIC_FEATURES,
+    compute_driver_credit_score_linear,
+    compute_driver_credit_score_logistic,
+    get_linear_model,
+    get_logistic_model,
+    score_drivers_logistic,
+)
+from .rollups import reset_payment_rollups, roll_up_vehicles
+from .testing import max_queries
+from .tokens import issue_access_token
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class PostPaymentConcurrencyTests(TransactionTestCase):
+    threads = 16
+    posts_per_thread = 5
+
+    def setUp(self):
+        self.owner = User.objects.create(username='owner', role=User.Role.OWNER)
+        self.driver = User.objects.create(username='driver', role=User.Role.DRIVER)
+        self.vehicle = Vehicle.objects.create(
+            owner=self.owner,
+            driver=self.driver,
+            vehicle_type=Vehicle.VehicleType.KEKE,
+            model_name='Bajaj RE',
+            registration_number='LAG-001',
+            total_cost=Decimal('800.00'),
+        )
+
+    def _run_concurrently(self, work):
+        errors = []
+        barrier = threading.Barrier(self.threads)
+
+        def target(n):
+            try:
+                barrier.wait()
+                work(n)
+            except Exception as e:  # pragma: no cover - surfaced below
+                errors.append(e)
+            finally:
+                close_old_connections()
+
+        workers = [threading.Thread(target=target, args=(n,)) for n in range(self.threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.assertEqual(errors, [])
+
+    def test_concurrent_posts_do_not_lose_updates(self):
+        def work(n):
+            for i in range(self.posts_per_thread):
+                post_payment(f'tx-{n}-{i}', self.vehicle.id, self.driver.id, Decimal('10.00'))
+
+        self._run_concurrently(work)
+
+        total = self.threads * self.posts_per_thread
+        self.vehicle.refresh_from_db()
+        self.assertEqual(Payment.objects.count(), total)
+        self.assertEqual(self.vehicle.amount_paid, Decimal('10.00') * total)
+        self.assertTrue(self.vehicle.is_fully_paid)
+        self.assertEqual(DriverPaymentStats.objects.get(driver=self.driver).successful_count, total)
+
+    def test_concurrent_retries_post_once(self):
+        created = []
+
+        def work(n):
+            _, was_created = post_payment('tx-retry', self.vehicle.id, self.driver.id, Decimal('25.00'))
+            created.append(was_created)
+
+        self._run_concurrently(work)
+
+        self.vehicle.refresh_from_db()
+        self.assertEqual(created.count(True), 1)
+        self.assertEqual(Payment.objects.filter(transaction_id='tx-retry').count(), 1)
+        self.assertEqual(self.vehicle.amount_paid, Decimal('25.00'))
+        self.assertFalse(self.vehicle.is_fully_paid)
+
+    def test_reused_transaction_id_with_other_details_conflicts(self):
+        post_payment('tx-1', self.vehicle.id, self.driver.id, Decimal('25.00'))
+        with self.assertRaises(PaymentConflict):
+            post_payment('tx-1', self.vehicle.id, self.driver.id, Decimal('30.00'))
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'EXPLAIN plans are checked on PostgreSQL only')
+class QueryPlanTests(TestCase):
+    """Hot endpoints must reach their large tables through indexes.
+
+    Seeds a few tens of thousands of rows, ANALYZEs, then EXPLAINs every
+    query an endpoint issues and fails on a sequential scan of a large
+    table. A failure here usually means a filter or ordering changed and no
+    longer matches the Meta.indexes on the model.
+    """
+    LARGE_TABLES = ('core_payment', 'core_driverapplication', 'core_notification', 'core_activityevent')
+    owners = 200
+    vehicles_per_owner = 25
+    drivers = 1000
+    applications_per_driver = 20
+    payments_per_driver = 30
+    notifications_per_owner = 100
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(17)
+        now = timezone.now()
+        owners = User.objects.bulk_create([
+            User(username=f'owner{i}', role=User.Role.OWNER) for i in range(cls.owners)
+        ])
+        drivers = User.objects.bulk_create([
+            User(username=f'driver{i}', role=User.Role.DRIVER) for i in range(cls.drivers)
+        ])
+        vehicles = Vehicle.objects.bulk_create([
+            Vehicle(
+                owner=owner,
+                vehicle_type=rng.choice(Vehicle.VehicleType.values),
+                model_name=f"{rng.choice(['Bajaj RE', 'TVS King', 'Toyota Hiace', 'Honda Ace'])} {v}",
+                registration_number=f'REG-{o}-{v}',
+                total_cost=Decimal('1000.00'),
+                total_receivable=Decimal('1300.00'),
+                repayment_duration=12,
+            )
+            for o, owner in enumerate(owners)
+            for v in range(cls.vehicles_per_owner)
+        ])
+        applications = DriverApplication.objects.bulk_create([
+            DriverApplication(
+                applicant=driver,
+                vehicle=rng.choice(vehicles),
+                status=rng.choice(DriverApplication.ApplicationStatus.values),
+                decision_date=now - timedelta(days=rng.randint(0, 700)),
+            )
+            for driver in drivers
+            for _ in range(cls.applications_per_driver)
+        ], batch_size=5000)
+        payments = []
+        for d, driver in enumerate(drivers):
+            vehicle = vehicles[d % len(vehicles)]
+            for n in range(cls.payments_per_driver):
+                payments.append(Payment(
+                    transaction_id=f'tx-{d}-{n}',
+                    vehicle=vehicle,
+                    driver=driver,
+                    amount=Decimal('25.00'),
+                    status=Payment.PaymentStatus.FAILED if rng.random() < 0.1 else Payment.PaymentStatus.SUCCESSFUL,
+                    payment_date=now - timedelta(weeks=n),
+                ))
+        Payment.objects.bulk_create(payments, batch_size=5000)
+        Notification.objects.bulk_create([
+            Notification(
+                user=owner,
+                title='Application Submitted',
+                message='New application',
+                application=rng.choice(applications),
+                is_read=rng.random() < 0.8,
+            )
+            for owner in owners
+            for _ in range(cls.notifications_per_owner)
+        ], batch_size=5000)
+        ActivityEvent.objects.bulk_create([
+            ActivityEvent(
+                driver_id=p.driver_id,
+                type=ActivityEvent.EventType.PAYMENT,
+                object_id=p.id,
+                status=p.status,
+                title='Payment Made',
+                occurred_at=p.payment_date,
+            )
+            for p in payments
+        ], batch_size=5000)
+        with connection.cursor() as cursor:
+            for table in cls.LARGE_TABLES + ('core_vehicle', 'core_user'):
+                cursor.execute(f'ANALYZE {table}')
+        cls.owner = owners[0]
+        cls.driver = drivers[0]
+
+    def assertIndexedQueries(self, path, params, tables=LARGE_TABLES):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(path, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        checked = 0
+        for query in ctx.captured_queries:
+            sql = query['sql']
+            if not sql.lstrip().upper().startswith('SELECT'):
+                continue
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN {sql}')
+                plan = '\n'.join(row[0] for row in cursor.fetchall())
+            for table in tables:
+                self.assertNotIn(f'Seq Scan on {table}', plan, f'{path}: {sql}\n{plan}')
+            checked += 1
+        self.assertGreater(checked, 0)
+
+    def test_notifications_list(self):
+        self.assertIndexedQueries('/api/notifications/', {'user': str(self.owner.id), 'compact': '1'})
+
+    def test_notifications_unread_count(self):
+        self.assertIndexedQueries('/api/notifications/unread-count/', {'user': str(self.owner.id)})
+
+    def test_owner_applications(self):
+        self.assertIndexedQueries('/api/applications/owner/', {'owner': str(self.owner.id)})
+
+    def test_recent_activity(self):
+        self.assertIndexedQueries('/api/recent-activity/', {'driver': str(self.driver.id)})
+
+    def test_risk_score(self):
+        self.assertIndexedQueries('/api/risk/score/', {'user': str(self.driver.id)})
+
+    def test_vehicle_search(self):
+        for params in (
+            {},
+            {'type': Vehicle.VehicleType.BUS, 'sort': 'weekly_returns'},
+            {'min_weekly': '20', 'max_weekly': '30', 'sort': '-weekly_returns'},
+            {'q': 'toyota h'},
+        ):
+            with self.subTest(**params):
+                self.assertIndexedQueries('/api/vehicles/search/', params, tables=('core_vehicle',))
+
+    def test_vehicle_schedule(self):
+        vehicle = Vehicle.objects.filter(owner=self.owner).first()
+        self.assertIndexedQueries(f'/api/vehicles/{vehicle.id}/schedule/', {})
+
+
+class QueryBudgetTests(TestCase):
+    """Upper bounds on the queries a hot endpoint may issue.
+
+    Each endpoint reads a page of related rows; a budget that is exceeded
+    usually means an N+1 crept into a serializer.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create(username='owner', role=User.Role.OWNER)
+        cls.driver = User.objects.create(username='driver', role=User.Role.DRIVER)
+        cls.vehicle = Vehicle.objects.create(
+            owner=cls.owner,
+            vehicle_type=Vehicle.VehicleType.KEKE,
+            model_name='Bajaj RE',
+            registration_number='LAG-001',
+            total_cost=Decimal('800.00'),
+            total_receivable=Decimal('1040.00'),
+            repayment_duration=12,
+        )
+        for n in range(10):
+            application = DriverApplication.objects.create(applicant=cls.driver, vehicle=cls.vehicle)
+            Notification.objects.create(
+                user=cls.owner, title='Application Submitted', message='New application', application=application
+            )
+            Payment.objects.create(
+                transaction_id=f'tx-{n}', vehicle=cls.vehicle, driver=cls.driver, amount=Decimal('25.00')
+            )
+
+    def assertWithinBudget(self, limit, path, params=None):
+        with max_queries(limit):
+            response = self.client.get(path, params or {})
+        self.assertEqual(response.status_code, 200, response.content)
+
+    def test_notifications_list(self):
+        self.assertWithinBudget(1, '/api/notifications/', {'user': str(self.owner.id)})
+        self.assertWithinBudget(2, '/api/notifications/', {'user': str(self.owner.id), 'with_count': 1})
+
+    def test_notifications_count_is_opt_in(self):
+        for path in ('/api/notifications/', '/api/async/notifications/'):
+            with self.subTest(path=path):
+                body = self.client.get(path, {'user': str(self.owner.id), 'limit': 4}).json()
+                self.assertEqual(len(body['items']), 4)
+                self.assertNotIn('count', body)
+                body = self.client.get(path, {'user': str(self.owner.id), 'limit': 4, 'with_count': 1}).json()
+                self.assertEqual((len(body['items']), body['count']), (4, 10))
+
+    def test_notifications_unread_count(self):
+        self.assertWithinBudget(1, '/api/notifications/unread-count/', {'user': str(self.owner.id)})
+
+    def test_notifications_unread_count_is_capped(self):
+        path, params = '/api/notifications/unread-count/', {'user': str(self.owner.id)}
+        self.assertEqual(self.client.get(path, params).json(), {'unread': 10, 'capped': False})
+        with self.settings(NOTIFICATION_UNREAD_COUNT_CAP=10):
+            self.assertEqual(self.client.get(path, params).json(), {'unread': 10, 'capped': False})
+        with self.settings(NOTIFICATION_UNREAD_COUNT_CAP=9):
+            with CaptureQueriesContext(connection) as queries:
+                body = self.client.get(path, params).json()
+            self.assertEqual(body, {'unread': 9, 'capped': True})
+            self.assertIn('LIMIT 10', queries[0]['sql'])
+
+    def test_owner_applications(self):
+        self.assertWithinBudget(3, '/api/applications/owner/', {'owner': str(self.owner.id)})
+
+    def test_recent_activity(self):
+        self.assertWithinBudget(2, '/api/recent-activity/', {'driver': str(self.driver.id)})
+
+    def test_vehicle_search(self):
+        self.assertWithinBudget(1, '/api/vehicles/search/', {'q': 'bajaj'})
+
+    def test_vehicle_schedule(self):
+        self.assertWithinBudget(2, f'/api/vehicles/{self.vehicle.id}/schedule/')
+
+    def test_budget_failure_lists_queries(self):
+        with self.assertRaisesMessage(AssertionError, '2 queries executed, at most 1 expected'):
+            with max_queries(1):
+                User.objects.count()
+                Vehicle.objects.count()
+
+
+@override_settings(REQUEST_METRICS_ENABLED=True)
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        registry.reset()
+        self.owner = User.objects.create(username='owner', role=User.Role.OWNER)
+
+    def test_server_timing_header(self):
+        response = self.client.get('/api/notifications/unread-count/', {'user': str(self.owner.id)})
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="1 queries", serialize;dur=[\d.]+, total;dur=[\d.]+$')
+
+    def test_metrics_endpoint(self):
+        self.client.get('/api/notifications/unread-count/', {'user': str(self.owner.id)})
+        response = self.client.get('/api/metrics/')
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertIn('db_queries_per_request_bucket{view="notifications_unread_count",le="1.0"} 1', body)
+        self.assertIn('http_request_duration_seconds_count{view="notifications_unread_count"} 1', body)
+        self.assertNotIn('view="metrics"', body)
+
+    @override_settings(REQUEST_METRICS_ENABLED=False)
+    def test_metrics_endpoint_disabled(self):
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 404)
+
+
+class CursorValidationTests(TestCase):
+    """Malformed cursors and ids are client errors, not 500s."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create(username='owner', role=User.Role.OWNER)
+        cls.driver = User.objects.create(username='driver', role=User.Role.DRIVER)
+
+    def test_malformed_cursors(self):
+        bad_id = encode_cursor(timezone.now().isoformat(), 'not-a-uuid')
+        cases = [
+            ('/api/applications/owner/', {'owner': str(self.owner.id)}, 'cursor'),
+            ('/api/notifications/', {'user': str(self.owner.id)}, 'cursor'),
+            ('/api/recent-activity/', {'driver': str(self.driver.id)}, 'before'),
+            ('/api/vehicles/search/', {'sort': 'weekly_returns'}, 'cursor'),
+        ]
+        for path, params, name in cases:
+            for cursor in (bad_id, 'garbage', encode_cursor('yesterday', str(self.owner.id))):
+                with self.subTest(path=path, cursor=cursor):
+                    response = self.client.get(path, {**params, name: cursor})
+                    self.assertEqual(response.status_code, 400, response.content)
+
+    def test_owner_applications_invalid_vehicle(self):
+        response = self.client.get('/api/applications/owner/', {'owner': str(self.owner.id), 'vehicle': 'x'})
+        self.assertEqual(response.status_code, 400)
+
+
+class TokenAuthTests(TestCase):
+    """Bearer tokens: the obtain/refresh flow and per-user reads scoped to the caller."""
+
+    password = 'Token-Passw0rd!'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(
+            username='owner', email='owner@example.com', password=cls.password, role=User.Role.OWNER
+        )
+        cls.other = User.objects.create_user(
+            username='other', email='other@example.com', password=cls.password, role=User.Role.OWNER
+        )
+        cls.staff = User.objects.create_user(
+            username='staff', email='staff@example.com', password=cls.password, is_staff=True
+        )
+        for user in (cls.owner, cls.other):
+            Notification.objects.create(user=user, title='Hello', message=f'For {user.username}')
+
+    def obtain(self, user):
+        response = self.client.post('/api/token/', {'email': user.email, 'password': self.password})
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def bearer(self, access):
+        return {'HTTP_AUTHORIZATION': f'Bearer {access}'}
+
+    def test_obtain_and_refresh(self):
+        tokens = self.obtain(self.owner)
+        self.assertEqual(tokens['token_type'], 'Bearer')
+        response = self.client.post('/api/token/refresh/', {'refresh': tokens['refresh']})
+        self.assertEqual(response.status_code, 200, response.content)
+        response = self.client.get('/api/notifications/', **self.bearer(response.json()['access']))
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual([n['message'] for n in response.json()['items']], ['For owner'])
+
+    def test_token_kinds_are_not_interchangeable(self):
+        tokens = self.obtain(self.owner)
+        response = self.client.get('/api/notifications/', **self.bearer(tokens['refresh']))
+        self.assertEqual(response.status_code, 401)
+        response = self.client.post('/api/token/refresh/', {'refresh': tokens['access']})
+        self.assertEqual(response.status_code, 401)
+
+    def test_refresh_rejected_after_password_change(self):
+        tokens = self.obtain(self.owner)
+        self.owner.set_password('Changed-Passw0rd!')
+        self.owner.save()
+        response = self.client.post('/api/token/refresh/', {'refresh': tokens['refresh']})
+        self.assertEqual(response.status_code, 401)
+
+    def test_reads_scoped_to_caller(self):
+        headers = self.bearer(self.obtain(self.owner)['access'])
+        own, other = str(self.owner.id), str(self.other.id)
+        cases = [
+            ('/api/notifications/', 'user'),
+            ('/api/notifications/unread-count/', 'user'),
+            ('/api/kyc/status/', 'user'),
+            ('/api/risk/score/', 'user'),
+            ('/api/recent-activity/', 'driver'),
+            ('/api/applications/owner/', 'owner'),
+            ('/api/vehicles/arrears/', 'owner'),
+            ('/api/exports/payments.csv', 'owner'),
+            ('/api/async/notifications/', 'user'),
+            ('/api/async/kyc/status/', 'user'),
+            ('/api/async/risk/score/', 'user'),
+            ('/api/async/recent-activity/', 'driver'),
+        ]
+        for path, name in cases:
+            with self.subTest(path=path):
+                self.assertEqual(self.client.get(path, {name: other}, **headers).status_code, 403)
+                self.assertEqual(self.client.get(path, {name: own}, **headers).status_code, 200)
+        self.assertEqual(self.client.get(f'/api/owners/{other}/portfolio/', **headers).status_code, 403)
+        stream = async_to_sync(self.async_client.get)(
+            '/api/notifications/stream/', {'user': other}, headers={'Authorization': headers['HTTP_AUTHORIZATION']}
+        )
+        self.assertEqual(stream.status_code, 403)
+        response = self.client.post('/api/notifications/mark-read/', {'user': other}, **headers)
+        self.assertEqual(response.status_code, 403)
+
+    def test_staff_token_reads_any_user(self):
+        headers = self.bearer(self.obtain(self.staff)['access'])
+        response = self.client.get('/api/async/notifications/', {'user': str(self.other.id)}, **headers)
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(self.client.get('/api/exports/payments.csv', **headers).status_code, 200)
+
+    def test_invalid_bearer_token(self):
+        headers = self.bearer('forged')
+        self.assertEqual(self.client.get('/api/notifications/', **headers).status_code, 401)
+        self.assertEqual(self.client.get('/api/async/notifications/', **headers).status_code, 401)
+
+
+class _ListeningBroker:
+    """Redis-like broker: a subscription only receives what is published after ``open()``."""
+
+    def __init__(self):
+        self.subscriptions = []
+
+    def publish(self, user_id, message):
+        for sub in self.subscriptions:
+            if sub.listening:
+                sub.queue.put_nowait(message)
+
+    def subscribe(self, user_id):
+        sub = _ListeningSubscription()
+        self.subscriptions.append(sub)
+        return sub
+
+
+class _ListeningSubscription(Subscription):
+    def __init__(self):
+        self.listening = False
+        self.queue = asyncio.Queue()
+
+    async def open(self):
+        self.listening = True
+
+    async def next(self, timeout):
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def close(self):
+        self.listening = False
+
+
+@override_settings(NOTIFICATION_STREAM_HEARTBEAT=0.05)
+class NotificationStreamTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='streamer', role=User.Role.DRIVER)
+
+    def headers(self, **extra):
+        return {'Authorization': f'Bearer {issue_access_token(self.user)}', **extra}
+
+    async def next_event(self, stream, limit=10):
+        """Next notification frame, skipping retry and keep-alive frames."""
+        for _ in range(limit):
+            frame = (await anext(stream)).decode()
+            if frame.startswith('id:'):
+                return frame
+        self.fail(f'No notification within {limit} frames')
+
+    def test_format_event(self):
+        self.assertEqual(
+            format_event('{"id": "n1"}', 'n1'), 'id: n1\nevent: notification\ndata: {"id": "n1"}\n\n'
+        )
+        # Every line of a multi-line payload gets its own data field
+        self.assertEqual(format_event('a\nb'), 'event: notification\ndata: a\ndata: b\n\n')
+        self.assertEqual(format_event(''), 'event: notification\ndata: \n\n')
+
+    def test_event_id_of(self):
+        self.assertEqual(event_id_of('{"id": "n1", "title": "Hi"}'), 'n1')
+        self.assertIsNone(event_id_of('{"title": "Hi"}'))
+        self.assertIsNone(event_id_of('not json'))
+        self.assertIsNone(event_id_of('[1, 2]'))
+
+    async def test_in_process_broker_delivers_to_subscribers_of_the_user(self):
+        broker = InProcessBroker()
+        subscription = broker.subscribe(self.user.id)
+        # Sync views publish from worker threads
+        await sync_to_async(broker.publish, thread_sensitive=False)(str(self.user.id), 'mine')
+        broker.publish(uuid.uuid4(), 'theirs')
+        self.assertEqual(await subscription.next(timeout=1), 'mine')
+        self.assertIsNone(await subscription.next(timeout=0.01))
+        await subscription.close()
+        self.assertEqual(broker._subscribers, {})
+
+    async def test_in_process_broker_drops_oldest_when_full(self):
+        broker = InProcessBroker(queue_size=2)
+        subscription = broker.subscribe(self.user.id)
+        for message in ('one', 'two', 'three'):
+            broker.publish(self.user.id, message)
+        await asyncio.sleep(0)
+        self.assertEqual([await subscription.next(timeout=1) for _ in range(2)], ['two', 'three'])
+        await subscription.close()
+
+    # Re-set so the stream subscribes to a fresh broker, dropped afterwards
+    @override_settings(NOTIFICATION_BROKER='core.notification_stream.InProcessBroker')
+    async def test_replays_after_last_event_id_without_duplicates(self):
+        create = sync_to_async(Notification.objects.create)
+        first, second, third = [
+            await create(user=self.user, title=f'Note {n}', message='Hello') for n in range(3)
+        ]
+        response = await self.async_client.get(
+            '/api/notifications/stream/', headers=self.headers(**{'Last-Event-ID': str(first.id)})
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response)
+        self.assertEqual((await anext(stream)).decode(), 'retry: 50\n\n')
+        replayed = [await self.next_event(stream) for _ in range(2)]
+        self.assertEqual([frame.splitlines()[0] for frame in replayed], [f'id: {second.id}', f'id: {third.id}'])
+
+        # A live copy of a replayed notification is skipped
+        fourth = await create(user=self.user, title='Note 3', message='Hello')
+        for notification in (third, fourth):
+            await sync_to_async(publish_notification)(notification)
+        self.assertEqual((await self.next_event(stream)).splitlines()[0], f'id: {fourth.id}')
+        await stream.aclose()
+
+    def test_wsgi_is_refused(self):
+        response = self.client.get(
+            '/api/notifications/stream/', HTTP_AUTHORIZATION=self.headers()['Authorization']
+        )
+        self.assertEqual(response.status_code, 501)
+
+    async def test_message_published_during_replay_is_delivered(self):
+        broker = _ListeningBroker()
+        message = json.dumps({'id': str(uuid.uuid4()), 'title': 'Published mid-replay'})
+
+        async def replay(user_id, last_event_id):
+            broker.publish(user_id, message)
+            return []
+
+        with mock.patch('core.views.get_broker', return_value=broker), mock.patch(
+            'core.views._missed_notifications', replay
+        ):
+            response = await self.async_client.get(
+                '/api/notifications/stream/', headers=self.headers(**{'Last-Event-ID': str(uuid.uuid4())})
+            )
+            self.assertEqual(response.status_code, 200)
+            frame = await self.next_event(aiter(response))
+        self.assertEqual(frame, format_event(message, event_id_of(message)))
+
+
+class RiskScoringTests(TestCase):
+    """The scoring paths agree on drivers with mixed KYC and payment histories."""
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create(username='owner', role=User.Role.OWNER)
+        cls.vehicle = Vehicle.objects.create(
+            owner=owner,
+            vehicle_type=Vehicle.VehicleType.KEKE,
+            model_name='Bajaj RE',
+            registration_number='LAG-001',
+            total_cost=Decimal('800.00'),
+            weekly_returns=Decimal('15000.00'),
+        )
+        statuses = [None, *KYC.VerificationStatus.values]
+        cls.drivers = []
+        for n in range(10):
+            driver = User.objects.create(username=f'driver-{n}', role=User.Role.DRIVER)
+            status = statuses[n % len(statuses)]
+            if status:
+                KYC.objects.create(
+                    user=driver,
+                    full_name=f'Driver {n}',
+                    date_of_birth=date(1970 + 3 * n, 1 + n, 1 + 2 * n),
+                    address='Lagos',
+                    document_type=KYC.DocumentType.NATIONAL_ID,
+                    document_number=f'NIN-{n}',
+                    monthly_income=Decimal(40000 * n) if n % 3 else None,
+                    status=status,
+                )
+            for p in range(n):
+                Payment.objects.create(
+                    transaction_id=f'tx-{n}-{p}',
+                    vehicle=cls.vehicle,
+                    driver=driver,
+                    amount=Decimal('25.00'),
+                    status=Payment.PaymentStatus.FAILED if p % 3 == n % 3 else Payment.PaymentStatus.SUCCESSFUL,
+                    payment_date=timezone.now() - timedelta(days=40 * p),
+                )
+            cls.drivers.append(driver)
+
+    def test_batch_matches_per_driver(self):
+        unknown = uuid.uuid4()
+        ids = [driver.id for driver in self.drivers] + [unknown]
+        vehicles = [self.vehicle if n % 2 else None for n in range(len(ids))]
+        batch = score_drivers_logistic(ids, vehicles)
+        for applicant_id, vehicle, result in zip(ids, vehicles, batch):
+            with self.subTest(applicant=applicant_id, vehicle=vehicle):
+                self.assertEqual(result, compute_driver_credit_score_logistic(applicant_id, vehicle))
+        # The histories really are mixed
+        self.assertGreater(len({result['score'] for result in batch}), len(batch) // 2)
+
+    def test_features_come_from_one_query(self):
+        cutoff = timezone.now() - timedelta(days=6 * 30)
+        for driver in self.drivers:
+            with self.subTest(driver=driver.username):
+                with self.assertNumQueries(1):
+                    features = get_driver_features(driver.id)
+                payments = Payment.objects.filter(driver=driver)
+                failed = payments.filter(status=Payment.PaymentStatus.FAILED)
+                self.assertEqual(
+                    (features.total_success, features.total_failed, features.failed_recent_6m),
+                    (
+                        payments.filter(status=Payment.PaymentStatus.SUCCESSFUL).count(),
+                        failed.count(),
+                        failed.filter(payment_date__gte=cutoff).count(),
+                    ),
+                )
+                kyc = KYC.objects.filter(user=driver).first()
+                self.assertEqual(features.kyc_status, kyc and kyc.status)
+
+    def test_vectorized_models_match_scalar_formulas(self):
+        logistic, linear = get_logistic_model(), get_linear_model()
+        for driver in self.drivers:
+            features = get_driver_features(driver.id)
+            weekly_returns_10k = float(self.vehicle.weekly_returns) / 10000.0
+            values = {
+                'kyc_approved': features.kyc_approved,
+                'kyc_under_review': features.kyc_under_review,
+                'age_years': features.age_years,
+                'monthly_income_100k': features.monthly_income / 100000.0,
+                'success_ratio': features.success_ratio,
+                'failed_recent_6m': float(features.failed_recent_6m),
+                'weekly_returns_10k': weekly_returns_10k,
+                'interest_rate': float(self.vehicle.interest_rate),
+                'repayment_duration_months': 0.0,
+                'down_payment_ratio': float(self.vehicle.amount_paid) / float(self.vehicle.total_cost),
+            }
+            z = logistic.intercept + sum(
+                weight * values[name] for name, weight in zip(LOGISTIC_FEATURES, logistic.weights)
+            )
+            probability = 1.0 / (1.0 + math.exp(-z))
+            linear_score = linear.intercept + sum(
+                linear.coeffs.get(name, 0.0) * values[name] for name in LINEAR_FEATURES
+            )
+            with self.subTest(driver=driver.username):
+                result = compute_driver_credit_score_logistic(driver.id, self.vehicle, features)
+                self.assertAlmostEqual(result['probability'], probability, places=12)
+                self.assertEqual(result['score'], min(850, max(300, round(300 + probability * 550))))
+                self.assertEqual(
+                    compute_driver_credit_score_linear(driver.id, self.vehicle, features),
+                    round(min(850.0, max(300.0, linear_score))),
+                )
+
+    def test_models_are_compiled_once_and_rebuilt_on_setting_change(self):
+        model = get_logistic_model()
+        self.assertIs(get_logistic_model(), model)
+        self.assertFalse(model.weights.flags.writeable)
+        before = compute_driver_credit_score_logistic(self.drivers[5].id)
+        with self.settings(RISK_LOGISTIC_CONFIG={'intercept': 3.0}):
+            changed = get_logistic_model()
+            self.assertNotEqual(changed.version, model.version)
+            self.assertEqual(changed.intercept, 3.0)
+            self.assertGreater(compute_driver_credit_score_logistic(self.drivers[5].id)['score'], before['score'])
+        self.assertEqual(get_logistic_model().version, model.version)
+        linear = get_linear_model()
+        with self.settings(RISK_LINEAR_CONFIG={'intercept': 500}):
+            self.assertEqual(get_linear_model().intercept, 500.0)
+        self.assertEqual(get_linear_model().version, linear.version)
+
+    def test_traces_are_sampled_debug_logs(self):
+        driver_id = self.drivers[5].id
+        with contextlib.redirect_stdout(io.StringIO()) as stdout:
+            with self.settings(RISK_TRACE_SAMPLE_RATE=1.0), self.assertLogs('core.risk', 'DEBUG') as logs:
+                result = compute_driver_credit_score_logistic(driver_id)
+            # Nothing is traced unless DEBUG is enabled for the logger
+            with self.assertNoLogs('core.risk', 'INFO'), mock.patch('core.risk_model.logger.debug') as debug:
+                compute_driver_credit_score_logistic(driver_id)
+            debug.assert_not_called()
+            with self.settings(RISK_TRACE_SAMPLE_RATE=0.25), self.assertLogs('core.risk', 'DEBUG') as sampled:
+                with mock.patch('core.risk_model.random') as rng:
+                    rng.random.side_effect = [0.1, 0.5, 0.2, 0.9]
+                    for _ in range(4):
+                        compute_driver_credit_score_logistic(driver_id)
+        self.assertEqual(stdout.getvalue(), '')
+        trace = logs.records[0].risk_trace
+        self.assertEqual(trace['user'], str(driver_id))
+        self.assertEqual(trace['score'], result['score'])
+        self.assertEqual(list(trace['features']), list(LOGISTIC_FEATURES))
+        self.assertEqual(len(sampled.records), 2)
+
+    def test_async_features_match(self):
+        for driver in self.drivers:
+            with self.subTest(driver=driver.username):
+                self.assertEqual(async_to_sync(aget_driver_features)(driver.id), get_driver_features(driver.id))
+
+
+class RiskTrainingTests(TestCase):
+    """Approved applications 60 days ago, with payment history before and repayment outcomes after."""
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create(username='owner', role=User.Role.OWNER)
+        cls.applied_at = timezone.now() - timedelta(days=60)
+        cls.applications = []
+        for n in range(12):
+            driver = User.objects.create(username=f'driver-{n}', role=User.Role.DRIVER)
+            KYC.objects.create(
+                user=driver,
+                full_name=f'Driver {n}',
+                date_of_birth=date(1975 + 2 * n, 1 + n, 10),
+                address='Lagos',
+                document_type=KYC.DocumentType.NATIONAL_ID,
+                document_number=f'NIN-{n}',
+                monthly_income=Decimal(30000 + 15000 * n),
+                status=KYC.VerificationStatus.APPROVED if n % 2 else KYC.VerificationStatus.UNDER_REVIEW,
+            )
+            vehicle = Vehicle.objects.create(
+                owner=owner,
+                vehicle_type=Vehicle.VehicleType.KEKE,
+                model_name='Bajaj RE',
+                registration_number=f'LAG-{n:03}',
+                total_cost=Decimal('800.00'),
+                total_receivable=Decimal('1040.00'),
+                repayment_duration=12,
+            )
+            application = DriverApplication.objects.create(
+                applicant=driver, vehicle=vehicle, status=DriverApplication.ApplicationStatus.APPROVED
+            )
+            DriverApplication.objects.filter(id=application.id).update(application_date=cls.applied_at)
+            cls.applications.append(application)
+            # History before applying: every third driver already missed payments
+            for p in range(n % 4):
+                Payment.objects.create(
+                    transaction_id=f'history-{n}-{p}',
+                    vehicle=vehicle,
+                    driver=driver,
+                    amount=Decimal('20.00'),
+                    status=Payment.PaymentStatus.FAILED if n % 3 == 0 else Payment.PaymentStatus.SUCCESSFUL,
+                    payment_date=cls.applied_at - timedelta(days=7 * (p + 1)),
+                )
+            # Outcome after applying: drivers 0, 3, 6, 9 and 8 fall behind
+            bad = n % 3 == 0 or n == 8
+            for p in range(6):
+                Payment.objects.create(
+                    transaction_id=f'outcome-{n}-{p}',
+                    vehicle=vehicle,
+                    driver=driver,
+                    amount=Decimal('20.00'),
+                    status=Payment.PaymentStatus.FAILED if bad and p % 2 else Payment.PaymentStatus.SUCCESSFUL,
+                    payment_date=cls.applied_at + timedelta(days=7 * (p + 1)),
+                )
+
+    def test_trained_artifact_is_loaded_by_the_scorer(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            stdout = io.StringIO()
+            call_command('train_risk_model', output_dir=output_dir, holdout=0, stdout=stdout)
+            self.assertIn('Rows: 12 (train 12, holdout 0)', stdout.getvalue())
+            [path] = Path(output_dir).glob('logistic-*.json')
+            artifact = json.loads(path.read_text())
+            self.assertEqual(artifact['features'], list(LOGISTIC_FEATURES))
+            self.assertTrue(artifact['params']['point_in_time'])
+
+            with self.settings(RISK_LOGISTIC_ARTIFACT=str(path)):
+                model = get_logistic_model()
+                self.assertEqual(model.version, artifact['version'])
+                self.assertEqual(model.intercept, artifact['intercept'])
+                self.assertEqual(
+                    model.weights.tolist(), [artifact['coeffs'][name] for name in LOGISTIC_FEATURES]
+                )
+                trained = [
+                    compute_driver_credit_score_logistic(app.applicant_id, app.vehicle)['probability']
+                    for app in self.applications
+                ]
+            self.assertNotEqual(get_logistic_model().version, artifact['version'])
+
+        # The fitted model ranks the drivers who kept paying above those who fell behind
+        good = [p for n, p in enumerate(trained) if not (n % 3 == 0 or n == 8)]
+        bad = [p for n, p in enumerate(trained) if n % 3 == 0 or n == 8]
+        self.assertGreater(sum(good) / len(good), sum(bad) / len(bad))
+
+    def test_snapshots_only_count_payments_before_the_application(self):
+        application = self.applications[1]
+        for transaction_id, paid_at, status in [
+            ('on-application-date', self.applied_at, Payment.PaymentStatus.SUCCESSFUL),
+            ('long-ago', self.applied_at - timedelta(days=200), Payment.PaymentStatus.FAILED),
+        ]:
+            Payment.objects.create(
+                transaction_id=transaction_id,
+                vehicle=application.vehicle,
+                driver=application.applicant,
+                amount=Decimal('20.00'),
+                status=status,
+                payment_date=paid_at,
+            )
+        with self.assertNumQueries(1):
+            snapshots = {
+                snap.application_id: snap for chunk in iter_application_snapshots(chunk_size=5) for snap in chunk
+            }
+        self.assertEqual(len(snapshots), 12)
+        for n, application in enumerate(self.applications):
+            history = n % 4
+            failed = history if n % 3 == 0 else 0
+            expected = (history - failed, failed + (n == 1), failed)
+            with self.subTest(driver=n):
+                features = snapshots[application.id].features
+                self.assertEqual(expected, (features.total_success, features.total_failed, features.failed_recent_6m))
+                self.assertEqual(features.as_of, self.applied_at.date())
+        # Today's features also count the outcome payments
+        self.assertEqual(get_driver_features(self.applications[1].applicant_id).total_success, 8)
+
+    def test_invalid_artifact_is_rejected(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as fh:
+            json.dump({'model': 'linear', 'coeffs': {}}, fh)
+        self.addCleanup(os.unlink, fh.name)
+        with self.settings(RISK_LOGISTIC_ARTIFACT=fh.name):
+            with self.assertRaises(ImproperlyConfigured):
+                get_logistic_model()
+
+
+class ExportStreamingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create(username='owner', role=User.Role.OWNER)
+        driver = User.objects.create(username='driver', role=User.Role.DRIVER)
+        vehicle = Vehicle.objects.create(
+            owner=cls.owner,
+            vehicle_type=Vehicle.VehicleType.KEKE,
+            model_name='Bajaj RE',
+            registration_number='LAG-001',
+            total_cost=Decimal('800.00'),
+        )
+        for n in range(5):
+            Payment.objects.create(transaction_id=f'tx-{n}', vehicle=vehicle, driver=driver, amount=Decimal('25.00'))
+
+    async def test_asgi_streams_from_async_iterator(self):
+        params = {'owner': str(self.owner.id)}
+        response = await self.async_client.get('/api/exports/payments.csv', params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        body = b''.join([chunk async for chunk in response])
+        self.assertEqual(body.count(b'\n'), 6)
+        wsgi = await sync_to_async(self.client.get)('/api/exports/payments.csv', params)
+        self.assertFalse(wsgi.is_async)
+        self.assertEqual(body, await sync_to_async(wsgi.getvalue)())
+
+    async def test_asgi_body_is_fetched_as_it_is_sent(self):
+        with mock.patch('core.exports.CHUNK_SIZE', 2), mock.patch(
+            'core.exports._next_chunk', side_effect=exports._next_chunk
+        ) as next_chunk:
+            response = await self.async_client.get('/api/exports/payments.csv', {'owner': str(self.owner.id)})
+            stream = aiter(response)
+            self.assertTrue((await anext(stream)).startswith(b'transaction_id,'))
+            self.assertEqual(next_chunk.call_count, 0)
+            self.assertIn(b'tx-0', await anext(stream))
+            self.assertEqual(next_chunk.call_count, 1)
+            rest = [chunk async for chunk in stream]
+        # 5 rows in chunks of 2, 2 and 1
+        self.assertEqual(len(rest), 4)
+        self.assertEqual(next_chunk.call_count, 3)
+
+    def test_server_interface_flag(self):
+        self.assertFalse(self.client.get('/api/health/').wsgi_request.is_asgi)
+        response = async_to_sync(self.async_client.get)('/api/health/')
+        self.assertTrue(response.asgi_request.is_asgi)
+
+
+class AmortizationTests(TestCase):
+    """Schedules start on the approval date; 1000.01 over 52 weeks is 19.23 a week plus 0.05 at the end."""
+
+    as_of = date(2026, 3, 19)  # 10 weeks and 3 days in: 10 instalments due
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create(username='owner', role=User.Role.OWNER)
+        cls.driver = User.objects.create(username='driver', role=User.Role.DRIVER)
+        approved_at = timezone.make_aware(datetime(2026, 1, 5, 12))
+        cls.vehicles = {}
+        for registration, paid in [
+            ('ON-TIME', '200.00'),
+            ('PARTIAL', '50.00'),
+            ('PAID-OFF', '1100.00'),
+            ('UNPAID', None),
+        ]:
+            vehicle = Vehicle.objects.create(
+                owner=cls.owner,
+                vehicle_type=Vehicle.VehicleType.KEKE,
+                model_name='Bajaj RE',
+                registration_number=registration,
+                total_cost=Decimal('800.00'),
+                total_receivable=Decimal('1000.01'),
+                repayment_duration=12,
+            )
+            DriverApplication.objects.create(
+                applicant=cls.driver,
+                vehicle=vehicle,
+                status=DriverApplication.ApplicationStatus.APPROVED,
+                decision_date=approved_at,
+            )
+            if paid:
+                Payment.objects.create(
+                    transaction_id=f'{registration}-ok',
+                    vehicle=vehicle,
+                    driver=cls.driver,
+                    amount=Decimal(paid),
+                    status=Payment.PaymentStatus.SUCCESSFUL,
+                )
+            # Failed payments never count towards the schedule
+            Payment.objects.create(
+                transaction_id=f'{registration}-failed',
+                vehicle=vehicle,
+                driver=cls.driver,
+                amount=Decimal('500.00'),
+                status=Payment.PaymentStatus.FAILED,
+            )
+            cls.vehicles[registration] = vehicle
+        cls.no_terms = Vehicle.objects.create(
+            owner=cls.owner,
+            vehicle_type=Vehicle.VehicleType.KEKE,
+            model_name='Bajaj RE',
+            registration_number='CASH',
+            total_cost=Decimal('800.00'),
+        )
+
+    def fleet_rows(self, as_of):
+        fleet = compute_fleet_arrears(as_of=as_of)
+        return {row['registration_number']: row for row in fleet.rows()}
+
+    def test_fleet_arrears(self):
+        rows = self.fleet_rows(self.as_of)
+        self.assertNotIn('CASH', rows)
+        for row in rows.values():
+            self.assertEqual(row['weekly_installment'], '19.23')
+            self.assertEqual(row['amount_due_to_date'], '192.30')
+            self.assertEqual(row['scheduled_end_date'], date(2027, 1, 4))
+        expected = {
+            # registration: (paid, arrears, instalments paid, days past due, projected payoff)
+            'ON-TIME': ('200.00', '0.00', 10, 0, self.as_of + timedelta(days=293)),
+            'PARTIAL': ('50.00', '142.30', 2, 52, self.as_of + timedelta(days=1388)),
+            'PAID-OFF': ('1100.00', '0.00', 52, 0, None),
+            'UNPAID': ('0.00', '192.30', 0, 66, date(2027, 1, 4)),
+        }
+        for registration, (paid, arrears, covered, overdue, payoff) in expected.items():
+            with self.subTest(registration=registration):
+                row = rows[registration]
+                self.assertEqual(row['amount_paid'], paid)
+                self.assertEqual(row['arrears_amount'], arrears)
+                self.assertEqual(row['installments_paid'], covered)
+                self.assertEqual(row['days_past_due'], overdue)
+                self.assertEqual(row['projected_payoff_date'], payoff)
+                self.assertEqual(row['is_paid_off'], registration == 'PAID-OFF')
+
+    def test_fleet_arrears_after_the_last_instalment(self):
+        row = self.fleet_rows(date(2027, 2, 1))['UNPAID']
+        # The final instalment carries the remainder, so everything is due
+        self.assertEqual(row['amount_due_to_date'], '1000.01')
+        self.assertEqual(row['arrears_amount'], '1000.01')
+        self.assertEqual(row['days_past_due'], 385)
+
+    def test_schedule_absorbs_remainder_in_last_instalment(self):
+        installments = vehicle_schedule(self.vehicles['UNPAID'], as_of=self.as_of)['installments']
+        self.assertEqual(len(installments), 52)
+        self.assertEqual({row['amount'] for row in installments[:-1]}, {'19.23'})
+        self.assertEqual(installments[-1]['amount'], '19.28')
+        self.assertEqual(installments[0]['interest'], '3.84')
+        self.assertEqual(installments[-1]['interest'], '4.17')
+        self.assertEqual(installments[-1]['principal'], '15.11')
+        self.assertEqual(installments[-1]['cumulative_due'], '1000.01')
+        self.assertEqual(sum(Decimal(row['interest']) for row in installments), Decimal('200.01'))
+        self.assertEqual(installments[0]['due_date'], date(2026, 1, 12))
+        self.assertEqual(installments[-1]['due_date'], date(2027, 1, 4))
+
+    def test_schedule_allocates_payments_oldest_first(self):
+        cases = {
+            # registration: [(paid, status) for instalments 1-4, 10, 11 and 12]
+            'ON-TIME': [
+                ('19.23', 'PAID'), ('19.23', 'PAID'), ('19.23', 'PAID'), ('19.23', 'PAID'),
+                ('19.23', 'PAID'), ('7.70', 'PARTIAL'), ('0.00', 'UPCOMING'),
+            ],
+            'PARTIAL': [
+                ('19.23', 'PAID'), ('19.23', 'PAID'), ('11.54', 'OVERDUE'), ('0.00', 'OVERDUE'),
+                ('0.00', 'OVERDUE'), ('0.00', 'UPCOMING'), ('0.00', 'UPCOMING'),
+            ],
+            'UNPAID': [
+                ('0.00', 'OVERDUE'), ('0.00', 'OVERDUE'), ('0.00', 'OVERDUE'), ('0.00', 'OVERDUE'),
+                ('0.00', 'OVERDUE'), ('0.00', 'UPCOMING'), ('0.00', 'UPCOMING'),
+            ],
+        }
+        for registration, expected in cases.items():
+            with self.subTest(registration=registration):
+                installments = vehicle_schedule(self.vehicles[registration], as_of=self.as_of)['installments']
+                picked = [installments[n] for n in (0, 1, 2, 3, 9, 10, 11)]
+                self.assertEqual([(row['paid'], row['status']) for row in picked], expected)
+
+        installments = vehicle_schedule(self.vehicles['PAID-OFF'], as_of=self.as_of)['installments']
+        self.assertEqual({row['status'] for row in installments}, {'PAID'})
+        self.assertEqual(installments[-1]['paid'], '19.28')
+
+    def test_schedule_endpoint(self):
+        vehicle = self.vehicles['PARTIAL']
+        response = self.client.get(f'/api/vehicles/{vehicle.id}/schedule/', {'as_of': '2026-03-19'})
+        self.assertEqual(response.status_code, 200, response.content)
+        body = response.json()
+        self.assertEqual(body['summary']['arrears_amount'], '142.30')
+        self.assertEqual(body['summary']['days_past_due'], 52)
+        self.assertEqual(body['installments'][2], {
+            'number': 3,
+            'due_date': '2026-01-26',
+            'amount': '19.23',
+            'principal': '15.39',
+            'interest': '3.84',
+            'cumulative_due': '57.69',
+            'paid': '11.54',
+            'status': 'OVERDUE',
+        })
+        path = f'/api/vehicles/{vehicle.id}/schedule/'
+        self.assertEqual(self.client.get(path, {'as_of': 'yesterday'}).status_code, 400)
+        self.assertEqual(self.client.get(f'/api/vehicles/{self.no_terms.id}/schedule/').status_code, 400)
+        self.assertEqual(self.client.get(f'/api/vehicles/{uuid.uuid4()}/schedule/').status_code, 404)
+
+    def test_owner_arrears_endpoint(self):
+        params = {'owner': str(self.owner.id), 'as_of': '2026-03-19'}
+        body = self.client.get('/api/vehicles/arrears/', params).json()
+        # Worst first: most days past due, then largest arrears; vehicles up to date tie
+        registrations = [row['registration_number'] for row in body['items']]
+        self.assertEqual(registrations[:2], ['UNPAID', 'PARTIAL'])
+        self.assertEqual(set(registrations[2:]), {'ON-TIME', 'PAID-OFF'})
+        self.assertEqual(body['summary'], {
+            'as_of': '2026-03-19',
+            'vehicles': 4,
+            'vehicles_in_arrears': 2,
+            'total_receivable': '4000.04',
+            'total_paid': '1350.00',
+            'total_arrears': '334.60',
+        })
+        overdue = self.client.get('/api/vehicles/arrears/', {**params, 'overdue': '1'}).json()
+        self.assertEqual([row['registration_number'] for row in overdue['items']], ['UNPAID', 'PARTIAL'])
+        self.assertEqual(self.client.get('/api/vehicles/arrears/', {**params, 'as_of': 'soon'}).status_code, 400)
+
+
+class ApplicationActivityTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create(username='owner', role=User.Role.OWNER)
+        driver = User.objects.create(username='driver', role=User.Role.DRIVER)
+        vehicle = Vehicle.objects.create(
+            owner=owner,
+            vehicle_type=Vehicle.VehicleType.KEKE,
+            model_name='Bajaj RE',
+            registration_number='LAG-001',
+            total_cost=Decimal('800.00'),
+        )
+        cls.application = DriverApplication.objects.create(applicant=driver, vehicle=vehicle)
+
+    def test_status_change_is_one_insert_without_loading_the_vehicle(self):
+        application = DriverApplication.objects.get(id=self.application.id)
+        application.status = DriverApplication.ApplicationStatus.APPROVED
+        application.decision_date = timezone.now()
+        with CaptureQueriesContext(connection) as queries:
+            application.save(update_fields=['status', 'decision_date', 'updated_at'])
+        statements = [query['sql'] for query in queries]
+        self.assertEqual(len([sql for sql in statements if sql.startswith('INSERT')]), 1)
+        self.assertEqual([sql for sql in statements if sql.startswith('SELECT') and 'core_vehicle' in sql], [])
+        self.assertEqual(
+            list(
+                ActivityEvent.objects.filter(object_id=application.id)
+                .order_by('occurred_at')
+                .values_list('title', 'description')
+            ),
+            [
+                ('Driver Application', 'LAG-001 • Status: Pending'),
+                ('Application Approved', 'LAG-001 • Status: Approved'),
+            ],
+        )
+
+
+class PortfolioRollupTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create(username='owner', role=User.Role.OWNER)
+
+    def add_vehicle(self, registration_number):
+        return Vehicle.objects.create(
+            owner=self.owner,
+            vehicle_type=Vehicle.VehicleType.KEKE,
+            model_name='Bajaj RE',
+            registration_number=registration_number,
+            total_cost=Decimal('800.00'),
+            total_receivable=Decimal('1040.00'),
+            repayment_duration=12,
+        )
+
+    def test_weekly_expected_is_recorded_per_week(self):
+        today = timezone.localdate()
+        self.add_vehicle('LAG-001')
+        roll_up_vehicles(as_of=today - timedelta(weeks=2))
+        self.add_vehicle('LAG-002')
+        roll_up_vehicles(as_of=today)
+        response = self.client.get(f'/api/owners/{self.owner.id}/portfolio/', {'weeks': 3})
+        self.assertEqual(response.status_code, 200, response.content)
+        expected = [week['expected'] and Decimal(week['expected']) for week in response.json()['weekly']]
+        self.assertEqual(expected, [Decimal('20.00'), None, Decimal('40.00')])
+
+        reset_payment_rollups()
+        self.assertEqual(
+            sorted(PaymentWeeklyRollup.objects.values_list('expected_amount', flat=True)),
+            [Decimal('20.00'), Decimal('40.00')],
+        )
+
+
+class DriverPaymentStatsTests(TestCase):
+    """DriverPaymentStats follows Payment writes and can be rebuilt from scratch."""
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create(username='owner', role=User.Role.OWNER)
+        cls.driver = User.objects.create(username='driver', role=User.Role.DRIVER)
+        cls.vehicle = Vehicle.objects.create(
+            owner=owner,
+            vehicle_type=Vehicle.VehicleType.KEKE,
+            model_name='Bajaj RE',
+            registration_number='LAG-001',
+            total_cost=Decimal('800.00'),
+        )
+
+    def pay(self, transaction_id, amount, payment_status=Payment.PaymentStatus.SUCCESSFUL, days_ago=0, driver=None):
+        return Payment.objects.create(
+            transaction_id=transaction_id,
+            vehicle=self.vehicle,
+            driver=driver or self.driver,
+            amount=Decimal(amount),
+            status=payment_status,
+            payment_date=timezone.now() - timedelta(days=days_ago),
+        )
+
+    def stats(self, driver=None):
+        row = DriverPaymentStats.objects.get(driver=driver or self.driver)
+        return row.successful_count, row.failed_count, row.total_amount, len(row.recent_failures)
+
+    def test_kept_in_sync_on_save_and_delete(self):
+        self.pay('tx-1', '25.00', days_ago=3)
+        self.assertEqual(self.stats(), (1, 0, Decimal('25.00'), 0))
+        failed_recently = self.pay('tx-2', '25.00', Payment.PaymentStatus.FAILED, days_ago=2)
+        self.pay('tx-3', '25.00', Payment.PaymentStatus.FAILED, days_ago=400)
+        latest = self.pay('tx-4', '30.00', days_ago=1)
+        self.assertEqual(self.stats(), (2, 2, Decimal('55.00'), 1))
+        self.assertEqual(DriverPaymentStats.objects.get(driver=self.driver).last_payment_date, latest.payment_date)
+
+        failed_recently.status = Payment.PaymentStatus.SUCCESSFUL
+        failed_recently.save()
+        self.assertEqual(self.stats(), (3, 1, Decimal('80.00'), 0))
+        latest.delete()
+        self.assertEqual(self.stats(), (2, 1, Decimal('50.00'), 0))
+
+        Payment.objects.filter(driver=self.driver).delete()  # Queryset deletes still send post_delete
+        self.assertFalse(DriverPaymentStats.objects.filter(driver=self.driver).exists())
+
+    def test_rebuild_command(self):
+        other = User.objects.create(username='other', role=User.Role.DRIVER)
+        self.pay('tx-1', '25.00')
+        self.pay('tx-2', '25.00', Payment.PaymentStatus.FAILED, days_ago=2)
+        self.pay('tx-3', '40.00', driver=other)
+        expected = {driver.pk: self.stats(driver) for driver in (self.driver, other)}
+        # Drift the rows the way a raw bulk write would
+        DriverPaymentStats.objects.update(successful_count=0, failed_count=9, total_amount=0, recent_failures=[])
+        stale = User.objects.create(username='stale', role=User.Role.DRIVER)
+        DriverPaymentStats.objects.create(driver=stale, successful_count=3)
+
+        call_command('rebuild_payment_stats', batch_size=1, stdout=io.StringIO())
+        self.assertEqual({driver.pk: self.stats(driver) for driver in (self.driver, other)}, expected)
+        self.assertFalse(DriverPaymentStats.objects.filter(driver=stale).exists())
+
+    def test_migration_fills_stats_for_existing_payments(self):
+        other = User.objects.create(username='other', role=User.Role.DRIVER)
+        self.pay('tx-1', '25.00')
+        self.pay('tx-2', '25.00', Payment.PaymentStatus.FAILED, days_ago=2)
+        self.pay('tx-3', '25.00', Payment.PaymentStatus.FAILED, days_ago=400)
+        self.pay('tx-4', '40.00', driver=other)
+        expected = {driver.pk: self.stats(driver) for driver in (self.driver, other)}
+        DriverPaymentStats.objects.all().delete()
+
+        migration = importlib.import_module('core.migrations.0007_driverpaymentstats')
+        migration.build_payment_stats(django_apps, None)
+        self.assertEqual({driver.pk: self.stats(driver) for driver in (self.driver, other)}, expected)
+
+
+class SyntheticDataTests(TestCase):
+    def generate(self, **options):
+        """Run the generator and return what it wrote; the rows are rolled back."""
+        with transaction.atomic():
+            call_command(
+                'generate_synthetic_data',
+                vehicles_per_owner=3,
+                weeks=30,
+                as_of='2026-01-05',
+                stdout=io.StringIO(),
+                **{'owners': 2, **options},
+            )
+            written = {
+                'vehicles': sorted(Vehicle.objects.values_list(
+                    'id', 'registration_number', 'vehicle_type', 'total_receivable', 'created_at'
+                )),
+                'kycs': sorted(KYC.objects.values_list('id', 'user_id', 'status', 'date_of_birth')),
+                'applications': sorted(DriverApplication.objects.values_list(
+                    'id', 'applicant_id', 'vehicle_id', 'status', 'application_date'
+                )),
+                'payments': sorted(Payment.objects.values_list(
+                    'id', 'transaction_id', 'driver_id', 'amount', 'status', 'payment_date'
+                )),
+            }
+            transaction.set_rollback(True)
+        return written
+
+    def test_same_seed_gives_the_same_data(self):
+        first = self.generate(seed=7)
+        self.assertTrue(first['payments'])
+        self.assertEqual(self.generate(seed=7), first)
+        self.assertNotEqual(self.generate(seed=8)['payments'], first['payments'])
+
+    def test_each_owner_is_seeded_on_its_own(self):
+        one, two = self.generate(seed=7, owners=1), self.generate(seed=7)
+        for table, rows in one.items():
+            with self.subTest(table=table):
+                self.assertLess(set(rows), set(two[table]))
+
+
+@override_settings(PASSWORD_PBKDF2_ITERATIONS=1000)
+class BenchmarkTests(TestCase):
+    password = 'Bench-Passw0rd!'
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command(
+            'generate_synthetic_data', owners=2, vehicles_per_owner=4, weeks=30, seed=3,
+            as_of='2026-01-05', password=cls.password, no_activity=True, stdout=io.StringIO(),
+        )
+
+    def bench(self, *scenarios, **options):
+        """Run bench_endpoints and return the saved baseline and stdout."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'baseline.json')
+            stdout = io.StringIO()
+            options = {'iterations': 2, 'warmup': 0, 'samples': 2, **options}
+            call_command('bench_endpoints', *scenarios, save=path, stdout=stdout, **options)
+            return load_baseline(path), stdout.getvalue()
+
+    def test_compare_flags_regressions_beyond_threshold(self):
+        def run(p50, p95, queries):
+            return {'results': {'vehicle_detail': {'p50_ms': p50, 'p95_ms': p95, 'max_queries': queries}}}
+
+        baseline = run(10.0, 20.0, 3)
+        cases = [
+            (run(11.9, 23.9, 3), []),
+            (run(12.1, 20.0, 3), ['p50_ms 10.00 -> 12.10']),
+            (run(10.0, 25.0, 4), ['p95_ms 20.00 -> 25.00', 'queries 3 -> 4']),
+        ]
+        for current, regressions in cases:
+            with self.subTest(current=current):
+                [row] = compare(baseline, current, threshold=0.2)
+                self.assertEqual(row['regressions'], regressions)
+        # Scenarios missing from the baseline are not compared
+        self.assertEqual(compare({'results': {}}, run(99.0, 99.0, 9), threshold=0.2), [])
+
+    def test_compare_exits_with_an_error_on_regression(self):
+        document, _ = self.bench('health', 'vehicle_detail')
+        self.assertEqual(set(document['results']), {'health', 'vehicle_detail'})
+        self.assertEqual(document['results']['vehicle_detail']['statuses'], {'200': 2})
+
+        def baseline_with(latency):
+            baseline = json.loads(json.dumps(document))
+            for result in baseline['results'].values():
+                result['p50_ms'] = result['p95_ms'] = latency
+            return baseline
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'baseline.json')
+            save_baseline(baseline_with(1e6), path)
+            _, stdout = self.bench('health', 'vehicle_detail', compare=path)
+            self.assertIn('No regressions.', stdout)
+            save_baseline(baseline_with(1e-6), path)
+            with self.assertRaisesMessage(CommandError, '2 scenario(s) regressed beyond 20%.'):
+                self.bench('health', 'vehicle_detail', compare=path)
+
+    def test_login_needs_the_generated_password(self):
+        with self.assertRaisesMessage(CommandError, "login needs the generated users' password."):
+            self.bench('login')
+        with self.assertRaisesMessage(CommandError, 'The password does not match the generated users.'):
+            self.bench('login', password='wrong')
+
+        document, stdout = self.bench(iterations=1)
+        self.assertEqual(document['meta']['skipped'], ['login'])
+        self.assertNotIn('login', document['results'])
+        self.assertIn('Skipped login', stdout)
+
+    def test_login_starts_from_cleared_rate_limits(self):
+        [sample] = load_samples(1)
+        keys = login_keys(RequestFactory().post('/api/login/'), sample.owner.email)
+        for _ in range(settings.LOGIN_FAILURE_LIMITS['email']):
+            record_login_failure(keys)
+        self.assertTrue(login_blocked(keys))
+        document, _ = self.bench('login', password=self.password, iterations=8)
+        self.assertEqual(document['results']['login']['statuses'], {'200': 8})
+        self.assertFalse(login_blocked(keys))
+
+
+class PaymentImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(username='admin', is_staff=True)
+        owner = User.objects.create(username='owner', role=User.Role.OWNER)
+        cls.driver = User.objects.create(username='driver', role=User.Role.DRIVER)
+        cls.vehicle = Vehicle.objects.create(
+            owner=owner,
+            vehicle_type=Vehicle.VehicleType.KEKE,
+            model_name='Bajaj RE',
+            registration_number='LAG-001',
+            total_cost=Decimal('800.00'),
+        )
+        Payment.objects.create(
+            transaction_id='tx-0',
+            vehicle=cls.vehicle,
+            driver=cls.driver,
+            amount=Decimal('25.00'),
+            status=Payment.PaymentStatus.SUCCESSFUL,
+        )
+
+    def upload(self, rows, chunk_size=2):
+        lines = ['transaction_id,vehicle,driver,amount,status,payment_date']
+        lines += [','.join(row) for row in rows]
+        self.client.force_login(self.admin)
+        response = self.client.post(
+            f'/api/payments/import/?chunk_size={chunk_size}', data='\n'.join(lines), content_type='text/csv'
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def row(self, transaction_id, amount='25.00', payment_status='SUCCESSFUL', day='2026-01-05T10:00:00Z'):
+        return (transaction_id, str(self.vehicle.id), str(self.driver.id), amount, payment_status, day)
+
+    def test_import_updates_derived_rows(self):
+        result = self.upload([
+            self.row('tx-1'),
+            self.row('tx-2', '30.00', 'FAILED'),
+            self.row('tx-0'),  # Already in the database
+            self.row('tx-1'),  # Repeated in a later chunk
+            self.row('tx-3', '-5'),
+            (*self.row('tx-4')[:2], str(uuid.uuid4()), '25.00', 'SUCCESSFUL', ''),
+        ])
+        self.assertEqual(
+            (result['rows'], result['inserted'], result['duplicates'], result['invalid']), (6, 2, 2, 2)
+        )
+        self.assertEqual([error['line'] for error in result['errors']], [6, 7])
+
+        stats = DriverPaymentStats.objects.get(driver=self.driver)
+        self.assertEqual((stats.successful_count, stats.failed_count, stats.total_amount), (2, 1, Decimal('50.00')))
+        self.vehicle.refresh_from_db()
+        self.assertEqual(self.vehicle.amount_paid, Decimal('25.00'))  # Only imported rows are added
+        self.assertEqual(
+            ActivityEvent.objects.filter(driver=self.driver, type=ActivityEvent.EventType.PAYMENT).count(), 3
+        )
+
+    def test_reimport_is_all_duplicates(self):
+        rows = [self.row('tx-1'), self.row('tx-2')]
+        self.upload(rows)
+        result = self.upload(rows)
+        self.assertEqual((result['inserted'], result['duplicates']), (0, 2))
+        self.assertEqual(Payment.objects.count(), 3)
+        self.assertEqual(ActivityEvent.objects.filter(type=ActivityEvent.EventType.PAYMENT).count(), 3)
+        self.vehicle.refresh_from_db()
+        self.assertEqual(self.vehicle.amount_paid, Decimal('50.00'))
+
+
+@override_settings(PASSWORD_PBKDF2_ITERATIONS=1000, LOGIN_FAILURE_LIMITS={'email': 3, 'ip': 50})
+class LoginTests(TestCase):
+    password = 'Login-Passw0rd!'
+
+    def setUp(self):
+        caches[settings.LOGIN_RATE_LIMIT_CACHE_ALIAS].clear()
+        self.addCleanup(caches[settings.LOGIN_RATE_LIMIT_CACHE_ALIAS].clear)
+        self.user = User.objects.create_user(
+            username='driver', email='driver@example.com', password=self.password, role=User.Role.DRIVER
+        )
+
+    def login(self, email, password=None):
+        return self.client.post('/api/login/', {'email': email, 'password': password or self.password})
+
+    def test_email_is_case_insensitive(self):
+        self.assertEqual(self.login('Driver@Example.COM').status_code, 200)
+
+    def test_failures_are_rate_limited(self):
+        for _ in range(3):
+            self.assertEqual(self.login('driver@example.com', 'wrong').status_code, 401)
+        response = self.login('DRIVER@example.com')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], str(settings.LOGIN_FAILURE_WINDOW))
+        # The limit is per email; the shared IP is still under its own limit
+        User.objects.create_user(username='other', email='other@example.com', password=self.password)
+        self.assertEqual(self.login('other@example.com').status_code, 200)
+
+    def test_password_rehashed_when_iterations_change(self):
+        self.assertIn('$1000$', self.user.password)
+        with self.settings(PASSWORD_PBKDF2_ITERATIONS=1500):
+            self.assertEqual(self.login('driver@example.com').status_code, 200)
+        self.user.refresh_from_db()
+        self.assertIn('$1500$', self.user.password)
+        self.assertEqual(self.login('driver@example.com').status_code, 200)
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='x')
+        owner = User.objects.create(username='owner', role=User.Role.OWNER)
+        cls.driver = User.objects.create(username='driver', role=User.Role.DRIVER)
+        cls.vehicle = Vehicle.objects.create(
+            owner=owner,
+            vehicle_type=Vehicle.VehicleType.KEKE,
+            model_name='Bajaj RE',
+            registration_number='LAG-001',
+            total_cost=Decimal('800.00'),
+        )
+        cls.application = DriverApplication.objects.create(applicant=cls.driver, vehicle=cls.vehicle)
+        cls.kyc = KYC.objects.create(
+            user=cls.driver,
+            full_name='Driver',
+            date_of_birth=date(1990, 1, 1),
+            address='Lagos',
+            document_type=KYC.DocumentType.NATIONAL_ID,
+            document_number='NIN-1',
+        )
+
+    def assertRevalidates(self, path, params=None):
+        """Return the ETag after checking a matching If-None-Match gets an empty 304."""
+        response = self.client.get(path, params or {})
+        self.assertEqual(response.status_code, 200, response.content)
+        etag = response['ETag']
+        response = self.client.get(path, params or {}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        return etag
+
+    def assertChanged(self, path, params, etag):
+        response = self.client.get(path, params or {}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def run_admin_action(self, model, action, obj):
+        self.client.force_login(self.admin)
+        response = self.client.post(
+            f'/admin/core/{model}/', {'action': action, '_selected_action': [str(obj.pk)]}
+        )
+        self.assertEqual(response.status_code, 302)
+        self.client.logout()
+
+    def test_vehicle_detail(self):
+        path = f'/api/vehicles/{self.vehicle.id}/'
+        etag = self.assertRevalidates(path)
+        self.vehicle.model_name = 'TVS King'
+        self.vehicle.save()
+        self.assertChanged(path, None, etag)
+
+    def test_admin_application_action_changes_etag(self):
+        path = f'/api/applications/{self.application.id}/'
+        etag = self.assertRevalidates(path)
+        self.run_admin_action('driverapplication', 'approve_applications', self.application)
+        self.assertChanged(path, None, etag)
+
+    def test_admin_kyc_action_changes_etag(self):
+        params = {'user': str(self.driver.id)}
+        etag = self.assertRevalidates('/api/kyc/status/', params)
+        self.run_admin_action('kyc', 'mark_under_review', self.kyc)
+        self.assertChanged('/api/kyc/status/', params, etag)
@@ -0,0 +1,165 @@
+"""Signed, stateless access and refresh tokens for mobile clients.
+
+Tokens are ``django.core.signing`` payloads (HMAC-SHA256 over SECRET_KEY
+plus a timestamp) sent as ``Authorization: Bearer <access token>``.
+Checking an access token is a signature and age check only: the caller
+becomes a ``TokenUser`` built from the token's claims, so the request
+skips the session read and user fetch that SessionAuthentication costs.
+The price is that a deactivated user keeps access until their access
+token expires (ACCESS_TOKEN_LIFETIME). Refresh tokens are checked against
+the user row and stop working once the user is deactivated or changes
+their password.
+"""
+from __future__ import annotations
+
+import uuid
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.utils.crypto import constant_time_compare
+from rest_framework import exceptions
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+
+KEYWORD = 'Bearer'
+ACCESS = 'access'
+REFRESH = 'refresh'
+# Separate salts, so a refresh token is never accepted as an access token
+_SALT = 'core.tokens.'
+
+
+def access_lifetime() -> int:
+    return int(getattr(settings, 'ACCESS_TOKEN_LIFETIME', 15 * 60))
+
+
+def refresh_lifetime() -> int:
+    return int(getattr(settings, 'REFRESH_TOKEN_LIFETIME', 14 * 24 * 3600))
+
+
+def _password_version(user) -> str:
+    # Changes with the password hash, like the session auth hash
+    return user.get_session_auth_hash()[:16]
+
+
+def issue_access_token(user) -> str:
+    return signing.dumps(
+        {'sub': str(user.pk), 'role': user.role, 'staff': user.is_staff}, salt=_SALT + ACCESS,
+    )
+
+
+def issue_tokens(user) -> Dict[str, object]:
+    """Access and refresh token pair for a freshly authenticated user."""
+    return {
+        'access': issue_access_token(user),
+        'refresh': signing.dumps({'sub': str(user.pk), 'ver': _password_version(user)}, salt=_SALT + REFRESH),
+        'token_type': KEYWORD,
+        'expires_in': access_lifetime(),
+    }
+
+
+def read_token(token: str, kind: str) -> dict:
+    """Claims of a valid ``kind`` token; raises signing.BadSignature (or SignatureExpired)."""
+    max_age = access_lifetime() if kind == ACCESS else refresh_lifetime()
+    return signing.loads(token, salt=_SALT + kind, max_age=max_age)
+
+
+def refresh_access_token(refresh_token: str) -> Optional[str]:
+    """A new access token for a valid refresh token, or None.
+
+    Costs one primary-key lookup, which also picks up role and staff
+    changes made since the refresh token was issued.
+    """
+    try:
+        claims = read_token(refresh_token, REFRESH)
+    except signing.BadSignature:
+        return None
+    user = get_user_model()._default_manager.filter(pk=claims['sub']).first()
+    if user is None or not user.is_active or not constant_time_compare(claims['ver'], _password_version(user)):
+        return None
+    return issue_access_token(user)
+
+
+class TokenUser:
+    """The caller of a token-authenticated request, built from its claims without a query.
+
+    Carries what DRF permissions and the views read (id, role, is_staff);
+    load ``User`` by ``id`` when the full row is needed.
+    """
+    is_active = True
+    is_authenticated = True
+    is_anonymous = False
+    is_superuser = False
+
+    def __init__(self, claims: dict):
+        self.claims = claims
+        self.id = self.pk = claims['sub']
+        self.role = claims.get('role', '')
+        self.is_staff = bool(claims.get('staff'))
+
+    def __str__(self):
+        return self.id
+
+    def __eq__(self, other):
+        return isinstance(other, TokenUser) and other.id == self.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+
+class AccessTokenAuthentication(BaseAuthentication):
+    """``Authorization: Bearer <access token>``; ``request.auth`` is the claims dict."""
+
+    def authenticate(self, request):
+        user = bearer_user(request)
+        return None if user is None else (user, user.claims)
+
+    def authenticate_header(self, request):
+        return KEYWORD
+
+
+def bearer_user(request) -> Optional[TokenUser]:
+    """The ``TokenUser`` of a request carrying a bearer token, or None without one.
+
+    Raises AuthenticationFailed for a malformed, forged or expired token.
+    Plain Django views (core.async_views, the notification stream) call
+    this directly, since DRF authentication does not run for them.
+    """
+    auth = get_authorization_header(request).split()
+    if not auth or auth[0].lower() != KEYWORD.lower().encode():
+        return None
+    if len(auth) != 2:
+        raise exceptions.AuthenticationFailed('Invalid token header.')
+    try:
+        claims = read_token(auth[1].decode(), ACCESS)
+    except (signing.BadSignature, UnicodeError):
+        raise exceptions.AuthenticationFailed('Invalid or expired token.')
+    return TokenUser(claims)
+
+
+def scoped_subject(request, requested_id: Optional[str], role: Optional[str] = None) -> Tuple[Optional[str], bool]:
+    """The user id a per-user read is scoped to, and whether the caller may read it.
+
+    Requests without a bearer token keep the explicit id (``requested_id``).
+    With one, the id defaults to the token's subject; another user's id, or
+    a token whose role is not ``role``, is allowed for staff only.
+    """
+    caller = request.user if isinstance(request.user, TokenUser) else None
+    return subject_for(caller, requested_id, role)
+
+
+def subject_for(caller: Optional[TokenUser], requested_id: Optional[str], role: Optional[str] = None) -> Tuple[Optional[str], bool]:
+    """``scoped_subject`` for an explicit caller, as returned by ``bearer_user``."""
+    if caller is None:
+        return requested_id, True
+    subject = requested_id or caller.id
+    if caller.is_staff:
+        return subject, True
+    return subject, _same_id(subject, caller.id) and (role is None or caller.role == role)
+
+
+def _same_id(a: str, b: str) -> bool:
+    try:
+        return uuid.UUID(str(a)) == uuid.UUID(str(b))
+    except ValueError:
+        return False
@@ -1,14 +1,22 @@
 from django.urls import path
-from . import views
+from . import async_views, views
+from .metrics import metrics_view
 
 urlpatterns = [
     path('signup/', views.SignUpView.as_view(), name='signup'),
     path('login/', views.login_view, name='login'),
     path('logout/', views.logout_view, name='logout'),
+    path('token/', views.token_obtain, name='token_obtain'),
+    path('token/refresh/', views.token_refresh, name='token_refresh'),
     path('admin/create-user/', views.AdminUserCreationView.as_view(), name='admin_create_user'),
     path('health/', views.health_check, name='health_check'),
+    path('metrics/', metrics_view, name='metrics'),
     path('vehicles/', views.VehicleCreateView.as_view(), name='vehicle_create'),
+    path('vehicles/search/', views.vehicle_search, name='vehicle_search'),
     path('vehicles/<uuid:pk>/', views.VehicleDetailView.as_view(), name='vehicle_detail'),
+    path('vehicles/<uuid:pk>/schedule/', views.vehicle_repayment_schedule, name='vehicle_repayment_schedule'),
+    path('vehicles/arrears/', views.owner_arrears, name='owner_arrears'),
+    path('owners/<uuid:owner_id>/portfolio/', views.owner_portfolio, name='owner_portfolio'),
     path('recent-activity/', views.recent_activity, name='recent_activity'),
     path('kyc/submit/', views.submit_kyc, name='kyc_submit'),
     path('kyc/status/', views.kyc_status, name='kyc_status'),
@@ -17,6 +25,17 @@ urlpatterns = [
     path('applications/<uuid:pk>/', views.application_detail, name='application_detail'),
     path('applications/<uuid:pk>/status/', views.update_application_status, name='update_application_status'),
     path('applications/owner/', views.owner_applications, name='owner_applications'),
+    path('payments/', views.post_payment_view, name='post_payment'),
+    path('payments/import/', views.import_payments_view, name='import_payments'),
+    path('exports/<str:kind>.<str:file_format>', views.export_data, name='export_data'),
     path('notifications/', views.notifications_list, name='notifications_list'),
+    path('notifications/stream/', views.notifications_stream, name='notifications_stream'),
+    path('notifications/unread-count/', views.notifications_unread_count, name='notifications_unread_count'),
     path('notifications/mark-read/', views.notifications_mark_read, name='notifications_mark_read'),
+    # Async variants of the read endpoints, for ASGI workers (backend/asgi.py)
+    path('async/kyc/status/', async_views.kyc_status, name='async_kyc_status'),
+    path('async/risk/score/', async_views.credit_risk_score, name='async_credit_risk_score'),
+    path('async/recent-activity/', async_views.recent_activity, name='async_recent_activity'),
+    path('async/applications/<uuid:pk>/', async_views.application_detail, name='async_application_detail'),
+    path('async/notifications/', async_views.notifications_list, name='async_notifications_list'),
 ]
\ No newline at end of file
@@ -1,10 +1,16 @@
 from rest_framework import status, generics
+import csv
 import logging
+import uuid
+import numpy as np
+from asgiref.sync import sync_to_async
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.permissions import AllowAny, IsAdminUser
 from django.contrib.auth import get_user_model, authenticate, login
-from django.contrib.auth.models import AnonymousUser
+from django.contrib.auth.models import AnonymousUser, update_last_login
 from .serializers import (
     UserRegistrationSerializer,
     UserSerializer,
@@ -14,10 +20,52 @@ from .serializers import (
     KYCSerializer,
     DriverApplicationSerializer,
     NotificationSerializer,
+    NotificationCompactSerializer,
 )
-from .models import Vehicle, KYC, Payment, DriverApplication, Notification
+from .models import (
+    Vehicle, KYC, DriverApplication, Notification, DriverPaymentStats, ActivityEvent,
+    PaymentWeeklyRollup, RollupWatermark, VehicleFinancialRollup,
+)
+from .rollups import PAYMENTS_WATERMARK
+from .conditional import application_version, conditional_get, kyc_version, vehicle_version
+from .risk_features import get_driver_features
+from .amortization import compute_fleet_arrears, vehicle_schedule
+from .exports import (
+    EXPORTS,
+    FORMATS as EXPORT_FORMATS,
+    aexport_rows,
+    aiter_csv,
+    export_rows,
+    headers as export_headers,
+    iter_csv,
+    write_xlsx,
+)
+from .payment_import import DEFAULT_CHUNK_SIZE, decode_lines, detect_format, import_payments, iter_records, parse_record
+from .payment_posting import PaymentConflict, post_payment
+from .pagination import MAX_LIMIT, paginate_desc, paginate_keyset, parse_limit
+from .ratelimit import failure_window, login_blocked, login_keys, record_login_failure, reset_login_failures
+from .tokens import (
+    KEYWORD as TOKEN_KEYWORD,
+    access_lifetime,
+    bearer_user,
+    issue_tokens,
+    refresh_access_token,
+    scoped_subject,
+    subject_for,
+)
+from .middleware import is_asgi
+from .notification_stream import event_id_of, format_event, get_broker
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.handlers.asgi import ASGIRequest
 from django.db import IntegrityError, DataError
-from decimal import InvalidOperation
+from django.db.models import Q, Sum
+from django.http import FileResponse, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.decorators import method_decorator
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
 
 User = get_user_model()
 logger = logging.getLogger('django')
@@ -56,40 +104,87 @@ class AdminUserCreationView(generics.CreateAPIView):
             }, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+def _authenticate_login(request):
+    """Validate a login body and authenticate it, applying the login rate limits.
+
+    Returns ``(user, None)`` on success or ``(None, error response)``. Once
+    an IP or email reaches LOGIN_FAILURE_LIMITS failed attempts within
+    LOGIN_FAILURE_WINDOW, further attempts get 429 without any password
+    hashing.
+    """
+    serializer = LoginSerializer(data=request.data)
+    if not serializer.is_valid():
+        return None, Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    email = serializer.validated_data['email']
+    password = serializer.validated_data['password']
+
+    keys = login_keys(request, email)
+    if login_blocked(keys):
+        response = Response({
+            'error': 'Too many login attempts. Try again later.'
+        }, status=status.HTTP_429_TOO_MANY_REQUESTS)
+        response['Retry-After'] = str(failure_window())
+        return None, response
+
+    # One indexed lower(email) lookup (core.auth_backends.EmailBackend)
+    authenticated_user = authenticate(request, email=email, password=password)
+    if authenticated_user is None:
+        record_login_failure(keys)
+        return None, Response({
+            'error': 'Invalid credentials'
+        }, status=status.HTTP_401_UNAUTHORIZED)
+    reset_login_failures(keys)
+    return authenticated_user, None
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def login_view(request):
-    """Login endpoint that returns user data and role for frontend routing"""
-    serializer = LoginSerializer(data=request.data)
-    if serializer.is_valid():
-        email = serializer.validated_data['email']
-        password = serializer.validated_data['password']
-        
-        # Find user by email (since we use email for login)
-        try:
-            user = User.objects.get(email=email)
-            # Authenticate using username and password
-            authenticated_user = authenticate(request, username=user.username, password=password)
-            
-            if authenticated_user:
-                login(request, authenticated_user)
-                user_data = UserSerializer(authenticated_user).data
-                return Response({
-                    'message': 'Login successful',
-                    'user': user_data,
-                    'role': authenticated_user.role
-                }, status=status.HTTP_200_OK)
-            else:
-                return Response({
-                    'error': 'Invalid credentials'
-                }, status=status.HTTP_401_UNAUTHORIZED)
-                
-        except User.DoesNotExist:
-            return Response({
-                'error': 'Invalid credentials'
-            }, status=status.HTTP_401_UNAUTHORIZED)
-    
-    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    """Login endpoint that returns user data and role for frontend routing."""
+    authenticated_user, error = _authenticate_login(request)
+    if error is not None:
+        return error
+    login(request, authenticated_user)
+    user_data = UserSerializer(authenticated_user).data
+    return Response({
+        'message': 'Login successful',
+        'user': user_data,
+        'role': authenticated_user.role
+    }, status=status.HTTP_200_OK)
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def token_obtain(request):
+    """Token login for mobile clients: same body and rate limits as login_view, no session.
+
+    Returns ``access`` (send as ``Authorization: Bearer <access>``, valid
+    ACCESS_TOKEN_LIFETIME seconds) and ``refresh`` (exchange at
+    token/refresh/ for a new access token).
+    """
+    authenticated_user, error = _authenticate_login(request)
+    if error is not None:
+        return error
+    update_last_login(None, authenticated_user)
+    return Response({
+        **issue_tokens(authenticated_user),
+        'user': UserSerializer(authenticated_user).data,
+        'role': authenticated_user.role
+    }, status=status.HTTP_200_OK)
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def token_refresh(request):
+    """Exchange a refresh token for a new access token."""
+    refresh = request.data.get('refresh')
+    if not refresh or not isinstance(refresh, str):
+        return Response({'error': 'Missing refresh token'}, status=status.HTTP_400_BAD_REQUEST)
+    access = refresh_access_token(refresh)
+    if access is None:
+        return Response({'error': 'Invalid or expired refresh token'}, status=status.HTTP_401_UNAUTHORIZED)
+    return Response({
+        'access': access,
+        'token_type': TOKEN_KEYWORD,
+        'expires_in': access_lifetime()
+    }, status=status.HTTP_200_OK)
 
 @api_view(['POST'])
 def logout_view(request):
@@ -116,7 +211,9 @@ class VehicleCreateView(generics.ListCreateAPIView):
             queryset = queryset.filter(owner_id=owner_id)
         return queryset
 
+@method_decorator(conditional_get(vehicle_version), name='get')
 class VehicleDetailView(generics.RetrieveUpdateAPIView):
+    """GET sends an ETag / Last-Modified and answers 304 to a matching conditional GET."""
     queryset = Vehicle.objects.all()
     serializer_class = VehicleSerializer
     permission_classes = [AllowAny]
@@ -133,6 +230,78 @@ class VehicleDetailView(generics.RetrieveUpdateAPIView):
         return Response(serializer.data)
 
 
+# sort param -> (field, descending, cursor value parser)
+VEHICLE_SEARCH_SORTS = {
+    'newest': ('created_at', True, parse_datetime),
+    'weekly_returns': ('weekly_returns', False, Decimal),
+    '-weekly_returns': ('weekly_returns', True, Decimal),
+}
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def vehicle_search(request):
+    """Search open vehicles (active, no driver assigned) for drivers to apply for.
+
+    Query params:
+      - type: KEKE / BUS / BIKE (optional)
+      - min_weekly / max_weekly: inclusive weekly_returns bounds (optional)
+      - duration: repayment duration in months, 12 / 18 / 24 (optional)
+      - q: model name prefix, case-insensitive (optional)
+      - sort: newest (default), weekly_returns or -weekly_returns
+      - limit: page size (default 50, max 200)
+      - cursor: ``next_cursor`` from the previous page (same filters and sort)
+
+    Served by the partial indexes on Vehicle; no total count is returned,
+    as counting every match would cost more than the page itself.
+    """
+    try:
+        params = request.query_params
+        sort = params.get('sort') or 'newest'
+        if sort not in VEHICLE_SEARCH_SORTS:
+            return Response({'error': 'Invalid sort'}, status=status.HTTP_400_BAD_REQUEST)
+        vehicles = Vehicle.objects.filter(driver__isnull=True, is_active=True)
+
+        vehicle_type = params.get('type')
+        if vehicle_type:
+            if vehicle_type not in Vehicle.VehicleType.values:
+                return Response({'error': 'Invalid type'}, status=status.HTTP_400_BAD_REQUEST)
+            vehicles = vehicles.filter(vehicle_type=vehicle_type)
+        for name, lookup in (('min_weekly', 'weekly_returns__gte'), ('max_weekly', 'weekly_returns__lte')):
+            if params.get(name):
+                try:
+                    bound = Decimal(params[name])
+                except InvalidOperation:
+                    return Response({'error': f'Invalid {name}'}, status=status.HTTP_400_BAD_REQUEST)
+                if not bound.is_finite():
+                    return Response({'error': f'Invalid {name}'}, status=status.HTTP_400_BAD_REQUEST)
+                vehicles = vehicles.filter(**{lookup: bound})
+        duration = params.get('duration')
+        if duration:
+            if duration not in ('12', '18', '24'):
+                return Response({'error': 'Invalid duration'}, status=status.HTTP_400_BAD_REQUEST)
+            vehicles = vehicles.filter(repayment_duration=int(duration))
+        prefix = (params.get('q') or '').strip()
+        if prefix:
+            vehicles = vehicles.filter(model_name__istartswith=prefix[:100])
+
+        field, descending, parse = VEHICLE_SEARCH_SORTS[sort]
+        try:
+            page, next_cursor = paginate_keyset(
+                vehicles,
+                field,
+                cursor=params.get('cursor'),
+                limit=parse_limit(params.get('limit')),
+                descending=descending,
+                parse=parse,
+            )
+        except (ValueError, ValidationError):
+            return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+        data = VehicleSerializer(page, many=True).data
+        return Response({'items': data, 'count': len(data), 'next_cursor': next_cursor}, status=status.HTTP_200_OK)
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
 def compute_driver_credit_score(applicant_id, vehicle):
     """Compute a simple credit risk score for a driver.
 
@@ -144,24 +313,22 @@ def compute_driver_credit_score(applicant_id, vehicle):
     - Clamp to [300, 850]
     """
     score = 500
+    features = get_driver_features(applicant_id)
 
     # KYC adjustment
-    kyc = KYC.objects.filter(user_id=applicant_id).first()
-    if kyc:
-        if kyc.status == KYC.VerificationStatus.APPROVED:
+    if features.has_kyc:
+        if features.kyc_status == KYC.VerificationStatus.APPROVED:
             score += 200
-        elif kyc.status == KYC.VerificationStatus.UNDER_REVIEW:
+        elif features.kyc_status == KYC.VerificationStatus.UNDER_REVIEW:
             score += 50
-        elif kyc.status == KYC.VerificationStatus.REJECTED:
+        elif features.kyc_status == KYC.VerificationStatus.REJECTED:
             score -= 200
-        elif kyc.status == KYC.VerificationStatus.PENDING:
+        elif features.kyc_status == KYC.VerificationStatus.PENDING:
             score -= 50
 
     # Payment history adjustments
-    successful_count = Payment.objects.filter(driver_id=applicant_id, status=Payment.PaymentStatus.SUCCESSFUL).count()
-    failed_count = Payment.objects.filter(driver_id=applicant_id, status=Payment.PaymentStatus.FAILED).count()
-    score += min(successful_count * 15, 150)
-    score -= min(failed_count * 25, 250)
+    score += min(features.total_success * 15, 150)
+    score -= min(features.total_failed * 25, 250)
 
     # Weekly burden adjustment (vehicle-specific)
     try:
@@ -180,50 +347,54 @@ def compute_driver_credit_score(applicant_id, vehicle):
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def recent_activity(request):
-    """Return recent activity for a driver including KYC, applications, and payments."""
-    driver_id = request.query_params.get('driver')
+    """Return a driver's activity timeline (KYC, applications and payments), newest first.
+
+    Query params:
+      - driver: driver UUID (required)
+      - limit: page size (default 10, max 200)
+      - before: ``next_cursor`` from the previous page
+
+    Reads the append-only ActivityEvent table, so a page costs one indexed
+    query plus the payment summary regardless of history size.
+    """
+    driver_id, allowed = scoped_subject(request, request.query_params.get('driver'))
+    if not allowed:
+        return Response({'error': 'Not allowed'}, status=status.HTTP_403_FORBIDDEN)
     if not driver_id:
         return Response({'error': 'Missing driver id'}, status=status.HTTP_400_BAD_REQUEST)
 
-    # Build activity list
-    activities = []
     try:
-        # KYC activity
-        kyc = KYC.objects.filter(user_id=driver_id).first()
-        if kyc:
-            activities.append({
-                'type': 'KYC',
-                'title': 'KYC Submitted',
-                'description': f'Status: {kyc.status.title()}',
-                'timestamp': kyc.submitted_at.isoformat() if kyc.submitted_at else None,
-            })
-
-        # Driver applications
-        apps = DriverApplication.objects.filter(applicant_id=driver_id).order_by('-application_date')[:5]
-        for app in apps:
-            activities.append({
-                'type': 'APPLICATION',
-                'title': 'Driver Application',
-                'description': f'{app.vehicle.registration_number} • Status: {app.status.title()}',
-                'timestamp': app.application_date.isoformat() if app.application_date else None,
-            })
-
-        # Payments
-        payments = Payment.objects.filter(driver_id=driver_id).order_by('-payment_date')[:5]
-        for p in payments:
-            activities.append({
-                'type': 'PAYMENT',
-                'title': 'Payment Made' if p.status == Payment.PaymentStatus.SUCCESSFUL else 'Payment Failed',
-                'description': f'₦{p.amount} • {p.vehicle.registration_number}',
-                'timestamp': p.payment_date.isoformat() if p.payment_date else None,
-            })
+        try:
+            events, next_cursor = paginate_desc(
+                ActivityEvent.objects.filter(driver_id=driver_id).only(
+                    'id', 'type', 'title', 'description', 'occurred_at'
+                ),
+                'occurred_at',
+                cursor=request.query_params.get('before'),
+                limit=parse_limit(request.query_params.get('limit'), default=10),
+            )
+        except ValueError:
+            return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+        activities = [
+            {
+                'type': event.type,
+                'title': event.title,
+                'description': event.description,
+                'timestamp': event.occurred_at.isoformat(),
+            }
+            for event in events
+        ]
 
-        # Sort by timestamp desc and limit
-        activities = [a for a in activities if a.get('timestamp')]
-        activities.sort(key=lambda a: a['timestamp'], reverse=True)
-        activities = activities[:10]
+        # Payment summary from the maintained per-driver stats row
+        stats = DriverPaymentStats.objects.filter(driver_id=driver_id).first()
+        summary = {
+            'successful_payments': stats.successful_count if stats else 0,
+            'failed_payments': stats.failed_count if stats else 0,
+            'total_paid': str(stats.total_amount) if stats else '0.00',
+            'last_payment_date': stats.last_payment_date.isoformat() if stats and stats.last_payment_date else None,
+        }
 
-        return Response({'items': activities}, status=status.HTTP_200_OK)
+        return Response({'items': activities, 'summary': summary, 'next_cursor': next_cursor}, status=status.HTTP_200_OK)
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -236,9 +407,14 @@ def credit_risk_score(request):
     Query params:
       - user: driver UUID (required)
       - vehicle: vehicle UUID (optional)
+
+    Scores are cached per (driver, vehicle, config version); ``cached`` in the
+    response and the X-Cache header report whether this was a cache hit.
     """
     try:
-        user_id = request.query_params.get('user')
+        user_id, allowed = scoped_subject(request, request.query_params.get('user'))
+        if not allowed:
+            return Response({'error': 'Not allowed'}, status=status.HTTP_403_FORBIDDEN)
         vehicle_id = request.query_params.get('vehicle')
         if not user_id:
             return Response({'error': 'Missing user id'}, status=status.HTTP_400_BAD_REQUEST)
@@ -250,20 +426,23 @@ def credit_risk_score(request):
             except Vehicle.DoesNotExist:
                 return Response({'error': 'Invalid vehicle'}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Always use logistic scoring
-        from .risk_model import compute_driver_credit_score_logistic
-        details = compute_driver_credit_score_logistic(applicant_id=user_id, vehicle=vehicle)
+        # Always use logistic scoring, served from the score cache when fresh
+        from .score_cache import get_or_compute_score
+        details, cached = get_or_compute_score(user_id, vehicle)
         try:
             logger.info(
-                "[CREDIT_RISK_SCORE] logistic details user=%s vehicle=%s -> %s",
+                "[CREDIT_RISK_SCORE] logistic details user=%s vehicle=%s cached=%s -> %s",
                 user_id,
                 getattr(vehicle, 'id', None),
+                cached,
                 details,
             )
         except Exception:
             pass
 
-        return Response(details, status=status.HTTP_200_OK)
+        response = Response({**details, 'cached': cached}, status=status.HTTP_200_OK)
+        response['X-Cache'] = 'HIT' if cached else 'MISS'
+        return response
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -304,10 +483,16 @@ def submit_kyc(request):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@conditional_get(kyc_version)
 def kyc_status(request):
-    """Return the current KYC status for a given user id."""
+    """Return the current KYC status for a given user id.
+
+    Sends an ETag / Last-Modified and answers 304 to a matching conditional GET.
+    """
     try:
-        user_id = request.query_params.get('user')
+        user_id, allowed = scoped_subject(request, request.query_params.get('user'))
+        if not allowed:
+            return Response({'error': 'Not allowed'}, status=status.HTTP_403_FORBIDDEN)
         if not user_id:
             return Response({'error': 'Missing user id'}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -347,9 +532,9 @@ def submit_application(request):
         except Vehicle.DoesNotExist:
             return Response({'error': 'Invalid vehicle'}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Require approved KYC
-        kyc = KYC.objects.filter(user_id=applicant_id).first()
-        if not kyc or kyc.status != KYC.VerificationStatus.APPROVED:
+        # Require approved KYC (features carry the KYC status and payment history)
+        features = get_driver_features(applicant_id)
+        if features.kyc_status != KYC.VerificationStatus.APPROVED:
             return Response({'error': 'KYC must be approved before applying'}, status=status.HTTP_400_BAD_REQUEST)
 
         # Prevent re-applying for the same vehicle by same driver and return current status
@@ -363,9 +548,9 @@ def submit_application(request):
             # Backfill risk score using logistic model if missing on older records
             if existing.risk_score is None:
                 from .risk_model import compute_driver_credit_score_logistic
-                details = compute_driver_credit_score_logistic(applicant_id=applicant_id, vehicle=vehicle)
+                details = compute_driver_credit_score_logistic(applicant_id=applicant_id, vehicle=vehicle, features=features)
                 existing.risk_score = int(details.get('score') or 0)
-                existing.save(update_fields=['risk_score'])
+                existing.save(update_fields=['risk_score', 'updated_at'])
             return Response(
                 {
                     'message': 'You have applied for this vehicle already',
@@ -377,7 +562,7 @@ def submit_application(request):
 
         # Compute risk score and create application using logistic scoring only
         from .risk_model import compute_driver_credit_score_logistic
-        risk_details = compute_driver_credit_score_logistic(applicant_id=applicant_id, vehicle=vehicle)
+        risk_details = compute_driver_credit_score_logistic(applicant_id=applicant_id, vehicle=vehicle, features=features)
         risk_score = int(risk_details.get('score') or 0)
         try:
             logger.info(
@@ -418,8 +603,12 @@ def submit_application(request):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@conditional_get(application_version)
 def application_detail(request, pk):
-    """Fetch a single driver application by id."""
+    """Fetch a single driver application by id.
+
+    Sends an ETag / Last-Modified and answers 304 to a matching conditional GET.
+    """
     try:
         try:
             application = DriverApplication.objects.get(id=pk)
@@ -454,7 +643,7 @@ def update_application_status(request, pk):
         application.status = new_status
         from django.utils import timezone
         application.decision_date = timezone.now()
-        application.save(update_fields=['status', 'decision_date'])
+        application.save(update_fields=['status', 'decision_date', 'updated_at'])
 
         # Notify owner about the decision update
         try:
@@ -474,14 +663,327 @@ def update_application_status(request, pk):
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def owner_applications(request):
-    """List all driver applications for vehicles owned by a given owner."""
+    """List driver applications for vehicles owned by a given owner, newest first.
+
+    Query params:
+      - owner: owner UUID (required; defaults to the caller with a bearer token)
+      - status: PENDING / APPROVED / REJECTED (optional)
+      - vehicle: vehicle UUID (optional)
+      - limit: page size (default 50, max 200)
+      - cursor: ``next_cursor`` from the previous page
+    """
     try:
-        owner_id = request.query_params.get('owner')
+        owner_id, allowed = scoped_subject(request, request.query_params.get('owner'), User.Role.OWNER)
+        if not allowed:
+            return Response({'error': 'Not allowed'}, status=status.HTTP_403_FORBIDDEN)
         if not owner_id:
             return Response({'error': 'Missing owner id'}, status=status.HTTP_400_BAD_REQUEST)
-        apps = DriverApplication.objects.filter(vehicle__owner_id=owner_id).order_by('-application_date')
-        data = DriverApplicationSerializer(apps, many=True).data
-        return Response({'items': data, 'count': len(data)}, status=status.HTTP_200_OK)
+        apps = DriverApplication.objects.filter(vehicle__owner_id=owner_id)
+
+        app_status = request.query_params.get('status')
+        if app_status:
+            if app_status not in DriverApplication.ApplicationStatus.values:
+                return Response({'error': 'Invalid status'}, status=status.HTTP_400_BAD_REQUEST)
+            apps = apps.filter(status=app_status)
+        vehicle_id = request.query_params.get('vehicle')
+        if vehicle_id:
+            try:
+                apps = apps.filter(vehicle_id=uuid.UUID(vehicle_id))
+            except ValueError:
+                return Response({'error': 'Invalid vehicle id'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            page, next_cursor = paginate_desc(
+                apps.select_related('vehicle', 'applicant'),
+                'application_date',
+                cursor=request.query_params.get('cursor'),
+                limit=parse_limit(request.query_params.get('limit')),
+            )
+        except ValueError:
+            return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+        data = DriverApplicationSerializer(page, many=True).data
+        return Response(
+            {'items': data, 'count': apps.count(), 'next_cursor': next_cursor},
+            status=status.HTTP_200_OK,
+        )
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def vehicle_repayment_schedule(request, pk):
+    """Weekly hire-purchase schedule for a vehicle with payments reconciled.
+
+    Query params:
+      - as_of: YYYY-MM-DD date to evaluate arrears at (default today)
+    """
+    try:
+        as_of = None
+        if request.query_params.get('as_of'):
+            as_of = parse_date(request.query_params['as_of'])
+            if as_of is None:
+                return Response({'error': 'Invalid as_of date'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            vehicle = Vehicle.objects.only('id', 'total_cost').get(id=pk)
+        except Vehicle.DoesNotExist:
+            return Response({'error': 'Vehicle not found'}, status=status.HTTP_404_NOT_FOUND)
+        schedule = vehicle_schedule(vehicle, as_of=as_of)
+        if schedule is None:
+            return Response({'error': 'Vehicle has no repayment terms'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(schedule, status=status.HTTP_200_OK)
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def owner_arrears(request):
+    """Arrears position of every financed vehicle an owner has, worst first.
+
+    Query params:
+      - owner: owner UUID (required; defaults to the caller with a bearer token)
+      - overdue: 1 to return only vehicles in arrears
+      - as_of: YYYY-MM-DD date to evaluate arrears at (default today)
+    """
+    try:
+        owner_id, allowed = scoped_subject(request, request.query_params.get('owner'), User.Role.OWNER)
+        if not allowed:
+            return Response({'error': 'Not allowed'}, status=status.HTTP_403_FORBIDDEN)
+        if not owner_id:
+            return Response({'error': 'Missing owner id'}, status=status.HTTP_400_BAD_REQUEST)
+        as_of = None
+        if request.query_params.get('as_of'):
+            as_of = parse_date(request.query_params['as_of'])
+            if as_of is None:
+                return Response({'error': 'Invalid as_of date'}, status=status.HTTP_400_BAD_REQUEST)
+        fleet = compute_fleet_arrears(Vehicle.objects.filter(owner_id=owner_id), as_of=as_of)
+        order = np.lexsort((-fleet.arrears, -fleet.days_past_due))
+        if request.query_params.get('overdue') in ('1', 'true', 'True'):
+            order = order[fleet.days_past_due[order] > 0]
+        return Response({'items': fleet.rows(order), 'summary': fleet.summary()}, status=status.HTTP_200_OK)
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def owner_portfolio(request, owner_id):
+    """Fleet-level financials for an owner, read from the portfolio rollups.
+
+    Query params:
+      - weeks: number of recent weeks in the expected vs collected series
+        (default 12, max 104)
+
+    Figures are as fresh as the last ``manage.py update_portfolio_rollups``
+    run; ``computed_at`` and ``payments_through`` say how fresh that is.
+    Weekly ``expected`` is the fleet's weekly instalment total as recorded
+    by the last run in that week, or null for weeks with no run.
+    """
+    try:
+        _, allowed = scoped_subject(request, str(owner_id), User.Role.OWNER)
+        if not allowed:
+            return Response({'error': 'Not allowed'}, status=status.HTTP_403_FORBIDDEN)
+        weeks = parse_limit(request.query_params.get('weeks'), default=12, maximum=104)
+        metrics = (
+            'vehicle_count', 'financed_count', 'fully_paid_count', 'in_arrears_count', 'defaulted_count',
+            'total_cost', 'total_receivable', 'amount_collected', 'arrears_amount', 'weekly_expected',
+        )
+        by_type = list(
+            VehicleFinancialRollup.objects.filter(owner_id=owner_id)
+            .order_by('vehicle_type')
+            .values('vehicle_type', 'computed_at', *metrics)
+        )
+        money = {'total_cost', 'total_receivable', 'amount_collected', 'arrears_amount', 'weekly_expected'}
+        totals = {
+            name: sum((row[name] for row in by_type), Decimal('0.00') if name in money else 0)
+            for name in metrics
+        }
+
+        def present(row):
+            row['default_rate'] = round(row['defaulted_count'] / row['financed_count'], 4) if row['financed_count'] else None
+            for name in money:
+                row[name] = str(row[name])
+            return row
+
+        today = timezone.localdate()
+        since = today - timedelta(days=today.weekday(), weeks=weeks - 1)
+        collected = {
+            row['week_start']: row
+            for row in PaymentWeeklyRollup.objects.filter(owner_id=owner_id, week_start__gte=since)
+            .values('week_start')
+            .annotate(
+                expected=Sum('expected_amount'),
+                collected=Sum('collected_amount'),
+                successful=Sum('successful_count'),
+                failed=Sum('failed_count'),
+            )
+            .order_by()
+        }
+        weekly = []
+        for n in range(weeks):
+            week_start = since + timedelta(weeks=n)
+            row = collected.get(week_start, {})
+            expected = row.get('expected')
+            weekly.append({
+                'week_start': week_start,
+                'expected': str(expected) if expected is not None else None,
+                'collected': str(row.get('collected') or Decimal('0.00')),
+                'successful_payments': row.get('successful') or 0,
+                'failed_payments': row.get('failed') or 0,
+            })
+
+        payments_through = (
+            RollupWatermark.objects.filter(name=PAYMENTS_WATERMARK).values_list('value', flat=True).first()
+        )
+        computed_at = min((row.pop('computed_at') for row in by_type), default=None)
+        return Response({
+            'owner': str(owner_id),
+            'totals': present(totals),
+            'by_vehicle_type': [present(row) for row in by_type],
+            'weekly': weekly,
+            'computed_at': computed_at,
+            'payments_through': payments_through,
+        }, status=status.HTTP_200_OK)
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def post_payment_view(request):
+    """Post a single payment (gateway webhook) and update the vehicle balance.
+
+    Body: transaction_id, vehicle, driver, amount, status, payment_date (optional).
+    Idempotent on transaction_id: a retry returns 200 with the stored payment,
+    a first post returns 201, and a reused id with different details is 409.
+    """
+    try:
+        try:
+            parsed = parse_record(request.data)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            payment, created = post_payment(
+                parsed.transaction_id,
+                parsed.vehicle_id,
+                parsed.driver_id,
+                parsed.amount,
+                parsed.status,
+                payment_date=parsed.payment_date,
+            )
+        except Vehicle.DoesNotExist:
+            return Response({'error': 'Vehicle not found'}, status=status.HTTP_404_NOT_FOUND)
+        except PaymentConflict as e:
+            return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
+        except IntegrityError:
+            return Response({'error': 'Unknown driver'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            {
+                'id': str(payment.id),
+                'transaction_id': payment.transaction_id,
+                'vehicle': str(payment.vehicle_id),
+                'driver': str(payment.driver_id),
+                'amount': str(payment.amount),
+                'status': payment.status,
+                'payment_date': payment.payment_date,
+                'created': created,
+            },
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def import_payments_view(request):
+    """Import a gateway settlement file of payments (admin only).
+
+    Send the file as the raw request body with Content-Type ``text/csv`` or
+    ``application/x-ndjson``. The body is read line by line and inserted in
+    chunks, so large files never sit in memory. Rows whose transaction_id
+    already exists are counted as duplicates.
+
+    Query params:
+      - chunk_size: rows per insert transaction (default 2000, max 10000)
+    """
+    try:
+        fmt = detect_format(content_type=request.content_type)
+        if fmt is None:
+            return Response(
+                {'error': 'Content-Type must be text/csv or application/x-ndjson'},
+                status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            )
+        if request.stream is None:
+            return Response({'error': 'Empty body'}, status=status.HTTP_400_BAD_REQUEST)
+        chunk_size = parse_limit(request.query_params.get('chunk_size'), default=DEFAULT_CHUNK_SIZE, maximum=10000)
+        try:
+            result = import_payments(iter_records(decode_lines(request.stream), fmt), chunk_size=chunk_size)
+        except (UnicodeDecodeError, csv.Error) as e:
+            return Response({'error': f'Unreadable file: {e}'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result.as_dict(), status=status.HTTP_200_OK)
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def export_data(request, kind, file_format):
+    """Download applications, payments or vehicles as CSV (streamed) or XLSX.
+
+    URL: exports/<applications|payments|vehicles>.<csv|xlsx>
+
+    Query params:
+      - owner: owner UUID (required unless the caller is staff; defaults to
+        the caller with a bearer token)
+      - since / until: inclusive YYYY-MM-DD bounds on the record date
+
+    Under ASGI the CSV is streamed from an async iterator, since Django
+    reads a synchronous streaming body into memory before sending it there.
+    XLSX is written to a temporary file first in either case.
+    """
+    try:
+        if kind not in EXPORTS or file_format not in EXPORT_FORMATS:
+            return Response({'error': 'Unknown export'}, status=status.HTTP_404_NOT_FOUND)
+        owner_id = request.query_params.get('owner')
+        if owner_id or not request.user.is_staff:
+            owner_id, allowed = scoped_subject(request, owner_id, User.Role.OWNER)
+            if not allowed:
+                return Response({'error': 'Not allowed'}, status=status.HTTP_403_FORBIDDEN)
+        if not owner_id and not request.user.is_staff:
+            return Response({'error': 'Missing owner id'}, status=status.HTTP_400_BAD_REQUEST)
+        if owner_id:
+            try:
+                owner_id = uuid.UUID(owner_id)
+            except ValueError:
+                return Response({'error': 'Invalid owner id'}, status=status.HTTP_400_BAD_REQUEST)
+        bounds = {}
+        for name in ('since', 'until'):
+            if request.query_params.get(name):
+                bounds[name] = parse_date(request.query_params[name])
+                if bounds[name] is None:
+                    return Response({'error': f'Invalid {name} date'}, status=status.HTTP_400_BAD_REQUEST)
+
+        filename = f'{kind}-{timezone.localdate().isoformat()}.{file_format}'
+        if file_format == 'xlsx':
+            try:
+                output = write_xlsx(export_headers(kind), export_rows(kind, owner_id=owner_id, **bounds))
+            except ImportError as e:
+                return Response({'error': str(e)}, status=status.HTTP_501_NOT_IMPLEMENTED)
+            return FileResponse(
+                output,
+                as_attachment=True,
+                filename=filename,
+                content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            )
+        if is_asgi(request):
+            lines = aiter_csv(export_headers(kind), aexport_rows(kind, owner_id=owner_id, **bounds))
+        else:
+            lines = iter_csv(export_headers(kind), export_rows(kind, owner_id=owner_id, **bounds))
+        response = StreamingHttpResponse(lines, content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -489,30 +991,179 @@ def owner_applications(request):
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def notifications_list(request):
-    """List notifications for a given user id."""
+    """List notifications for a given user id, newest first.
+
+    Query params:
+      - user: user UUID (required; defaults to the caller with a bearer token)
+      - compact: 1 to return only the application id and summary fields
+      - limit: page size (default 50, max 200)
+      - cursor: ``next_cursor`` from the previous page
+      - with_count: 1 to add ``count``, the user's total number of
+        notifications (not the page length). Opt-in because it counts the
+        whole history on every page.
+    """
     try:
-        user_id = request.query_params.get('user')
+        user_id, allowed = scoped_subject(request, request.query_params.get('user'))
+        if not allowed:
+            return Response({'error': 'Not allowed'}, status=status.HTTP_403_FORBIDDEN)
         if not user_id:
             return Response({'error': 'Missing user id'}, status=status.HTTP_400_BAD_REQUEST)
-        notes = Notification.objects.filter(user_id=user_id).order_by('-created_at')
-        data = NotificationSerializer(notes, many=True).data
-        return Response({'items': data, 'count': len(data)}, status=status.HTTP_200_OK)
+        compact = request.query_params.get('compact') in ('1', 'true', 'True')
+        notes = Notification.objects.filter(user_id=user_id)
+        if compact:
+            notes = notes.select_related('application__vehicle')
+            serializer_class = NotificationCompactSerializer
+        else:
+            notes = notes.select_related('application__vehicle', 'application__applicant')
+            serializer_class = NotificationSerializer
+        try:
+            page, next_cursor = paginate_desc(
+                notes,
+                'created_at',
+                cursor=request.query_params.get('cursor'),
+                limit=parse_limit(request.query_params.get('limit')),
+            )
+        except ValueError:
+            return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+        body = {'items': serializer_class(page, many=True).data, 'next_cursor': next_cursor}
+        if request.query_params.get('with_count') in ('1', 'true', 'True'):
+            body['count'] = notes.count()
+        return Response(body, status=status.HTTP_200_OK)
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def notifications_unread_count(request):
+    """Return the number of unread notifications for a user.
+
+    ``user`` defaults to the caller with a bearer token.
+
+    The count stops at NOTIFICATION_UNREAD_COUNT_CAP (default 99), which
+    is all a badge shows; ``capped`` is true when there are more. One
+    COUNT over at most cap + 1 rows of the partial index of unread
+    notifications (notif_user_unread_idx), so the read stays bounded even
+    for a user who never marks anything read. A stored per-user counter
+    would add a contended write to every notification insert and
+    mark-read and could drift under bulk updates.
+    """
+    try:
+        user_id, allowed = scoped_subject(request, request.query_params.get('user'))
+        if not allowed:
+            return Response({'error': 'Not allowed'}, status=status.HTTP_403_FORBIDDEN)
+        if not user_id:
+            return Response({'error': 'Missing user id'}, status=status.HTTP_400_BAD_REQUEST)
+        cap = int(getattr(settings, 'NOTIFICATION_UNREAD_COUNT_CAP', 99))
+        unread = Notification.objects.filter(user_id=user_id, is_read=False).order_by()[:cap + 1].count()
+        return Response({'unread': min(unread, cap), 'capped': unread > cap}, status=status.HTTP_200_OK)
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+async def notifications_stream(request):
+    """Server-sent events stream of new notifications for a user.
+
+    Query params:
+      - user: user UUID (required; defaults to the caller with a bearer token)
+
+    A reconnecting client's ``Last-Event-ID`` header replays notifications
+    created after that one. Comment frames are sent every
+    NOTIFICATION_STREAM_HEARTBEAT seconds to keep proxies from closing an
+    idle connection. Must be served by backend/asgi.py: under WSGI the
+    stream would be buffered and never reach the client while pinning a
+    worker, so it answers 501 there.
+    """
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Method not allowed'}, status=status.HTTP_405_METHOD_NOT_ALLOWED)
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {'error': 'The notification stream is only served over ASGI'}, status=status.HTTP_501_NOT_IMPLEMENTED
+        )
+    try:
+        caller = bearer_user(request)
+    except AuthenticationFailed as e:
+        return JsonResponse({'detail': str(e.detail)}, status=status.HTTP_401_UNAUTHORIZED)
+    user_id, allowed = subject_for(caller, request.GET.get('user'))
+    if not allowed:
+        return JsonResponse({'error': 'Not allowed'}, status=status.HTTP_403_FORBIDDEN)
+    if not user_id:
+        return JsonResponse({'error': 'Missing user id'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        user_id = uuid.UUID(user_id)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid user id'}, status=status.HTTP_400_BAD_REQUEST)
+
+    heartbeat = float(getattr(settings, 'NOTIFICATION_STREAM_HEARTBEAT', 15))
+    last_event_id = request.headers.get('Last-Event-ID')
+    # Subscribe (and open the subscription) before replaying, so nothing
+    # created in between is missed.
+    subscription = get_broker().subscribe(user_id)
+
+    async def events():
+        try:
+            await subscription.open()
+            yield f'retry: {int(heartbeat * 1000)}\n\n'
+            seen = set()
+            if last_event_id:
+                for message in await _missed_notifications(user_id, last_event_id):
+                    seen.add(event_id_of(message))
+                    yield format_event(message, event_id_of(message))
+            while True:
+                message = await subscription.next(timeout=heartbeat)
+                if message is None:
+                    yield ': keep-alive\n\n'
+                    continue
+                event_id = event_id_of(message)
+                if event_id in seen:
+                    seen.discard(event_id)
+                    continue
+                yield format_event(message, event_id)
+        finally:
+            await subscription.close()
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@sync_to_async
+def _missed_notifications(user_id, last_event_id):
+    try:
+        last = Notification.objects.filter(id=last_event_id, user_id=user_id).values_list('created_at', 'id').first()
+    except (ValueError, ValidationError):
+        return []
+    if last is None:
+        return []
+    notes = (
+        Notification.objects.filter(user_id=user_id)
+        .filter(Q(created_at__gt=last[0]) | Q(created_at=last[0], id__gt=last[1]))
+        .select_related('application__vehicle')
+        .order_by('created_at', 'id')[:MAX_LIMIT]
+    )
+    renderer = JSONRenderer()
+    return [renderer.render(row).decode() for row in NotificationCompactSerializer(notes, many=True).data]
+
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def notifications_mark_read(request):
     """Mark notifications as read. Provide 'user' to mark all for a user, or 'id' to mark a single notification."""
     try:
         notif_id = (request.data or {}).get('id')
-        user_id = (request.data or {}).get('user') or request.query_params.get('user')
+        user_id, allowed = scoped_subject(
+            request, (request.data or {}).get('user') or request.query_params.get('user')
+        )
+        if not allowed:
+            return Response({'error': 'Not allowed'}, status=status.HTTP_403_FORBIDDEN)
         if notif_id:
             try:
                 note = Notification.objects.get(id=notif_id)
             except Notification.DoesNotExist:
                 return Response({'error': 'Notification not found'}, status=status.HTTP_404_NOT_FOUND)
+            if not scoped_subject(request, str(note.user_id))[1]:
+                return Response({'error': 'Not allowed'}, status=status.HTTP_403_FORBIDDEN)
             note.is_read = True
             note.save(update_fields=['is_read'])
             return Response({'message': 'Marked as read', 'id': str(note.id)}, status=status.HTTP_200_OK)